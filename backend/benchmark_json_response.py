@@ -0,0 +1,67 @@
+import json
+import random
+import time
+from datetime import datetime
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+
+from fast_json_response import FastJSONResponse
+
+# Compare per-response CPU of FastAPI's default path (jsonable_encoder + stdlib
+# json) against FastJSONResponse on catalog-sized payloads.
+
+
+def build_payload(rows: int) -> dict:
+    """Build a /universities-shaped payload with DECIMAL and datetime values"""
+    random.seed(42)
+    universities = []
+    for i in range(rows):
+        universities.append({
+            'id': i + 1,
+            'name': f"University {i + 1}",
+            'country': random.choice(['United States', 'United Kingdom', 'Germany', 'Japan']),
+            'country_code': random.choice(['US', 'GB', 'DE', 'JP']),
+            'website': f"https://www.university{i + 1}.edu",
+            'ranking': random.randint(1, 2000),
+            'tuition_fee': Decimal(f"{random.uniform(5000, 60000):.2f}"),
+            'scholarship_available': random.choice([True, False]),
+            'admission_rate': Decimal(f"{random.uniform(10, 90):.2f}"),
+            'student_population': random.randint(1000, 50000),
+            'research_areas': ['Computer Science', 'Engineering', 'Physics'],
+            'program_strengths': 'Research Excellence; Industry Partnerships; Alumni Network',
+            'created_at': datetime(2025, 1, 1, 12, 0, 0),
+            'match_score': 0
+        })
+    return {"universities": universities}
+
+
+def default_render(payload: dict) -> bytes:
+    """Mirror what FastAPI does for a plain dict return value"""
+    encoded = jsonable_encoder(payload)
+    return json.dumps(encoded, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def fast_render(payload: dict) -> bytes:
+    return FastJSONResponse(payload).body
+
+
+def measure(render, payload: dict, iterations: int) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        render(payload)
+    return (time.process_time() - start) / iterations
+
+
+def main():
+    for rows, iterations in [(100, 200), (1000, 50), (10000, 10)]:
+        payload = build_payload(rows)
+        default_cpu = measure(default_render, payload, iterations)
+        fast_cpu = measure(fast_render, payload, iterations)
+        print(f"{rows:>6} rows: default {default_cpu * 1000:8.2f} ms  "
+              f"fast {fast_cpu * 1000:8.2f} ms  "
+              f"speedup {default_cpu / fast_cpu:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
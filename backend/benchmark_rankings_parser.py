@@ -0,0 +1,112 @@
+import glob
+import json
+import os
+import random
+import sys
+import time
+
+from rankings_parser import LXML_AVAILABLE, RankingsPageParser
+
+# Compare rankings page parsing with html.parser (the original path), lxml with
+# compiled selectors, and the embedded-JSON path on recorded pages: the fixtures
+# in fixtures/rankings by default, or any scraper cache directory
+# (SCRAPER_CACHE_DIR) passed as an argument. --synthetic instead generates
+# pages of 100 to 5000 rows to see how the backends scale.
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'rankings')
+
+COUNTRIES = ['United States', 'United Kingdom', 'Germany', 'Japan', 'Australia', 'Canada']
+
+
+def build_dom_page(rows: int) -> bytes:
+    """Build a ranking table page shaped like the ones the scraper reads"""
+    random.seed(42)
+    body = []
+    for i in range(rows):
+        country = random.choice(COUNTRIES)
+        body.append(
+            f'<tr class="ranking-row university-item"><td class="rank">{i + 1}</td>'
+            f'<td><div class="logo"><img alt="{country}" src="/flags/{i}.png"></div>'
+            f'<a href="/universities/university-{i + 1}">University of Example Studies {i + 1}</a>'
+            f'<span class="location">{country}</span></td><td class="score">{random.uniform(40, 100):.1f}</td></tr>'
+        )
+    return f"<html><head><title>Rankings</title></head><body><table>{''.join(body)}</table></body></html>".encode()
+
+
+def build_json_page(rows: int) -> bytes:
+    """Build a page that ships its rankings as an embedded JSON payload"""
+    random.seed(42)
+    nodes = [
+        {'title': f'<a href="/universities/university-{i + 1}">University of Example Studies {i + 1}</a>',
+         'country': random.choice(COUNTRIES), 'rank_display': f"={i + 1}" if i % 7 == 0 else str(i + 1)}
+        for i in range(rows)
+    ]
+    payload = json.dumps({'ranking': {'score_nodes': nodes}})
+    return (f'<html><head><script type="application/json" id="rankings-data">{payload}</script></head>'
+            f'<body>{build_dom_page(rows).decode()}</body></html>').encode()
+
+
+def parse_dom(parser: RankingsPageParser, content: bytes) -> int:
+    document = parser.parse_document(content)
+    rows = parser.find_rows(document)
+    return sum(1 for i, row in enumerate(rows) if parser.extract_university_data(row, i + 1, '2025'))
+
+
+def parse_json(parser: RankingsPageParser, content: bytes) -> int:
+    return len(parser.extract_json_records(parser.parse_document(content), '2025'))
+
+
+def measure(fn, parser: RankingsPageParser, content: bytes, iterations: int):
+    start = time.process_time()
+    for _ in range(iterations):
+        count = fn(parser, content)
+    return (time.process_time() - start) / iterations, count
+
+
+def load_recorded_pages(directory: str):
+    pages = []
+    for meta_path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(meta_path[:-len('.json')] + '.body', 'rb') as f:
+            pages.append((meta['url'], f.read()))
+    return pages
+
+
+def main():
+    if not LXML_AVAILABLE:
+        print("lxml is not installed; only html.parser can be measured")
+
+    baseline = RankingsPageParser(use_lxml=False)
+    fast = RankingsPageParser(use_lxml=True)
+
+    if '--synthetic' not in sys.argv[1:]:
+        directory = sys.argv[1] if len(sys.argv) > 1 else FIXTURES
+        pages = load_recorded_pages(directory)
+        if not pages:
+            sys.exit(f"No recorded pages in {directory}")
+        for url, content in pages:
+            base_cpu, base_count = measure(parse_dom, baseline, content, 20)
+            fast_cpu, fast_count = measure(parse_json, fast, content, 20)
+            method = 'json'
+            if fast_count < 3:
+                fast_cpu, fast_count = measure(parse_dom, fast, content, 20)
+                method = fast.backend
+            print(f"{url}\n  html.parser {base_cpu * 1000:8.2f} ms ({base_count} rows)  "
+                  f"{method} {fast_cpu * 1000:8.2f} ms ({fast_count} rows)  speedup {base_cpu / fast_cpu:5.1f}x")
+        return
+
+    for rows, iterations in [(100, 20), (1000, 5), (5000, 2)]:
+        dom_page = build_dom_page(rows)
+        json_page = build_json_page(rows)
+        base_cpu, _ = measure(parse_dom, baseline, dom_page, iterations)
+        lxml_cpu, _ = measure(parse_dom, fast, dom_page, iterations)
+        json_cpu, _ = measure(parse_json, fast, json_page, iterations)
+        print(f"{rows:>6} rows: html.parser {base_cpu * 1000:8.2f} ms  "
+              f"{fast.backend} {lxml_cpu * 1000:8.2f} ms  "
+              f"json {json_cpu * 1000:8.2f} ms  "
+              f"speedup {base_cpu / lxml_cpu:5.1f}x / {base_cpu / json_cpu:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+
+from research_index import ResearchIndex, iter_catalog_universities
+from synthetic_catalog import FIELDS, STRENGTHS, SyntheticCatalogGenerator, parse_size
+
+# Compare IVF search against exact search over the same index: recall@10 and
+# per-query latency for a range of nprobe values, plus the cost of incremental
+# inserts. Builds from a synthetic catalog (or --catalog) in memory.
+#
+#     python benchmark_research_index.py --size 1M --lists 1000 --nprobe 1,4,8,16,32,64
+
+
+def build_queries(count: int, seed: int):
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        terms = rng.sample(FIELDS, k=rng.randint(1, 3))
+        if rng.random() < 0.3:
+            terms.append(rng.choice(STRENGTHS))
+        queries.append(', '.join(terms))
+    return queries
+
+
+def recall_at_k(approximate, exact, k: int) -> float:
+    """
+    Share of the true top-k found. Synthetic catalogs have many exact ties, so
+    any result scoring at least the k-th exact score counts as a hit.
+    """
+    if not exact:
+        return 1.0
+    threshold = exact[min(k, len(exact)) - 1][1] - 1e-6
+    hits = sum(1 for _, score in approximate[:k] if score >= threshold)
+    return min(hits, len(exact)) / min(k, len(exact))
+
+
+def timed_search(index: ResearchIndex, queries, k: int):
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(index.search(query, k))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark IVF research search against exact search")
+    parser.add_argument("--size", default="200k", help="Synthetic catalog size (10k, 200k, 1M, ...)")
+    parser.add_argument("--catalog", default=None, help="Use a CSV/JSONL catalog instead of generating one")
+    parser.add_argument("--lists", type=int, default=0, help="IVF lists (default: sqrt(rows))")
+    parser.add_argument("--nprobe", default="1,2,4,8,16,32,64")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.catalog:
+        universities = list(iter_catalog_universities(args.catalog))
+    else:
+        generator = SyntheticCatalogGenerator(seed=args.seed)
+        universities = [dict(row, id=i + 1) for i, row in enumerate(generator.generate(parse_size(args.size)))]
+
+    lists = args.lists or max(1, int(math.sqrt(len(universities))))
+    started = time.perf_counter()
+    ivf = ResearchIndex.build(universities, n_lists=lists)
+    print(f"Built IVF index over {len(ivf)} universities ({ivf.n_lists} lists, "
+          f"{len(ivf.vocabulary)} terms) in {time.perf_counter() - started:.1f}s")
+    # Exact search over the very same arrays
+    exact = ResearchIndex(ivf.vocabulary, ivf.idf, ivf.doc_ids, ivf.indptr, ivf.postings_docs, ivf.postings_weights)
+
+    queries = build_queries(args.queries, args.seed)
+    exact_results, exact_p50, exact_p95 = timed_search(exact, queries, args.k)
+    print(f"{'exact':>12}: recall@{args.k} 1.000  p50 {exact_p50:7.2f} ms  p95 {exact_p95:7.2f} ms")
+
+    for nprobe in [int(value) for value in args.nprobe.split(',')]:
+        ivf.nprobe = nprobe
+        results, p50, p95 = timed_search(ivf, queries, args.k)
+        recall = np.mean([recall_at_k(found, truth, args.k) for found, truth in zip(results, exact_results)])
+        print(f"{f'nprobe {nprobe}':>12}: recall@{args.k} {recall:.3f}  p50 {p50:7.2f} ms  p95 {p95:7.2f} ms  "
+              f"speedup {exact_p50 / p50:5.1f}x")
+
+    # Incremental inserts land in the delta segment and are searchable immediately
+    generator = SyntheticCatalogGenerator(seed=args.seed + 1)
+    new_rows = [dict(row, id=10_000_000 + i) for i, row in enumerate(generator.generate(1000))]
+    start = time.perf_counter()
+    for row in new_rows:
+        ivf.add(row)
+    insert_ms = (time.perf_counter() - start) * 1000 / len(new_rows)
+    _, p50, _ = timed_search(ivf, queries, args.k)
+    print(f"insert: {insert_ms:.3f} ms per university; nprobe {ivf.nprobe} p50 with {len(new_rows)} pending inserts "
+          f"{p50:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import mysql.connector
+
+# Each source keeps its own hash column: the CSV and JSON syncs hash different
+# column sets under different keys, so sharing one column would make every
+# alternate run see every row as changed
+CSV_HASH_COLUMN = 'content_hash'
+JSON_HASH_COLUMN = 'json_content_hash'
+# Hashes covering global_ranking, cleared when ranks are materialized from history
+RANK_DEPENDENT_HASH_COLUMNS = (JSON_HASH_COLUMN,)
+
+# Counter in catalog_meta that every writer outside the API bumps, so API
+# processes notice the change without waiting for CATALOG_VERSION_TTL
+CATALOG_VERSION_KEY = 'catalog_version'
+
+
+def _normalize(value: Any) -> Any:
+    """Normalize a column value so DB reads and source records hash identically"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (float, Decimal)):
+        return format(float(value), '.4f')
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def compute_row_hash(record: Dict[str, Any], columns: Sequence[str]) -> str:
+    """Content hash of the synced columns of a record"""
+    canonical = json.dumps([_normalize(record.get(column)) for column in columns], default=str, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+class CatalogSync:
+    """
+    Change-detecting sync of source records into the universities table.
+
+    Each row stores a content hash (in the source's own hash_column) over the
+    columns the source controls. A sync reads only (id, key, hash) for existing rows, writes just
+    the inserts, updates and deletes whose content actually differs, and
+    returns (and optionally appends to a JSONL file) a change log so caches
+    can invalidate only the affected ids.
+    """
+
+    def __init__(self, db_config: Dict[str, Any], columns: Sequence[str], key_columns: Sequence[str] = ('name',),
+                 batch_size: int = 1000, hash_column: str = CSV_HASH_COLUMN):
+        self.db_config = db_config
+        self.hash_column = hash_column
+        self.columns = list(columns)
+        self.key_columns = list(key_columns)
+        self.batch_size = batch_size
+
+    def ensure_hash_column(self, cursor):
+        """Add this source's hash column on first use"""
+        cursor.execute(f"SHOW COLUMNS FROM universities LIKE '{self.hash_column}'")
+        if not cursor.fetchall():
+            print(f"Adding {self.hash_column} column to universities...")
+            cursor.execute(f"ALTER TABLE universities ADD COLUMN {self.hash_column} CHAR(40) DEFAULT NULL")
+
+    def _key(self, record: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(_normalize(record.get(column)) for column in self.key_columns)
+
+    def _load_existing(self, cursor) -> Dict[Tuple[Any, ...], Tuple[int, str]]:
+        key_list = ', '.join(self.key_columns)
+        cursor.execute(f"SELECT id, {key_list}, {self.hash_column} FROM universities")
+        existing: Dict[Tuple[Any, ...], Tuple[int, str]] = {}
+        missing_hash: List[int] = []
+        for row in cursor.fetchall():
+            university_id, key, content_hash = row[0], tuple(_normalize(v) for v in row[1:-1]), row[-1]
+            existing[key] = (university_id, content_hash)
+            if content_hash is None:
+                missing_hash.append(university_id)
+
+        # Rows written before hashing existed: hash their current values once
+        if missing_hash:
+            print(f"Backfilling content hashes for {len(missing_hash)} rows...")
+            backfill = []
+            for start in range(0, len(missing_hash), self.batch_size):
+                ids = missing_hash[start:start + self.batch_size]
+                cursor.execute(
+                    f"SELECT id, {', '.join(self.columns)} FROM universities WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                    ids
+                )
+                for row in cursor.fetchall():
+                    record = dict(zip(self.columns, row[1:]))
+                    backfill.append((compute_row_hash(record, self.columns), row[0]))
+            cursor.executemany(f"UPDATE universities SET {self.hash_column} = %s WHERE id = %s", backfill)
+            hashes = {university_id: content_hash for content_hash, university_id in backfill}
+            existing = {key: (uid, h if h is not None else hashes.get(uid)) for key, (uid, h) in existing.items()}
+        return existing
+
+    def sync(self, records: Iterable[Dict[str, Any]], delete_missing: bool = False,
+             change_log_path: Optional[str] = None,
+             prepare_insert=None) -> Dict[str, Any]:
+        """
+        Sync records into the universities table.
+
+        prepare_insert, if given, is called with each new record and returns
+        extra columns to write on insert only (e.g. generated enrichment).
+        """
+        conn = mysql.connector.connect(**self.db_config)
+        cursor = conn.cursor()
+        changes: List[Dict[str, Any]] = []
+        counts = {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+
+        try:
+            self.ensure_hash_column(cursor)
+            existing = self._load_existing(cursor)
+            seen = set()
+            inserts: Dict[Tuple[str, ...], List[Tuple[Any, ...]]] = {}
+            insert_records: List[Dict[str, Any]] = []
+            updates: List[Tuple[Any, ...]] = []
+
+            for record in records:
+                key = self._key(record)
+                if key in seen:
+                    continue
+                seen.add(key)
+                content_hash = compute_row_hash(record, self.columns)
+                current = existing.get(key)
+
+                if current is None:
+                    row = {column: record.get(column) for column in self.columns}
+                    if prepare_insert:
+                        row.update(prepare_insert(record))
+                    row[self.hash_column] = content_hash
+                    insert_columns = tuple(row)
+                    inserts.setdefault(insert_columns, []).append(tuple(row.values()))
+                    insert_records.append(record)
+                elif current[1] != content_hash:
+                    updates.append(tuple(record.get(column) for column in self.columns) + (content_hash, current[0]))
+                    changes.append({'action': 'update', 'id': current[0], 'key': list(key)})
+                else:
+                    counts['unchanged'] += 1
+
+            for insert_columns, rows in inserts.items():
+                insert_sql = f"""
+                INSERT INTO universities ({', '.join(insert_columns)}, created_at, updated_at)
+                VALUES ({', '.join(['%s'] * len(insert_columns))}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                """
+                for start in range(0, len(rows), self.batch_size):
+                    cursor.executemany(insert_sql, rows[start:start + self.batch_size])
+            counts['inserted'] = len(insert_records)
+
+            if updates:
+                update_sql = f"""
+                UPDATE universities
+                SET {', '.join(f'{column} = %s' for column in self.columns)},
+                    {self.hash_column} = %s,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s
+                """
+                for start in range(0, len(updates), self.batch_size):
+                    cursor.executemany(update_sql, updates[start:start + self.batch_size])
+            counts['updated'] = len(updates)
+
+            if delete_missing:
+                stale = [(key, uid) for key, (uid, _) in existing.items() if key not in seen]
+                for start in range(0, len(stale), self.batch_size):
+                    ids = [uid for _, uid in stale[start:start + self.batch_size]]
+                    cursor.execute(f"DELETE FROM universities WHERE id IN ({', '.join(['%s'] * len(ids))})", ids)
+                changes.extend({'action': 'delete', 'id': uid, 'key': list(key)} for key, uid in stale)
+                counts['deleted'] = len(stale)
+
+            conn.commit()
+            if insert_records or updates or counts['deleted']:
+                bump_catalog_version(cursor)
+                conn.commit()
+
+            # Resolve ids of inserted rows for the change log
+            if insert_records:
+                inserted = self._load_existing(cursor)
+                for record in insert_records:
+                    key = self._key(record)
+                    changes.append({'action': 'insert', 'id': inserted.get(key, (None,))[0], 'key': list(key)})
+
+        except mysql.connector.Error as err:
+            conn.rollback()
+            print(f"Error syncing catalog: {err}")
+            raise
+        finally:
+            if conn.is_connected():
+                cursor.close()
+                conn.close()
+
+        if change_log_path and changes:
+            synced_at = datetime.now().isoformat()
+            with open(change_log_path, 'a', encoding='utf-8') as log:
+                for change in changes:
+                    log.write(json.dumps({'synced_at': synced_at, **change}, default=str) + '\n')
+
+        print(f"Catalog sync: {counts['inserted']} inserted, {counts['updated']} updated, "
+              f"{counts['deleted']} deleted, {counts['unchanged']} unchanged")
+        return {**counts, 'changes': changes, 'changed_ids': [c['id'] for c in changes if c['id'] is not None]}
+
+
+def existing_hash_columns(cursor, columns: Sequence[str]) -> List[str]:
+    """The given hash columns that exist on universities (a source that never synced has none)"""
+    if not columns:
+        return []
+    cursor.execute(f"""
+    SELECT COLUMN_NAME FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'universities'
+      AND COLUMN_NAME IN ({', '.join(['%s'] * len(columns))})
+    """, list(columns))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def ensure_catalog_meta(cursor):
+    """Create the catalog_meta table if missing (DDL: commits implicitly)"""
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS catalog_meta (
+        name VARCHAR(64) PRIMARY KEY,
+        value BIGINT NOT NULL DEFAULT 0
+    )
+    """)
+
+
+def bump_catalog_version(cursor, ensure_table: bool = True):
+    """
+    Increment the shared catalog version counter. With ensure_table the
+    CREATE commits implicitly, so loaders call this after committing their
+    write, then commit again. To bump inside the write's own transaction, call
+    ensure_catalog_meta before the write and pass ensure_table=False.
+    """
+    if ensure_table:
+        ensure_catalog_meta(cursor)
+    cursor.execute("""
+    INSERT INTO catalog_meta (name, value) VALUES (%s, 1)
+    ON DUPLICATE KEY UPDATE value = value + 1
+    """, (CATALOG_VERSION_KEY,))
+
+
+def default_change_log_path() -> Optional[str]:
+    return os.getenv('CATALOG_CHANGE_LOG')
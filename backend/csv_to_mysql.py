@@ -3,15 +3,42 @@ import mysql.connector
 import random
 import asyncio
 import os
+import queue
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
 from gpt_university_enhancer import GPTUniversityEnhancer
-from typing import Dict, List, Any
+from catalog_sync import CSV_HASH_COLUMN, CatalogSync, bump_catalog_version, default_change_log_path
+from typing import Callable, Dict, List, Any, Iterator, Optional, Tuple
+
+# LOAD DATA LOCAL refused by the server (local_infile=OFF) or the client
+LOCAL_INFILE_DISABLED_ERRORS = (1148, 2068, 3948)
+LOAD_DATA_ESCAPE = re.compile(r'\\(.)')
+LOAD_DATA_UNESCAPES = {'t': '\t', 'n': '\n', 'r': '\r'}
+# A shadow-table reload smaller than this share of the live catalog is not swapped in without force
+MIN_RELOAD_RATIO = 0.5
 
 # Load environment variables
 load_dotenv()
 
+# Columns that come straight from world-universities.csv; enrichment is generated
+SOURCE_COLUMNS = ['country_code', 'country_name', 'name', 'website']
+
+# Columns written by the CSV loaders, in insert order
+INSERT_COLUMNS = [
+    'country_code', 'country_name', 'name', 'website', 'global_ranking',
+    'tuition_fee_usd', 'scholarship_available', 'admission_rate',
+    'student_population', 'founded_year', 'type', 'research_areas', 'campus_size',
+    'admission_requirements', 'notable_faculty', 'program_strengths', 'application_deadline'
+]
+
 class CSVToMySQLConverter:
-    def __init__(self):
+    def __init__(self, http_client=None):
         self.db_config = {
             'host': os.getenv('DB_HOST', 'localhost'),
             'user': os.getenv('DB_USER', 'root'),
@@ -19,7 +46,7 @@ class CSVToMySQLConverter:
             'port': int(os.getenv('DB_PORT', 3306)),
             'database': os.getenv('DB_NAME', 'universitydb')
         }
-        self.enhancer = GPTUniversityEnhancer()
+        self.enhancer = GPTUniversityEnhancer(http_client)
         
     def create_database_and_table(self):
         """Create database and universities table"""
@@ -64,6 +91,7 @@ class CSVToMySQLConverter:
                 notable_faculty TEXT,
                 program_strengths TEXT,
                 application_deadline VARCHAR(100),
+                content_hash CHAR(40) DEFAULT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 INDEX idx_country (country_code),
@@ -285,6 +313,46 @@ class CSVToMySQLConverter:
         else:
             return random.choice(["March 1", "May 15", "July 1", "September 15", "Rolling Admissions"])
     
+    def enrich_row(self, row: List[str]) -> Optional[Tuple[Any, ...]]:
+        """Turn a world-universities.csv row into an insert tuple ordered like INSERT_COLUMNS"""
+        if len(row) < 3:
+            return None
+        
+        country_code = row[0]
+        university_name = row[1]
+        website = row[2] if len(row) > 2 else None
+        
+        country_name = self.get_country_name(country_code)
+        enhanced_data = self.generate_enhanced_data(university_name, country_name)
+        
+        return (
+            country_code,
+            country_name,
+            university_name,
+            website,
+            enhanced_data['global_ranking'],
+            enhanced_data['tuition_fee_usd'],
+            enhanced_data['scholarship_available'],
+            enhanced_data['admission_rate'],
+            enhanced_data['student_population'],
+            enhanced_data['founded_year'],
+            enhanced_data['type'],
+            enhanced_data['research_areas'],
+            enhanced_data['campus_size'],
+            enhanced_data['admission_requirements'],
+            enhanced_data['notable_faculty'],
+            enhanced_data['program_strengths'],
+            enhanced_data['application_deadline']
+        )
+    
+    def enriched_rows(self, csv_file_path: str) -> Iterator[Tuple[Any, ...]]:
+        """Stream enriched insert tuples from a CSV file"""
+        with open(csv_file_path, 'r', encoding='utf-8') as file:
+            for row in csv.reader(file):
+                enriched = self.enrich_row(row)
+                if enriched:
+                    yield enriched
+    
     def load_csv_to_mysql(self, csv_file_path: str, batch_size: int = 100):
         """Load CSV data to MySQL with enhancements"""
         try:
@@ -294,63 +362,32 @@ class CSVToMySQLConverter:
             # Clear existing data
             cursor.execute("DELETE FROM universities")
             
-            insert_sql = """
-            INSERT INTO universities (
-                country_code, country_name, name, website, global_ranking,
-                tuition_fee_usd, scholarship_available, admission_rate,
-                student_population, founded_year, type, research_areas, campus_size,
-                admission_requirements, notable_faculty, program_strengths, application_deadline
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            insert_sql = f"""
+            INSERT INTO universities ({', '.join(INSERT_COLUMNS)})
+            VALUES ({', '.join(['%s'] * len(INSERT_COLUMNS))})
             """
             
             batch_data = []
             processed_count = 0
             
-            with open(csv_file_path, 'r', encoding='utf-8') as file:
-                csv_reader = csv.reader(file)
-                
-                for row in csv_reader:
-                    if len(row) >= 3:
-                        country_code = row[0]
-                        university_name = row[1]
-                        website = row[2] if len(row) > 2 else None
-                        
-                        country_name = self.get_country_name(country_code)
-                        enhanced_data = self.generate_enhanced_data(university_name, country_name)
-                        
-                        batch_data.append((
-                            country_code,
-                            country_name,
-                            university_name,
-                            website,
-                            enhanced_data['global_ranking'],
-                            enhanced_data['tuition_fee_usd'],
-                            enhanced_data['scholarship_available'],
-                            enhanced_data['admission_rate'],
-                            enhanced_data['student_population'],
-                            enhanced_data['founded_year'],
-                            enhanced_data['type'],
-                            enhanced_data['research_areas'],
-                            enhanced_data['campus_size'],
-                            enhanced_data['admission_requirements'],
-                            enhanced_data['notable_faculty'],
-                            enhanced_data['program_strengths'],
-                            enhanced_data['application_deadline']
-                        ))
-                        
-                        if len(batch_data) >= batch_size:
-                            cursor.executemany(insert_sql, batch_data)
-                            conn.commit()
-                            processed_count += len(batch_data)
-                            print(f"Processed {processed_count} universities...")
-                            batch_data = []
+            for enriched in self.enriched_rows(csv_file_path):
+                batch_data.append(enriched)
                 
-                # Insert remaining data
-                if batch_data:
+                if len(batch_data) >= batch_size:
                     cursor.executemany(insert_sql, batch_data)
                     conn.commit()
                     processed_count += len(batch_data)
+                    print(f"Processed {processed_count} universities...")
+                    batch_data = []
             
+            # Insert remaining data
+            if batch_data:
+                cursor.executemany(insert_sql, batch_data)
+                conn.commit()
+                processed_count += len(batch_data)
+            
+            bump_catalog_version(cursor)
+            conn.commit()
             print(f"Successfully loaded {processed_count} universities to MySQL!")
             
         except mysql.connector.Error as err:
@@ -362,6 +399,369 @@ class CSVToMySQLConverter:
                 cursor.close()
                 conn.close()
     
+    @staticmethod
+    def _load_data_value(value: Any) -> str:
+        """Format a value for LOAD DATA's default tab-separated, backslash-escaped format"""
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return '1' if value else '0'
+        return (str(value)
+                .replace('\\', '\\\\')
+                .replace('\t', '\\t')
+                .replace('\n', '\\n')
+                .replace('\r', '\\r'))
+    
+    @staticmethod
+    def _staged_value(field: str) -> Optional[str]:
+        """Inverse of _load_data_value"""
+        if field == '\\N':
+            return None
+        return LOAD_DATA_ESCAPE.sub(lambda match: LOAD_DATA_UNESCAPES.get(match.group(1), match.group(1)), field)
+    
+    def read_staging_file(self, path: str) -> Iterator[Tuple[Any, ...]]:
+        """Read rows back from a staging file written by write_staging_file"""
+        with open(path, 'r', encoding='utf-8', newline='') as staging:
+            for line in staging:
+                yield tuple(self._staged_value(field) for field in line.rstrip('\n').split('\t'))
+    
+    def write_staging_file(self, rows: Iterator[Tuple[Any, ...]], staging_dir: Optional[str] = None) -> Tuple[str, int]:
+        """Write enriched rows to a LOAD DATA staging file, returning its path and row count"""
+        fd, path = tempfile.mkstemp(prefix='universities_', suffix='.tsv', dir=staging_dir)
+        count = 0
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as staging:
+            for row in rows:
+                staging.write('\t'.join(self._load_data_value(value) for value in row))
+                staging.write('\n')
+                count += 1
+        return path, count
+    
+    def _secondary_index_definitions(self, cursor, table: str) -> List[str]:
+        """Read the non-primary index definitions of a table as ADD INDEX clauses"""
+        cursor.execute(f"SHOW INDEX FROM {table} WHERE Key_name != 'PRIMARY'")
+        columns = [column[0] for column in cursor.description]
+        indexes: Dict[str, Dict[str, Any]] = {}
+        for values in cursor.fetchall():
+            index = dict(zip(columns, values))
+            entry = indexes.setdefault(index['Key_name'], {'unique': not index['Non_unique'], 'columns': []})
+            part = f"`{index['Column_name']}`"
+            if index.get('Sub_part'):
+                part += f"({index['Sub_part']})"
+            entry['columns'].append((index['Seq_in_index'], part))
+        
+        definitions = []
+        for name, entry in indexes.items():
+            parts = ', '.join(part for _, part in sorted(entry['columns']))
+            definitions.append(f"ADD {'UNIQUE ' if entry['unique'] else ''}INDEX `{name}` ({parts})")
+        return definitions
+    
+    def _create_shadow_table(self, cursor) -> List[str]:
+        """
+        Create an empty universities_shadow table without its secondary indexes.
+        Returns the dropped index definitions so they can be rebuilt after loading.
+        """
+        cursor.execute("DROP TABLE IF EXISTS universities_shadow")
+        cursor.execute("CREATE TABLE universities_shadow LIKE universities")
+        
+        # Load without secondary index maintenance, rebuild them in one pass afterwards
+        index_definitions = self._secondary_index_definitions(cursor, 'universities_shadow')
+        if index_definitions:
+            drops = ', '.join(
+                f"DROP INDEX `{definition.split('`')[1]}`" for definition in index_definitions
+            )
+            cursor.execute(f"ALTER TABLE universities_shadow {drops}")
+        cursor.execute("SET SESSION unique_checks = 0")
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        return index_definitions
+    
+    def _shadow_load_acceptable(self, cursor, loaded: int, force: bool = False) -> bool:
+        """
+        Check a shadow-table load before swapping it in; drops the shadow table
+        when nothing loaded, or when it holds far fewer rows than the live
+        catalog (a truncated or wrong file) and force is not set
+        """
+        cursor.execute("SELECT COUNT(*) FROM universities")
+        live = cursor.fetchone()[0]
+        if loaded > 0 and (force or loaded >= MIN_RELOAD_RATIO * live):
+            return True
+        if loaded == 0:
+            print("No rows loaded; keeping the current catalog")
+        else:
+            print(f"Loaded only {loaded} rows against {live} in the live catalog; keeping the current catalog "
+                  f"(use --force to swap anyway)")
+        cursor.execute("DROP TABLE IF EXISTS universities_shadow")
+        return False
+    
+    def _swap_in_shadow_table(self, cursor, index_definitions: List[str]):
+        """Rebuild the shadow table's indexes and atomically swap it in for universities"""
+        cursor.execute("SET SESSION unique_checks = 1")
+        cursor.execute("SET SESSION foreign_key_checks = 1")
+        if index_definitions:
+            print("Rebuilding indexes on shadow table...")
+            cursor.execute(f"ALTER TABLE universities_shadow {', '.join(index_definitions)}")
+        
+        # Atomic swap: readers see either the old or the new table, never an empty one
+        cursor.execute("DROP TABLE IF EXISTS universities_old")
+        cursor.execute("RENAME TABLE universities TO universities_old, universities_shadow TO universities")
+        cursor.execute("DROP TABLE universities_old")
+    
+    def _insert_staged_rows(self, conn, cursor, staging_path: str, batch_size: int = 1000) -> int:
+        """Batched executemany of a staging file into the shadow table, for servers without local_infile"""
+        insert_sql = f"""
+        INSERT INTO universities_shadow ({', '.join(INSERT_COLUMNS)})
+        VALUES ({', '.join(['%s'] * len(INSERT_COLUMNS))})
+        """
+        loaded = 0
+        batch = []
+        for row in self.read_staging_file(staging_path):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cursor.executemany(insert_sql, batch)
+                conn.commit()
+                loaded += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert_sql, batch)
+            conn.commit()
+            loaded += len(batch)
+        return loaded
+    
+    def bulk_load_csv_to_mysql(self, csv_file_path: str, staging_dir: Optional[str] = None, force: bool = False):
+        """
+        Bulk ingest mode: enrich rows into a staging file, LOAD DATA it into a
+        shadow table with secondary indexes dropped, rebuild the indexes, then
+        swap the shadow table in with one atomic RENAME TABLE. Readers keep
+        seeing the previous catalog until the swap.
+        
+        LOAD DATA LOCAL needs local_infile=ON on the MySQL server; when the
+        server refuses it, the staging file is inserted with batched executemany.
+        An empty load, or one below MIN_RELOAD_RATIO of the live catalog unless
+        force is set, is discarded instead of swapped in.
+        """
+        staging_path = None
+        conn = None
+        try:
+            print("Writing enriched rows to staging file...")
+            staging_path, row_count = self.write_staging_file(self.enriched_rows(csv_file_path), staging_dir)
+            print(f"Staged {row_count} universities in {staging_path}")
+            
+            conn = mysql.connector.connect(**self.db_config, allow_local_infile=True)
+            cursor = conn.cursor()
+            
+            index_definitions = self._create_shadow_table(cursor)
+            
+            try:
+                cursor.execute(f"""
+                LOAD DATA LOCAL INFILE %s
+                INTO TABLE universities_shadow
+                CHARACTER SET utf8mb4
+                FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+                LINES TERMINATED BY '\\n'
+                ({', '.join(INSERT_COLUMNS)})
+                """, (staging_path,))
+                loaded = cursor.rowcount
+                conn.commit()
+            except mysql.connector.Error as err:
+                if err.errno not in LOCAL_INFILE_DISABLED_ERRORS:
+                    raise
+                print(f"LOAD DATA LOCAL is disabled ({err.msg}); falling back to batched inserts. "
+                      f"Set local_infile=ON on the server for the fast path.")
+                conn.rollback()
+                loaded = self._insert_staged_rows(conn, cursor, staging_path)
+            
+            if not self._shadow_load_acceptable(cursor, loaded, force):
+                return False
+            self._swap_in_shadow_table(cursor, index_definitions)
+            conn.commit()
+            bump_catalog_version(cursor)
+            conn.commit()
+            
+            print(f"Successfully bulk loaded {loaded} universities to MySQL!")
+            return True
+            
+        except mysql.connector.Error as err:
+            print(f"Error bulk loading data to MySQL: {err}")
+        except Exception as e:
+            print(f"General error: {e}")
+        finally:
+            if conn is not None and conn.is_connected():
+                cursor.close()
+                conn.close()
+            if staging_path and os.path.exists(staging_path):
+                os.remove(staging_path)
+    
+    def pipelined_load_csv_to_mysql(self, csv_file_path: str, workers: Optional[int] = None,
+                                    chunk_size: int = 500, queue_depth: int = 8,
+                                    enrich_chunk: Callable[[List[List[str]]], List[Tuple[Any, ...]]] = None,
+                                    force: bool = False):
+        """
+        Pipelined load: a reader thread chunks the CSV, a process pool enriches
+        chunks in parallel, and a writer thread inserts them into a shadow table
+        that is swapped in at the end. Bounded queues between the stages keep
+        memory flat while CPU-bound enrichment overlaps with database writes.
+        
+        enrich_chunk must be a picklable top-level function; it runs in the
+        worker processes and defaults to the generate_enhanced_data family.
+        """
+        enrich_chunk = enrich_chunk or _enrich_chunk
+        workers = workers or os.cpu_count() or 1
+        raw_chunks: queue.Queue = queue.Queue(maxsize=queue_depth)
+        enriched_chunks: queue.Queue = queue.Queue(maxsize=queue_depth)
+        failed = threading.Event()
+        errors: List[Exception] = []
+        stats = {'read': 0, 'written': 0}
+        started = time.perf_counter()
+        
+        def fail(error: Exception):
+            errors.append(error)
+            failed.set()
+        
+        def reader():
+            try:
+                with open(csv_file_path, 'r', encoding='utf-8') as file:
+                    chunk = []
+                    for row in csv.reader(file):
+                        if failed.is_set():
+                            break
+                        chunk.append(row)
+                        if len(chunk) >= chunk_size:
+                            raw_chunks.put(chunk)
+                            stats['read'] += len(chunk)
+                            chunk = []
+                    if chunk and not failed.is_set():
+                        raw_chunks.put(chunk)
+                        stats['read'] += len(chunk)
+            except Exception as e:
+                fail(e)
+            finally:
+                raw_chunks.put(None)
+        
+        def writer():
+            conn = None
+            index_definitions: List[str] = []
+            insert_sql = f"""
+            INSERT INTO universities_shadow ({', '.join(INSERT_COLUMNS)})
+            VALUES ({', '.join(['%s'] * len(INSERT_COLUMNS))})
+            """
+            try:
+                conn = mysql.connector.connect(**self.db_config)
+                cursor = conn.cursor()
+                index_definitions = self._create_shadow_table(cursor)
+            except Exception as e:
+                fail(e)
+            
+            # Always drain the queue so upstream stages never block on a full queue
+            while True:
+                rows = enriched_chunks.get()
+                if rows is None:
+                    break
+                if failed.is_set() or not rows:
+                    continue
+                try:
+                    cursor.executemany(insert_sql, rows)
+                    conn.commit()
+                    stats['written'] += len(rows)
+                    elapsed = time.perf_counter() - started
+                    print(f"Written {stats['written']} universities "
+                          f"(read {stats['read']}, {stats['written'] / elapsed:.0f} rows/s)...")
+                except Exception as e:
+                    fail(e)
+            
+            try:
+                if conn is not None and not failed.is_set():
+                    if not self._shadow_load_acceptable(cursor, stats['written'], force):
+                        raise RuntimeError(f"Shadow table load of {stats['written']} rows rejected")
+                    self._swap_in_shadow_table(cursor, index_definitions)
+                    conn.commit()
+                    bump_catalog_version(cursor)
+                    conn.commit()
+            except Exception as e:
+                fail(e)
+            finally:
+                if conn is not None and conn.is_connected():
+                    cursor.close()
+                    conn.close()
+        
+        reader_thread = threading.Thread(target=reader, name='csv-reader', daemon=True)
+        writer_thread = threading.Thread(target=writer, name='mysql-writer', daemon=True)
+        reader_thread.start()
+        writer_thread.start()
+        
+        def collect(future):
+            try:
+                enriched_chunks.put(future.result())
+            except Exception as e:
+                fail(e)
+        
+        # Enrichment stage: keep a bounded number of chunks in flight, in order
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_enrichment_worker) as pool:
+                in_flight = deque()
+                while True:
+                    chunk = raw_chunks.get()
+                    if chunk is None:
+                        break
+                    if failed.is_set():
+                        continue
+                    in_flight.append(pool.submit(enrich_chunk, chunk))
+                    if len(in_flight) >= workers * 2:
+                        collect(in_flight.popleft())
+                while in_flight:
+                    collect(in_flight.popleft())
+        except BaseException as e:
+            fail(e)
+            raise
+        finally:
+            # The writer only exits on the sentinel, so send it even if this stage raised
+            enriched_chunks.put(None)
+            # A reader blocked on a full queue needs draining before it sees the failure
+            while reader_thread.is_alive():
+                try:
+                    raw_chunks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            reader_thread.join()
+            writer_thread.join()
+        
+        elapsed = time.perf_counter() - started
+        if errors:
+            print(f"Pipelined load failed after {elapsed:.1f}s: {errors[0]}")
+            return False
+        print(f"Successfully loaded {stats['written']} universities to MySQL in {elapsed:.1f}s "
+              f"({stats['written'] / elapsed:.0f} rows/s, {workers} enrichment workers)")
+        return True
+    
+    def sync_csv_to_mysql(self, csv_file_path: str, delete_missing: bool = False,
+                          change_log_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Incremental sync instead of a full reload. Only the CSV's own columns
+        are hashed and compared, so generated enrichment never causes churn:
+        new universities are enriched on insert, existing ones only get their
+        source columns updated when those actually changed.
+        """
+        records = []
+        with open(csv_file_path, 'r', encoding='utf-8') as file:
+            for row in csv.reader(file):
+                if len(row) >= 3:
+                    records.append({
+                        'country_code': row[0],
+                        'country_name': self.get_country_name(row[0]),
+                        'name': row[1],
+                        'website': row[2] if len(row) > 2 else None
+                    })
+        
+        def enrich_new(record: Dict[str, Any]) -> Dict[str, Any]:
+            return self.generate_enhanced_data(record['name'], record['country_name'])
+        
+        sync = CatalogSync(self.db_config, columns=SOURCE_COLUMNS, key_columns=('name', 'country_code'),
+                           hash_column=CSV_HASH_COLUMN)
+        try:
+            return sync.sync(records, delete_missing=delete_missing,
+                             change_log_path=change_log_path or default_change_log_path(),
+                             prepare_insert=enrich_new)
+        except mysql.connector.Error:
+            return None
+    
     def create_indexes_and_views(self):
         """Create additional indexes and useful views"""
         try:
@@ -407,14 +807,40 @@ class CSVToMySQLConverter:
                 cursor.close()
                 conn.close()
 
+# Per-process converter used by the pipelined loader's enrichment workers
+_worker_converter: Optional[CSVToMySQLConverter] = None
+
+def _init_enrichment_worker():
+    """Process pool initializer: build one converter per worker and reseed its RNG"""
+    global _worker_converter
+    # Forked workers inherit the parent's random state; reseed so rows differ
+    random.seed()
+    _worker_converter = CSVToMySQLConverter()
+
+def _enrich_chunk(rows: List[List[str]]) -> List[Tuple[Any, ...]]:
+    """Enrich a chunk of raw CSV rows inside a worker process"""
+    enriched = (_worker_converter.enrich_row(row) for row in rows)
+    return [row for row in enriched if row]
+
 def main():
     converter = CSVToMySQLConverter()
     
     print("Creating database and table...")
     converter.create_database_and_table()
     
-    print("Loading CSV data to MySQL...")
-    converter.load_csv_to_mysql('/Users/wisemaker/Sites/university-recommender/backend/world-universities.csv')
+    csv_file_path = '/Users/wisemaker/Sites/university-recommender/backend/world-universities.csv'
+    if '--sync' in sys.argv:
+        print("Syncing CSV changes to MySQL...")
+        converter.sync_csv_to_mysql(csv_file_path, delete_missing='--delete-missing' in sys.argv)
+    elif '--pipelined' in sys.argv:
+        print("Loading CSV data to MySQL with parallel enrichment...")
+        converter.pipelined_load_csv_to_mysql(csv_file_path, force='--force' in sys.argv)
+    elif '--bulk' in sys.argv:
+        print("Bulk loading CSV data to MySQL (LOAD DATA + table swap)...")
+        converter.bulk_load_csv_to_mysql(csv_file_path, force='--force' in sys.argv)
+    else:
+        print("Loading CSV data to MySQL...")
+        converter.load_csv_to_mysql(csv_file_path)
     
     print("Creating indexes and views...")
     converter.create_indexes_and_views()
@@ -0,0 +1,224 @@
+import asyncio
+import hashlib
+import io
+import os
+import re
+import signal
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+# Section headings as they appear in academic CVs and resumes
+SECTION_PATTERNS = {
+    'education': re.compile(r'^(education|academic background|academic qualifications|qualifications)\b', re.I),
+    'experience': re.compile(r'^(experience|work experience|professional experience|employment|research experience|teaching experience)\b', re.I),
+    'skills': re.compile(r'^(skills|technical skills|core competencies|competencies|languages and skills)\b', re.I),
+    'publications': re.compile(r'^(publications|selected publications|papers|conference papers|journal articles)\b', re.I),
+    'research': re.compile(r'^(research interests|research|projects|research projects)\b', re.I),
+    'awards': re.compile(r'^(awards|honou?rs|scholarships|grants|fellowships)\b', re.I),
+}
+
+
+class CVExtractionError(Exception):
+    """Raised when a CV cannot be parsed within the configured limits"""
+    pass
+
+
+class ParseTimeout(Exception):
+    """Raised inside a worker when a document exceeds the time limit"""
+    pass
+
+
+def _alarm_handler(signum, frame):
+    raise ParseTimeout("CV parsing exceeded the time limit")
+
+
+def _pdf_text(content: bytes, max_pages: int):
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(io.BytesIO(content))
+    total_pages = len(reader.pages)
+    texts = [reader.pages[i].extract_text() or '' for i in range(min(total_pages, max_pages))]
+    return '\n'.join(texts), total_pages
+
+
+def _docx_text(content: bytes, max_pages: int):
+    from docx import Document
+
+    document = Document(io.BytesIO(content))
+    lines = [paragraph.text for paragraph in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            lines.append(' | '.join(cell.text for cell in row.cells))
+    # DOCX has no fixed pages; approximate with 50 lines per page for the limit
+    max_lines = max_pages * 50
+    return '\n'.join(lines[:max_lines]), max(1, -(-len(lines) // 50))
+
+
+def _legacy_doc_text(content: bytes, max_pages: int):
+    # Binary .doc: pull out runs of readable text (UTF-16LE, then 8-bit)
+    runs = re.findall(rb'(?:[\x20-\x7e]\x00){4,}', content)
+    text = '\n'.join(run.decode('utf-16-le', 'ignore') for run in runs)
+    if not text.strip():
+        text = '\n'.join(run.decode('latin-1') for run in re.findall(rb'[\x20-\x7e]{4,}', content))
+    lines = text.splitlines()
+    return '\n'.join(lines[:max_pages * 50]), max(1, -(-len(lines) // 50))
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """
+    Split CV text into sections by recognisable headings
+    """
+    sections: Dict[str, List[str]] = {name: [] for name in SECTION_PATTERNS}
+    current: Optional[str] = None
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        heading = line.rstrip(':').strip()
+        matched = None
+        # Headings are short lines; body text mentioning "research" is not a heading
+        if len(heading) <= 40:
+            for name, pattern in SECTION_PATTERNS.items():
+                if pattern.match(heading):
+                    matched = name
+                    break
+        if matched:
+            current = matched
+            remainder = line[len(heading):].lstrip(':').strip()
+            if remainder:
+                sections[current].append(remainder)
+        elif current:
+            sections[current].append(line)
+    return {name: '\n'.join(lines) for name, lines in sections.items()}
+
+
+def parse_cv(content: bytes, filename: str, max_pages: int, time_limit: float) -> Dict[str, Any]:
+    """
+    Extract text and sections from a CV. Runs in a worker process; the
+    alarm enforces the per-document time limit inside the worker.
+    """
+    use_alarm = hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _alarm_handler)
+        signal.setitimer(signal.ITIMER_REAL, time_limit)
+    try:
+        if content.startswith(b'%PDF'):
+            text, pages = _pdf_text(content, max_pages)
+            document_type = 'pdf'
+        elif content.startswith(b'PK\x03\x04'):
+            text, pages = _docx_text(content, max_pages)
+            document_type = 'docx'
+        elif content.startswith(b'\xd0\xcf\x11\xe0'):
+            text, pages = _legacy_doc_text(content, max_pages)
+            document_type = 'doc'
+        else:
+            raise ValueError(f"Unsupported document format: {filename}")
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    return {
+        'document_type': document_type,
+        'pages': pages,
+        'truncated': pages > max_pages,
+        'text': text,
+        'sections': split_sections(text)
+    }
+
+
+class CVExtractor:
+    """
+    Parses uploaded CVs off the event loop.
+
+    PDF/DOCX parsing runs in a process pool with per-document page and time
+    limits; results are cached by content hash so re-uploading the same file
+    returns immediately.
+    """
+
+    def __init__(self, workers: Optional[int] = None, time_limit: Optional[float] = None,
+                 max_pages: Optional[int] = None, cache_size: Optional[int] = None):
+        self.workers = workers or int(os.getenv('CV_WORKERS', 2))
+        self.time_limit = time_limit or float(os.getenv('CV_PARSE_TIMEOUT', 10))
+        self.max_pages = max_pages or int(os.getenv('CV_MAX_PAGES', 20))
+        self.cache_size = cache_size or int(os.getenv('CV_CACHE_SIZE', 256))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _reset_pool(self):
+        """Drop a pool whose worker hung or died so the next document gets a fresh one"""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            for process in list(getattr(pool, '_processes', {}).values()):
+                process.terminate()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def content_hash(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def cached(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        result = self._cache.get(content_hash)
+        if result is not None:
+            self._cache.move_to_end(content_hash)
+        return result
+
+    async def extract(self, content: bytes, filename: str) -> Dict[str, Any]:
+        """
+        Parse a CV and return its text and sections, keyed by content hash
+        """
+        content_hash = self.content_hash(content)
+        result = self.cached(content_hash)
+        if result is not None:
+            return result
+
+        # Concurrent uploads of the same file share one parse
+        if content_hash in self._inflight:
+            return await asyncio.shield(self._inflight[content_hash])
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[content_hash] = future
+        try:
+            try:
+                parsed = await asyncio.wait_for(
+                    loop.run_in_executor(self._get_pool(), parse_cv, content, filename, self.max_pages, self.time_limit),
+                    # The worker enforces the limit itself; this is the backstop
+                    timeout=self.time_limit + 2
+                )
+            except ParseTimeout:
+                raise CVExtractionError(f"Parsing {filename} exceeded {self.time_limit:g}s")
+            except asyncio.TimeoutError:
+                self._reset_pool()
+                raise CVExtractionError(f"Parsing {filename} exceeded {self.time_limit:g}s")
+            except BrokenProcessPool:
+                self._reset_pool()
+                raise CVExtractionError(f"CV parser worker crashed on {filename}")
+            except Exception as e:
+                raise CVExtractionError(f"Could not parse {filename}: {e}")
+
+            parsed['content_hash'] = content_hash
+            self._cache[content_hash] = parsed
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            future.set_result(parsed)
+            return parsed
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so waiters-less failures do not log "never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(content_hash, None)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
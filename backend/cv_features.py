@@ -0,0 +1,311 @@
+import math
+import re
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Pattern, Set
+
+import numpy as np
+
+# Research vocabulary matched against CV text and university research areas
+RESEARCH_KEYWORDS = [
+    'machine learning', 'deep learning', 'artificial intelligence', 'natural language processing',
+    'computer vision', 'robotics', 'data science', 'statistics', 'bioinformatics', 'genomics',
+    'neuroscience', 'quantum', 'cybersecurity', 'distributed systems', 'databases', 'networks',
+    'human-computer interaction', 'computer science', 'software engineering', 'mathematics', 'physics',
+    'chemistry', 'biology', 'medicine', 'public health', 'economics', 'finance', 'business',
+    'psychology', 'sociology', 'political science', 'education', 'law', 'environmental science',
+    'climate', 'energy', 'materials science', 'mechanical engineering', 'electrical engineering',
+    'civil engineering', 'chemical engineering', 'biomedical engineering', 'aerospace', 'architecture',
+    'linguistics', 'history', 'philosophy', 'art', 'music', 'ethics', 'healthcare', 'agriculture'
+]
+
+# Whole-word matching so "art" does not fire on "start"
+KEYWORD_PATTERNS = [(keyword, re.compile(r'\b' + re.escape(keyword) + r'\b')) for keyword in RESEARCH_KEYWORDS]
+KEYWORD_PATTERN_BY_TERM = dict(KEYWORD_PATTERNS)
+
+# Numeric features, in vector order
+FEATURE_NAMES = [
+    'publication_count', 'years_experience', 'gpa', 'gre', 'toefl', 'ielts', 'gmat', 'research_keyword_count'
+]
+
+# Score ranges used to put test scores on a 0-1 scale
+SCORE_RANGES = {'gre': (260, 340), 'toefl': (0, 120), 'ielts': (0, 9), 'gmat': (200, 800)}
+TEST_SCORE_PATTERNS = {
+    'gre': re.compile(r'\bGRE\b[^0-9]{0,20}(\d{3})'),
+    'toefl': re.compile(r'\bTOEFL\b[^0-9]{0,20}(\d{2,3})'),
+    'ielts': re.compile(r'\bIELTS\b[^0-9]{0,20}(\d(?:\.\d)?)'),
+    'gmat': re.compile(r'\bGMAT\b[^0-9]{0,20}(\d{3})'),
+}
+GPA_PATTERN = re.compile(r'\bGPA\b[^0-9]{0,10}(\d(?:\.\d+)?)\s*/\s*(\d(?:\.\d+)?)', re.I)
+YEAR_RANGE_PATTERN = re.compile(
+    r'\b((?:19|20)\d{2})\s*(?:-|–|—|to)\s*((?:19|20)\d{2}|present|current|now)\b', re.I
+)
+PUBLICATION_ENTRY_PATTERN = re.compile(r'((?:19|20)\d{2})|"[^"]{10,}"|“[^”]{10,}”|\bdoi\b|\barXiv\b', re.I)
+
+
+def _clip01(value: float) -> float:
+    return max(0.0, min(1.0, value))
+
+
+def _as_float(value: Any) -> float:
+    """DB values arrive as Decimal, numbers or placeholder strings ("Not specified")"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def parse_test_scores(text: str) -> Dict[str, float]:
+    """
+    Pull GRE/TOEFL/IELTS/GMAT scores and a GPA (as a 0-1 fraction) out of free text
+    """
+    scores: Dict[str, float] = {}
+    for name, pattern in TEST_SCORE_PATTERNS.items():
+        match = pattern.search(text or '')
+        if match:
+            low, high = SCORE_RANGES[name]
+            value = float(match.group(1))
+            if low <= value <= high:
+                scores[name] = value
+    match = GPA_PATTERN.search(text or '')
+    if match and float(match.group(2)) > 0:
+        scores['gpa'] = _clip01(float(match.group(1)) / float(match.group(2)))
+    return scores
+
+
+def parse_gpa(gpa: str) -> Optional[float]:
+    """GPA strings like "3.78/4.00" or "3.5" as a 0-1 fraction"""
+    match = re.match(r'\s*(\d+(?:\.\d+)?)\s*(?:/\s*(\d+(?:\.\d+)?))?', gpa or '')
+    if not match:
+        return None
+    value = float(match.group(1))
+    scale = float(match.group(2)) if match.group(2) else (4.0 if value <= 4.0 else 10.0 if value <= 10 else 100.0)
+    return _clip01(value / scale) if scale else None
+
+
+def research_keywords(text: str) -> List[str]:
+    lowered = (text or '').lower()
+    return [keyword for keyword, pattern in KEYWORD_PATTERNS if pattern.search(lowered)]
+
+
+def years_of_experience(text: str) -> float:
+    """Sum of date ranges in the experience section, overlapping ranges merged"""
+    current_year = datetime.now().year
+    spans = []
+    for start, end in YEAR_RANGE_PATTERN.findall(text or ''):
+        end_year = current_year if not end[:1].isdigit() else int(end)
+        if int(start) <= end_year <= current_year:
+            spans.append((int(start), max(end_year, int(start) + 1)))
+    total = 0
+    covered_until = None
+    for start, end in sorted(spans):
+        if covered_until is not None and start < covered_until:
+            start = covered_until
+        if end > start:
+            total += end - start
+            covered_until = end
+    return float(min(total, 40))
+
+
+def publication_count(text: str) -> int:
+    """Count publication-like entries (lines with a year, a quoted title, a DOI or arXiv id)"""
+    return sum(1 for line in (text or '').splitlines() if len(line.strip()) > 20 and PUBLICATION_ENTRY_PATTERN.search(line))
+
+
+def extract_cv_features(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn a parsed CV (text plus sections) into compact features
+    """
+    sections = parsed.get('sections', {})
+    text = parsed.get('text', '')
+    keyword_text = '\n'.join([sections.get('research', ''), sections.get('publications', ''),
+                              sections.get('skills', ''), sections.get('experience', '')])
+    keywords = research_keywords(keyword_text or text)
+    scores = parse_test_scores(text)
+
+    features = {
+        'research_keywords': keywords,
+        'publication_count': publication_count(sections.get('publications', '')),
+        'years_experience': years_of_experience(sections.get('experience', '')),
+        'test_scores': scores
+    }
+    # Serialized with the analysis; JSON has no NaN, so missing scores are stored as 0
+    features['vector'] = np.nan_to_num(feature_vector(features), nan=0.0).tolist()
+    return features
+
+
+def term_pattern(term: str) -> Pattern:
+    """Whole-word pattern for a research term, shared with research_keywords for known keywords"""
+    return KEYWORD_PATTERN_BY_TERM.get(term) or re.compile(r'\b' + re.escape(term) + r'\b')
+
+
+def research_text(university: Dict[str, Any]) -> str:
+    """Lowercased research areas and program strengths that student terms are matched against"""
+    return (' '.join(university.get('research_areas') or []) + ' ' + str(university.get('program_strengths') or '')).lower()
+
+
+def feature_vector(features: Dict[str, Any]) -> np.ndarray:
+    """
+    Fixed-length numeric vector in FEATURE_NAMES order; missing scores are NaN
+    """
+    scores = features.get('test_scores', {})
+    return np.array([
+        features.get('publication_count', 0),
+        features.get('years_experience', 0.0),
+        scores.get('gpa', np.nan),
+        scores.get('gre', np.nan),
+        scores.get('toefl', np.nan),
+        scores.get('ielts', np.nan),
+        scores.get('gmat', np.nan),
+        len(features.get('research_keywords', []))
+    ], dtype=np.float64)
+
+
+class ProfileScorer:
+    """
+    Vectorized personal-fit scorer combining StudentProfile fields with CV features.
+
+    Scores every candidate at once from research overlap, academic fit
+    (applicant strength vs. university selectivity) and funding fit, so the
+    engine can rank candidates without another LLM round-trip.
+
+    Research text is matched against each term once per university: rows are
+    registered the first time a university is scored and term columns (whole-word
+    matches over every row) are cached, so scoring gathers a universities x terms
+    matrix with NumPy indexing. Call forget() when a university's research areas change;
+    its row is re-read in place the next time it is scored.
+    """
+
+    weights = {'research': 0.4, 'academic': 0.35, 'funding': 0.25}
+
+    def __init__(self, max_cached_terms: int = 2048):
+        self.max_cached_terms = max_cached_terms
+        self._rows: Dict[Any, int] = {}
+        self._texts: List[str] = []
+        self._columns: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._stale: Set[int] = set()
+
+    def forget(self, university_id: Any):
+        """Mark a university's cached research text stale; its row is refreshed the next time it is scored"""
+        row = self._rows.get(university_id)
+        if row is not None:
+            self._stale.add(row)
+
+    def _row_indices(self, universities: List[Dict[str, Any]]) -> np.ndarray:
+        start = len(self._texts)
+        refreshed: List[int] = []
+        for uni in universities:
+            row = self._rows.get(uni.get('id'))
+            if row is None:
+                self._rows[uni.get('id')] = len(self._texts)
+                self._texts.append(research_text(uni))
+            elif row in self._stale:
+                self._stale.discard(row)
+                self._texts[row] = research_text(uni)
+                refreshed.append(row)
+
+        if refreshed:
+            # Recompute the stale rows' entries in every cached column, in place
+            stale_rows = np.array(refreshed, dtype=np.intp)
+            for term, column in self._columns.items():
+                pattern = term_pattern(term)
+                column[stale_rows] = [pattern.search(self._texts[row]) is not None for row in refreshed]
+        if len(self._texts) > start:
+            # Extend cached columns with the new rows
+            for term, column in self._columns.items():
+                pattern = term_pattern(term)
+                added = np.fromiter((pattern.search(text) is not None for text in self._texts[start:]),
+                                    dtype=bool, count=len(self._texts) - start)
+                self._columns[term] = np.concatenate([column, added])
+        return np.fromiter((self._rows[uni.get('id')] for uni in universities), dtype=np.intp, count=len(universities))
+
+    def _term_column(self, term: str) -> np.ndarray:
+        column = self._columns.get(term)
+        if column is None:
+            pattern = term_pattern(term)
+            column = np.fromiter((pattern.search(text) is not None for text in self._texts),
+                                 dtype=bool, count=len(self._texts))
+            self._columns[term] = column
+            if len(self._columns) > self.max_cached_terms:
+                self._columns.popitem(last=False)
+        else:
+            self._columns.move_to_end(term)
+        return column
+
+    def applicant_strength(self, profile: Dict[str, Any], features: Optional[Dict[str, Any]]) -> float:
+        """Applicant strength on a 0-1 scale from GPA, test scores, publications and experience"""
+        scores = dict((features or {}).get('test_scores', {}))
+        scores.update(parse_test_scores(profile.get('test_scores') or ''))
+        gpa = parse_gpa(profile.get('gpa', ''))
+        if gpa is not None:
+            scores['gpa'] = gpa
+
+        components = []
+        if 'gpa' in scores:
+            components.append(scores['gpa'])
+        for name, (low, high) in SCORE_RANGES.items():
+            if name in scores:
+                components.append(_clip01((scores[name] - low) / (high - low)))
+        strength = float(np.mean(components)) if components else 0.6
+
+        if features:
+            # Research output and experience lift strength, up to +0.15
+            strength += 0.1 * _clip01(features.get('publication_count', 0) / 5)
+            strength += 0.05 * _clip01(features.get('years_experience', 0) / 5)
+        return _clip01(strength)
+
+    def score(self, universities: List[Dict[str, Any]], profile: Dict[str, Any],
+              features: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """
+        Personal-fit score (0-100) for each university, in input order
+        """
+        if not universities:
+            return np.zeros(0)
+
+        # Research overlap: universities x keywords matrix against the student's keyword weights
+        interests = ' '.join([profile.get('field_of_interest', ''), profile.get('research_interests', '')])
+        student_keywords = set(research_keywords(interests)) | set((features or {}).get('research_keywords', []))
+        free_terms = [term.strip().lower() for term in re.split(r'[,;]', interests) if len(term.strip()) > 2]
+        terms = sorted(student_keywords | set(free_terms))
+        if terms:
+            rows = self._row_indices(universities)
+            matrix = np.column_stack([self._term_column(term) for term in terms])[rows].astype(np.float64)
+            weights = np.array([2.0 if term in student_keywords else 1.0 for term in terms])
+            research = matrix @ weights / weights.sum()
+            # A couple of strong overlaps already make a good fit
+            research = np.minimum(1.0, research * 3)
+        else:
+            research = np.full(len(universities), 0.5)
+
+        # Selectivity from ranking (log scale) and admission rate, averaged where known
+        rankings = np.array([_as_float(uni.get('ranking')) for uni in universities])
+        rates = np.array([_as_float(uni.get('admission_rate')) for uni in universities])
+        signals = np.vstack([
+            1 - np.log(np.clip(rankings, 1, 2000)) / math.log(2000),
+            1 - np.clip(rates, 0, 100) / 100
+        ])
+        known = ~np.isnan(signals)
+        selectivity = np.where(
+            known.any(axis=0),
+            np.nansum(signals, axis=0) / np.maximum(known.sum(axis=0), 1),
+            0.5
+        )
+
+        strength = self.applicant_strength(profile, features)
+        # Being stronger than a school demands costs less than falling short of it
+        gap = strength - selectivity
+        academic = np.clip(1 - np.where(gap >= 0, 0.5 * gap, -1.5 * gap), 0, 1)
+
+        budget = profile.get('budget_preference', '')
+        if budget in ('full-funding', 'partial-funding'):
+            scholarships = np.array([bool(uni.get('scholarship_available')) for uni in universities], dtype=np.float64)
+            tuition = np.array([_as_float(uni.get('tuition_fee')) for uni in universities])
+            affordability = np.where(np.isnan(tuition), 0.5, 1 - np.clip(tuition, 0, 70000) / 70000)
+            funding = 0.7 * scholarships + 0.3 * affordability
+        else:
+            funding = np.full(len(universities), 0.75)
+
+        combined = (self.weights['research'] * research
+                    + self.weights['academic'] * academic
+                    + self.weights['funding'] * funding)
+        return np.round(100 * combined, 1)
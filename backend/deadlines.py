@@ -0,0 +1,82 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised when too little of a request's deadline is left to start an LLM call"""
+
+
+class Deadline:
+    """
+    End-to-end time budget of one request, as an absolute monotonic time
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self, reserve: float = 0.0) -> float:
+        """Seconds left, keeping reserve seconds back for later steps"""
+        return max(0.0, self.expires_at - time.monotonic() - reserve)
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+class LatencyTracker:
+    """
+    Rolling window of call latencies per key, used to pick hedging thresholds
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self.samples: Dict[str, Deque[float]] = {}
+
+    def observe(self, key: str, seconds: float):
+        self.samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, key: str, percentile: float) -> Optional[float]:
+        """Latency percentile for key, or None until min_samples calls have been seen"""
+        samples = self.samples.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+
+async def hedged(call: Callable[[], Awaitable[T]], hedge_after: Optional[float],
+                 can_hedge: Callable[[], bool] = lambda: True) -> Tuple[T, Optional[str]]:
+    """
+    Run call(); if it has not finished after hedge_after seconds (and can_hedge()
+    allows it), start a second identical call and take whichever succeeds first.
+    Returns (result, winner): winner is None when no hedge was fired, else
+    "primary" or "hedge". The losing call is cancelled.
+    """
+    primary = asyncio.ensure_future(call())
+    tasks = [primary]
+    try:
+        if hedge_after is None:
+            return await primary, None
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if done or not can_hedge():
+            return await primary, None
+
+        tasks.append(asyncio.ensure_future(call()))
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), "primary" if task is primary else "hedge"
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
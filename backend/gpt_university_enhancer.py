@@ -1,19 +1,72 @@
 import asyncio
-import json
 import os
 from typing import Dict, List, Any, Optional
+import httpx
 from openai import AsyncOpenAI
 
+from prompt_budget import compact_json
+from structured_output import (
+    JSON_MODE, PROGRAM_SHAPE, UNIVERSITY_LIST_SHAPE, UNIVERSITY_SHAPE, ProgramDetails,
+    UniversityData, UniversityListItem, parse_with_repair, unwrap, validate, validate_items
+)
+
 class GPTUniversityEnhancer:
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         """
         Initialize the GPT University Enhancer with OpenRouter configuration
         """
-        self.client = AsyncOpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=os.getenv("OPENROUTER_API_KEY", "your-openrouter-api-key")
-        )
+        self.http_client = http_client
+        self._client: Optional[AsyncOpenAI] = None
         self.model = "openai/gpt-3.5-turbo"
+        self.json_mode = os.getenv("LLM_JSON_MODE", "true").lower() == "true"
+    
+    @property
+    def client(self) -> AsyncOpenAI:
+        """
+        OpenRouter client, built on first use so it is created once, on the
+        shared HTTP client when one has been given by then
+        """
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                base_url=os.getenv("OPENROUTER_API_BASE", "https://openrouter.ai/api/v1"),
+                api_key=os.getenv("OPENROUTER_API_KEY", "your-openrouter-api-key"),
+                timeout=float(os.getenv("LLM_REQUEST_TIMEOUT", 30)),
+                max_retries=int(os.getenv("LLM_MAX_RETRIES", 1)),
+                http_client=self.http_client
+            )
+        return self._client
+    
+    async def use_http_client(self, http_client: httpx.AsyncClient):
+        """
+        Send later calls through a shared HTTP client. A client already built on
+        its own connection pool is closed; a shared pool is left to its owner
+        """
+        if self._client is not None and self.http_client is None:
+            await self._client.close()
+        self._client = None
+        self.http_client = http_client
+    
+    async def _complete(self, messages: List[Dict[str, str]], temperature: float = 0.0, max_tokens: int = 1000) -> str:
+        """
+        One chat completion, in JSON mode where enabled
+        """
+        extra = {"response_format": JSON_MODE} if self.json_mode else {}
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **extra
+        )
+        return response.choices[0].message.content or ""
+    
+    async def _complete_structured(self, messages: List[Dict[str, str]], parse, shape: str,
+                                   temperature: float, max_tokens: int) -> Any:
+        """
+        Complete, then parse and validate the reply, asking for one repair if it is malformed
+        """
+        content = await self._complete(messages, temperature, max_tokens)
+        return await parse_with_repair(content, parse, lambda repair: self._complete(repair, 0.0, max_tokens), shape)
     
     async def generate_university_data(self, university_name: str, country: str, field: str = "Computer Science") -> Optional[Dict[str, Any]]:
         """
@@ -46,27 +99,17 @@ class GPTUniversityEnhancer:
             Make the data realistic and comprehensive.
             """
             
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
+            return await self._complete_structured(
+                [
                     {"role": "system", "content": "You are a university data expert. Generate accurate and comprehensive university information in JSON format."},
                     {"role": "user", "content": prompt}
                 ],
+                lambda data: validate(data, UniversityData),
+                UNIVERSITY_SHAPE,
                 temperature=0.7,
                 max_tokens=1000
             )
             
-            content = response.choices[0].message.content
-            # Extract JSON from the response
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = content[start_idx:end_idx]
-                return json.loads(json_str)
-            
-            return None
-            
         except Exception as e:
             print(f"Error generating university data: {e}")
             return None
@@ -79,7 +122,7 @@ class GPTUniversityEnhancer:
             prompt = f"""
             Enhance the following university data with more detailed and comprehensive information:
             
-            Current data: {json.dumps(university_data, indent=2)}
+            Current data: {compact_json(university_data)}
             
             Add or improve the following fields if missing or incomplete:
             - research_areas (list of 3-5 areas)
@@ -91,27 +134,18 @@ class GPTUniversityEnhancer:
             Return the enhanced data as a complete JSON object with all original fields plus improvements.
             """
             
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
+            return await self._complete_structured(
+                [
                     {"role": "system", "content": "You are a university data expert. Enhance university information while preserving existing accurate data."},
                     {"role": "user", "content": prompt}
                 ],
+                # Keep the original fields if the model drops any
+                lambda data: validate({**university_data, **data} if isinstance(data, dict) else data, UniversityData),
+                UNIVERSITY_SHAPE,
                 temperature=0.7,
                 max_tokens=1200
             )
             
-            content = response.choices[0].message.content
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = content[start_idx:end_idx]
-                enhanced_data = json.loads(json_str)
-                return enhanced_data
-            
-            return university_data
-            
         except Exception as e:
             print(f"Error enhancing university data: {e}")
             return university_data
@@ -126,39 +160,32 @@ class GPTUniversityEnhancer:
             prompt = f"""
             Generate a list of the top {count} universities for {field} studies{location_filter}.
             
-            Return a JSON array with the following structure:
-            [
-                {{
-                    "name": "<university name>",
-                    "country": "<country>",
-                    "ranking": <global ranking for this field>
-                }},
-                ...
-            ]
+            Return a JSON object with the following structure:
+            {{
+                "universities": [
+                    {{
+                        "name": "<university name>",
+                        "country": "<country>",
+                        "ranking": <global ranking for this field>
+                    }},
+                    ...
+                ]
+            }}
             
             Focus on universities with strong {field} programs.
             """
             
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a university ranking expert. Provide accurate university rankings for specific fields."},
+            return await self._complete_structured(
+                [
+                    {"role": "system", "content": "You are a university ranking expert. Provide accurate university rankings for specific fields in JSON format."},
                     {"role": "user", "content": prompt}
                 ],
+                lambda data: validate_items(unwrap(data, "universities"), UniversityListItem)[0],
+                UNIVERSITY_LIST_SHAPE,
                 temperature=0.5,
                 max_tokens=800
             )
             
-            content = response.choices[0].message.content
-            start_idx = content.find('[')
-            end_idx = content.rfind(']') + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = content[start_idx:end_idx]
-                return json.loads(json_str)
-            
-            return []
-            
         except Exception as e:
             print(f"Error generating university list: {e}")
             return []
@@ -189,26 +216,17 @@ class GPTUniversityEnhancer:
             Make the information comprehensive and realistic.
             """
             
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an academic program expert. Generate detailed and accurate program information."},
+            return await self._complete_structured(
+                [
+                    {"role": "system", "content": "You are an academic program expert. Generate detailed and accurate program information in JSON format."},
                     {"role": "user", "content": prompt}
                 ],
+                lambda data: validate(data, ProgramDetails),
+                PROGRAM_SHAPE,
                 temperature=0.6,
                 max_tokens=1000
             )
             
-            content = response.choices[0].message.content
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = content[start_idx:end_idx]
-                return json.loads(json_str)
-            
-            return None
-            
         except Exception as e:
             print(f"Error generating program details: {e}")
             return None
\ No newline at end of file
@@ -0,0 +1,166 @@
+import gzip
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional, gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "text/",
+)
+
+# Suffixes the compression middleware appends to strong ETags so each encoded
+# representation has its own validator.
+ENCODING_ETAG_SUFFIXES = ("-br", "-gzip")
+
+
+def catalog_etag(request: Request, catalog_version: str) -> str:
+    """
+    Build a strong ETag for a read endpoint from the catalog version and the request URL
+    """
+    key = f"{catalog_version}|{request.url.path}|{request.url.query}"
+    return '"' + hashlib.sha1(key.encode('utf-8')).hexdigest() + '"'
+
+
+def _strip_encoding_suffix(etag: str) -> str:
+    etag = etag.strip()
+    if etag.startswith('W/'):
+        etag = etag[2:]
+    for suffix in ENCODING_ETAG_SUFFIXES:
+        if etag.endswith(suffix + '"'):
+            return etag[:-len(suffix) - 1] + '"'
+    return etag
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Check If-None-Match against an ETag, ignoring content-encoding suffixes
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {_strip_encoding_suffix(tag) for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+def not_modified_response(etag: str) -> Response:
+    """
+    Empty 304 response carrying the validator
+    """
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+class CompressionMiddleware:
+    """
+    Negotiated brotli/gzip compression for buffered responses above a size threshold.
+
+    Streaming responses (more than one body message) are passed through
+    untouched so NDJSON consumers still see rows as soon as they are written.
+    Every other compressible response carries Vary: Accept-Encoding, including
+    the ones sent uncompressed, so shared caches key on the request encoding.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder)
+
+    def _negotiate(self, accept_encoding: str) -> Optional[str]:
+        offered = {}
+        for part in accept_encoding.lower().split(","):
+            token, _, params = part.strip().partition(";")
+            quality = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            if token:
+                offered[token] = quality
+
+        if brotli is not None and offered.get("br", 0) > 0:
+            return "br"
+        if offered.get("gzip", 0) > 0:
+            return "gzip"
+        return None
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: Optional[str], send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            if "content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+                self.passthrough = True
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough or self.start_message is None:
+            await self._flush_start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        if message.get("more_body", False):
+            # Streaming responses are never compressed
+            self.passthrough = True
+            await self._flush_start()
+            await self.send(message)
+            return
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers.add_vary_header("Accept-Encoding")
+        if self.encoding is None or len(body) < self.middleware.minimum_size:
+            await self._flush_start()
+            await self.send(message)
+            return
+
+        compressed = self.middleware.compress(self.encoding, body)
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(compressed))
+        etag = headers.get("etag")
+        if etag and etag.endswith('"') and not etag.startswith("W/"):
+            headers["ETag"] = etag[:-1] + f'-{self.encoding}"'
+        await self._flush_start()
+        await self.send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+    async def _flush_start(self) -> None:
+        if self.start_message is not None:
+            await self.send(self.start_message)
+            self.start_message = None
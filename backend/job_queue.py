@@ -0,0 +1,344 @@
+import asyncio
+import itertools
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, asdict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fast_json_response import dumps
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_TIMED_OUT = "timed_out"
+JOB_CANCELLED = "cancelled"
+
+FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED, JOB_TIMED_OUT, JOB_CANCELLED)
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+class UnknownJobKindError(Exception):
+    """Raised when a job is submitted for a kind with no registered handler"""
+
+
+class InvalidJobOptionsError(ValueError):
+    """Raised when a job is submitted with an unusable timeout or priority"""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    priority: int = 0
+    timeout: float = 120.0
+    status: str = JOB_QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    expires_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("payload")
+        if not include_result:
+            data.pop("result")
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        return cls(**data)
+
+
+class JobStore(ABC):
+    """
+    Persistence for job state and results. Operations are awaited from the
+    event loop, so implementations must not block it with network or disk I/O.
+    """
+
+    @abstractmethod
+    async def save(self, job: Job) -> None:
+        ...
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Job]:
+        ...
+
+    @abstractmethod
+    async def purge_expired(self, now: float) -> int:
+        ...
+
+
+class InMemoryJobStore(JobStore):
+    """Single-process store; results vanish on restart"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+
+    async def save(self, job: Job) -> None:
+        self._jobs[job.id] = job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def purge_expired(self, now: float) -> int:
+        expired = [job_id for job_id, job in self._jobs.items() if job.expires_at and job.expires_at <= now]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return len(expired)
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Local durable store so results survive a worker restart. sqlite3 calls
+    block, so each one runs in a worker thread.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                expires_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_expires_at ON jobs (expires_at)")
+        self._conn.commit()
+
+    async def save(self, job: Job) -> None:
+        # Serialize on the loop so the thread writes a consistent snapshot
+        data = dumps(asdict(job)).decode('utf-8')
+        await asyncio.to_thread(self._save, job.id, data, job.expires_at)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        row = await asyncio.to_thread(self._get, job_id)
+        return Job.from_dict(json.loads(row[0])) if row else None
+
+    async def purge_expired(self, now: float) -> int:
+        return await asyncio.to_thread(self._purge_expired, now)
+
+    def _save(self, job_id: str, data: str, expires_at: Optional[float]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, data, expires_at) VALUES (?, ?, ?)",
+                (job_id, data, expires_at)
+            )
+            self._conn.commit()
+
+    def _get(self, job_id: str):
+        with self._lock:
+            return self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+    def _purge_expired(self, now: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            self._conn.commit()
+            return cursor.rowcount
+
+
+class RedisJobStore(JobStore):
+    """
+    Shared store for multi-node deployments: any node can answer status and
+    result polls. Works with Redis or any server speaking its protocol.
+    Expiry is delegated to key TTLs.
+    """
+
+    def __init__(self, url: str, prefix: str = "jobs:"):
+        import redis.asyncio  # Optional dependency (pip install redis), only needed for this store
+
+        self._client = redis.asyncio.Redis.from_url(url)
+        self._prefix = prefix
+
+    async def save(self, job: Job) -> None:
+        ttl = None
+        if job.expires_at:
+            ttl = max(1, int(job.expires_at - time.time()))
+        await self._client.set(self._prefix + job.id, dumps(asdict(job)), ex=ttl)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        data = await self._client.get(self._prefix + job_id)
+        return Job.from_dict(json.loads(data)) if data else None
+
+    async def purge_expired(self, now: float) -> int:
+        return 0
+
+    async def close(self):
+        await self._client.aclose()
+
+
+def create_job_store() -> JobStore:
+    """
+    Build the job store selected by JOB_STORE (memory, sqlite or redis)
+    """
+    backend = os.getenv("JOB_STORE", "memory").lower()
+    if backend == "sqlite":
+        return SQLiteJobStore(os.getenv("JOB_SQLITE_PATH", "jobs.sqlite3"))
+    if backend == "redis":
+        return RedisJobStore(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    return InMemoryJobStore()
+
+
+class JobQueue:
+    """
+    Bounded, prioritized background job runner.
+
+    Jobs with a higher priority run first; equal priorities run in submission
+    order. Each job runs under its own timeout and its result is retained for
+    result_retention seconds after it finishes. Client-supplied timeouts are
+    capped at max_timeout and priorities clamped to [-max_priority, max_priority].
+    """
+
+    def __init__(self, store: JobStore, workers: int = 4, max_queue_size: int = 1000,
+                 default_timeout: float = 120.0, result_retention: float = 3600.0,
+                 max_timeout: float = 600.0, max_priority: int = 10):
+        self.store = store
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.default_timeout = default_timeout
+        self.result_retention = result_retention
+        self.max_timeout = max_timeout
+        self.max_priority = max_priority
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {}
+        self.validators: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks = []
+        self._sequence = itertools.count()
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any]], Awaitable[Any]],
+                 validator: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None):
+        """
+        Register the coroutine that runs jobs of the given kind. The optional
+        validator runs at submit time and returns the normalized payload.
+        """
+        self.handlers[kind] = handler
+        if validator:
+            self.validators[kind] = validator
+
+    async def start(self):
+        self._queue = asyncio.PriorityQueue(maxsize=self.max_queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._cleanup_loop()))
+
+    async def stop(self):
+        """
+        Cancel the workers and mark every job still queued or running as
+        cancelled, so pollers get a final status and the purge removes them
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        while self._queue is not None and not self._queue.empty():
+            _, _, job = self._queue.get_nowait()
+            await self._finish(job, JOB_CANCELLED, "Job was cancelled because the server shut down")
+
+        close = getattr(self.store, "close", None)
+        if close is not None:
+            await close()
+
+    async def submit(self, kind: str, payload: Dict[str, Any], priority: int = 0, timeout: Optional[float] = None) -> Job:
+        """
+        Validate and enqueue a job, returning it in the queued state
+        """
+        if kind not in self.handlers:
+            raise UnknownJobKindError(kind)
+        if kind in self.validators:
+            payload = self.validators[kind](payload)
+        if timeout is None:
+            timeout = self.default_timeout
+        elif not math.isfinite(timeout) or timeout <= 0:
+            raise InvalidJobOptionsError(f"Job timeout must be a positive number of seconds, got {timeout}")
+
+        job = Job(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            payload=payload,
+            priority=max(-self.max_priority, min(priority, self.max_priority)),
+            timeout=min(timeout, self.max_timeout)
+        )
+        if self._queue.full():
+            raise QueueFullError(f"Job queue is full ({self.max_queue_size} jobs)")
+        # Persist before enqueueing so a worker's "running" write cannot be
+        # overtaken by this "queued" one
+        await self.store.save(job)
+        try:
+            self._queue.put_nowait((-job.priority, next(self._sequence), job))
+        except asyncio.QueueFull:
+            await self._finish(job, JOB_CANCELLED, "Job queue was full")
+            raise QueueFullError(f"Job queue is full ({self.max_queue_size} jobs)")
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self.store.get(job_id)
+
+    async def _worker(self):
+        while True:
+            _, _, job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        await self.store.save(job)
+
+        try:
+            job.result = await asyncio.wait_for(self.handlers[job.kind](job.payload), timeout=job.timeout)
+            await self._finish(job, JOB_SUCCEEDED)
+        except asyncio.TimeoutError:
+            await self._finish(job, JOB_TIMED_OUT, f"Job exceeded its {job.timeout:g}s timeout")
+        except asyncio.CancelledError:
+            await self._finish(job, JOB_CANCELLED, "Job was cancelled because the server shut down")
+            raise
+        except Exception as e:
+            await self._finish(job, JOB_FAILED, str(e))
+
+    async def _finish(self, job: Job, status: str, error: Optional[str] = None):
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        job.expires_at = job.finished_at + self.result_retention
+        await self.store.save(job)
+
+    async def _cleanup_loop(self):
+        while True:
+            await asyncio.sleep(60)
+            try:
+                purged = await self.store.purge_expired(time.time())
+                if purged:
+                    print(f"Purged {purged} expired jobs")
+            except Exception as e:
+                print(f"Error purging expired jobs: {e}")
+
+
+def create_job_queue() -> JobQueue:
+    """
+    Build the application job queue from environment configuration
+    """
+    return JobQueue(
+        store=create_job_store(),
+        workers=int(os.getenv("JOB_WORKERS", 4)),
+        max_queue_size=int(os.getenv("JOB_QUEUE_MAX_SIZE", 1000)),
+        default_timeout=float(os.getenv("JOB_DEFAULT_TIMEOUT", 120)),
+        result_retention=float(os.getenv("JOB_RESULT_RETENTION", 3600)),
+        max_timeout=float(os.getenv("JOB_MAX_TIMEOUT", 600)),
+        max_priority=int(os.getenv("JOB_MAX_PRIORITY", 10))
+    )
@@ -0,0 +1,71 @@
+import os
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from workflow_metrics import registry
+
+try:
+    import h2  # noqa: F401  (httpx negotiates HTTP/2 only when h2 is installed)
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+http_requests = registry.counter(
+    "llm_http_requests_total", "Requests sent by the shared LLM HTTP client, by whether they reused a pooled connection"
+)
+http_connections = registry.counter("llm_http_connections_opened_total", "Connections opened by the shared LLM HTTP client")
+http_connect_duration = registry.histogram(
+    "llm_http_connect_seconds", "Time to open a connection (TCP and TLS) for the shared LLM HTTP client"
+)
+
+
+class _ConnectionTrace:
+    """
+    httpcore trace callback for one request: notices whether it had to open a
+    new connection or went out on a pooled one
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        self.connected = False
+        self.connect_started: Optional[float] = None
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.started":
+            self.connected = True
+            self.connect_started = time.perf_counter()
+        elif event_name.endswith("send_request_headers.started"):
+            if self.connected:
+                # TCP connect, TLS handshake and protocol setup
+                http_connect_duration.observe(time.perf_counter() - self.connect_started, host=self.host)
+                http_connections.inc(host=self.host)
+            http_requests.inc(host=self.host, connection="new" if self.connected else "reused",
+                              protocol="http2" if event_name.startswith("http2") else "http1.1")
+
+
+async def _attach_trace(request: httpx.Request):
+    request.extensions["trace"] = _ConnectionTrace(request.url.host)
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    One keep-alive client (HTTP/2 when h2 is installed) shared by every LLM client
+    in the process, so calls reuse warm connections instead of each SDK client
+    keeping its own pool. Close it with aclose() on shutdown.
+    """
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", 100)),
+        max_keepalive_connections=int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", 20)),
+        keepalive_expiry=float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", 60))
+    )
+    http2 = H2_AVAILABLE and os.getenv("LLM_HTTP2", "true").lower() == "true"
+    if not H2_AVAILABLE:
+        print("h2 not installed; the shared LLM HTTP client uses HTTP/1.1 keep-alive")
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=limits,
+        timeout=httpx.Timeout(float(os.getenv("LLM_REQUEST_TIMEOUT", 30)), connect=10.0),
+        event_hooks={"request": [_attach_trace]}
+    )
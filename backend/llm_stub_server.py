@@ -0,0 +1,271 @@
+"""
+Offline OpenAI-compatible stub server for load testing.
+
+Serves /v1/chat/completions with configurable latency, token streaming,
+error and 429 injection, and canned JSON replies shaped like the ones the
+recommendation engine and GPT enhancer prompts expect. --malformed-rate
+garbles a share of JSON replies (curly quotes) to exercise the
+repair path; repair requests are answered with the corrected JSON. Point the backend at
+it with:
+
+    python llm_stub_server.py --port 8100 --latency-dist lognormal --latency-mean 0.8
+    OPENROUTER_API_BASE=http://localhost:8100/v1 OPENROUTER_API_KEY=stub uvicorn main:app
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@dataclass
+class StubConfig:
+    latency_dist: str = "fixed"      # fixed, uniform or lognormal
+    latency_mean: float = 0.5        # seconds
+    latency_spread: float = 0.5      # uniform half-width, or lognormal sigma
+    token_delay: float = 0.01        # seconds between streamed chunks
+    error_rate: float = 0.0          # fraction of requests answered with a 500
+    rate_limit_rate: float = 0.0     # fraction of requests answered with a 429
+    malformed_rate: float = 0.0      # fraction of JSON replies sent back malformed
+    seed: int = 42
+
+
+config = StubConfig()
+rng = random.Random(config.seed)
+app = FastAPI(title="LLM Stub Server")
+
+
+def sample_latency() -> float:
+    """Draw a response latency from the configured distribution"""
+    if config.latency_dist == "uniform":
+        return max(0.0, rng.uniform(config.latency_mean - config.latency_spread, config.latency_mean + config.latency_spread))
+    if config.latency_dist == "lognormal":
+        # Parameterized so the distribution's mean equals latency_mean
+        sigma = config.latency_spread
+        mu = math.log(max(config.latency_mean, 1e-6)) - sigma ** 2 / 2
+        return rng.lognormvariate(mu, sigma)
+    return config.latency_mean
+
+
+def count_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def _extract_json_after(marker: str, text: str) -> Any:
+    index = text.find(marker)
+    if index == -1:
+        return None
+    payload = text[index + len(marker):].strip()
+    try:
+        return json.loads(payload)
+    except json.JSONDecodeError:
+        match = re.search(r'(\[.*\]|\{.*\})', payload, re.S)
+        if match:
+            try:
+                return json.loads(match.group(1))
+            except json.JSONDecodeError:
+                return None
+    return None
+
+
+def canned_reply(messages: List[Dict[str, Any]]) -> str:
+    """Build a reply matching the prompt family of the request"""
+    system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system")
+    user = " ".join(m.get("content", "") for m in messages if m.get("role") != "system")
+
+    if "repair malformed JSON" in system:
+        index = user.find("Reply to fix:")
+        return user[index + len("Reply to fix:"):].strip().replace("\u201c", '"') if index != -1 else "{}"
+
+    if "university matching algorithm" in system:
+        universities = _extract_json_after("Universities to score:", user) or []
+        # Candidates arrive as objects or as compact [id, name, country] rows
+        ids = [uni.get("id") if isinstance(uni, dict) else uni[0] for uni in universities if isinstance(uni, (dict, list)) and uni]
+        scores = [{"university_id": university_id, "match_score": rng.randint(55, 98)} for university_id in ids]
+        return json.dumps({"scores": scores})
+
+    if "university ranking expert" in system:
+        count_match = re.search(r'top (\d+) universities for (.+?) studies', user)
+        count = int(count_match.group(1)) if count_match else 5
+        field = count_match.group(2) if count_match else "Computer Science"
+        return json.dumps({"universities": [
+            {"name": f"Stub University of {field} {i + 1}", "country": "United States", "ranking": i + 1}
+            for i in range(count)
+        ]})
+
+    if "academic program expert" in system:
+        match = re.search(r'about the (.+?) program at (.+?)\.', user)
+        program, university = (match.group(1), match.group(2)) if match else ("Computer Science", "Stub University")
+        return json.dumps({
+            "university_name": university,
+            "program_name": program,
+            "degree_type": "Master's",
+            "duration": "2 years",
+            "curriculum": ["Foundations", "Advanced Topics", "Thesis"],
+            "specializations": ["Machine Learning", "Systems"],
+            "admission_requirements": "Bachelor's degree; English proficiency",
+            "career_prospects": ["Research Scientist", "Engineer", "Consultant"],
+            "tuition_fee": "$35,000",
+            "application_deadline": "January 15",
+            "contact_info": "admissions@stub.edu"
+        })
+
+    if "university data expert" in system:
+        current = _extract_json_after("Current data:", user)
+        if isinstance(current, dict):
+            current.setdefault("research_areas", ["Computer Science", "Engineering", "Physics"])
+            current.setdefault("strengths", ["Research Excellence", "Industry Partnerships", "Alumni Network"])
+            current.setdefault("faculty_highlights", "Distinguished faculty across disciplines")
+            current.setdefault("campus_life", "Vibrant campus with diverse student organizations")
+            current.setdefault("description", f"{current.get('name', 'This university')} is a research university.")
+            return json.dumps(current)
+        match = re.search(r'data for (.+?) in (.+?) for (.+?) studies', user)
+        name, country, field = match.groups() if match else ("Stub University", "United States", "Computer Science")
+        return json.dumps({
+            "name": name,
+            "country": country,
+            "ranking": rng.randint(1, 500),
+            "tuition_fee": f"${rng.randint(5, 60) * 1000:,}",
+            "scholarship_available": True,
+            "program_name": f"{field} Program",
+            "duration": "2 years",
+            "requirements": "Bachelor's degree; English proficiency; Letters of recommendation",
+            "research_areas": [field, "Data Science", "Engineering"],
+            "faculty_highlights": "Award-winning faculty",
+            "campus_life": "Active campus community",
+            "application_deadline": "January 15",
+            "website": "https://www.stub.edu",
+            "description": f"{name} is a leading institution in {country}.",
+            "strengths": ["Research Excellence", "Global Recognition", "Career Services"],
+            "admission_rate": f"{rng.randint(5, 60)}%"
+        })
+
+    # Profile analysis and the user-facing summary are free text
+    return ("**Profile Summary**: Strong academic profile with clear research interests.\n\n"
+            "**Recommendations**: The matched universities align well with the stated goals.")
+
+
+def _completion(model: str, content: str, prompt_tokens: int) -> Dict[str, Any]:
+    completion_tokens = count_tokens(content)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+async def _stream(model: str, content: str, prompt_tokens: int):
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    words = re.findall(r'\S+\s*', content) or [content]
+    for i, word in enumerate(words):
+        delta = {"content": word}
+        if i == 0:
+            delta["role"] = "assistant"
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": None}]
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+        await asyncio.sleep(config.token_delay)
+    final = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": count_tokens(content),
+            "total_tokens": prompt_tokens + count_tokens(content)
+        }
+    }
+    yield f"data: {json.dumps(final)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.get("/v1/models")
+async def list_models():
+    return {"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "stub"}]}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "stub")
+    messages = body.get("messages", [])
+
+    roll = rng.random()
+    if roll < config.rate_limit_rate:
+        return JSONResponse(
+            status_code=429,
+            headers={"Retry-After": "1"},
+            content={"error": {"message": "Rate limit exceeded (stub)", "type": "rate_limit_error", "code": 429}}
+        )
+    if roll < config.rate_limit_rate + config.error_rate:
+        return JSONResponse(
+            status_code=500,
+            content={"error": {"message": "Injected server error (stub)", "type": "server_error", "code": 500}}
+        )
+
+    await asyncio.sleep(sample_latency())
+
+    content = canned_reply(messages)
+    repairing = any("repair malformed JSON" in (m.get("content") or "") for m in messages if m.get("role") == "system")
+    if content.startswith("{") and not repairing and rng.random() < config.malformed_rate:
+        content = content.replace('"', "\u201c")
+    prompt_tokens = sum(count_tokens(m.get("content") or "") for m in messages)
+    if body.get("stream"):
+        return StreamingResponse(_stream(model, content, prompt_tokens), media_type="text/event-stream")
+    return _completion(model, content, prompt_tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"], default=config.latency_dist)
+    parser.add_argument("--latency-mean", type=float, default=config.latency_mean)
+    parser.add_argument("--latency-spread", type=float, default=config.latency_spread)
+    parser.add_argument("--token-delay", type=float, default=config.token_delay)
+    parser.add_argument("--error-rate", type=float, default=config.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=config.rate_limit_rate)
+    parser.add_argument("--malformed-rate", type=float, default=config.malformed_rate)
+    parser.add_argument("--seed", type=int, default=config.seed)
+    args = parser.parse_args()
+
+    config.latency_dist = args.latency_dist
+    config.latency_mean = args.latency_mean
+    config.latency_spread = args.latency_spread
+    config.token_delay = args.token_delay
+    config.error_rate = args.error_rate
+    config.rate_limit_rate = args.rate_limit_rate
+    config.malformed_rate = args.malformed_rate
+    config.seed = args.seed
+    rng.seed(args.seed)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
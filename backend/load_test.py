@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test and benchmark harness for the FastAPI service.
+
+Boots main:app (and the offline LLM stub) as subprocesses against a local
+database, drives the main endpoints at a configurable concurrency, and
+writes throughput plus p50/p95/p99 latency per endpoint to a JSON file.
+Two result files can then be compared to flag regressions.
+
+    python load_test.py run --concurrency 16 --requests 400 --output results/current.json
+    python load_test.py run --seed-csv world-universities.csv --db-name universitydb_bench ...
+    python load_test.py compare results/baseline.json results/current.json --threshold 10
+"""
+import argparse
+import asyncio
+import csv
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SAMPLE_PROFILE = {
+    "degree_level": "masters",
+    "field_of_interest": "Natural Language Processing",
+    "gpa": "3.78/4.00",
+    "test_scores": "TOEFL 105, GRE 320",
+    "preferred_continent": "north-america",
+    "preferred_country": "no-preference",
+    "budget_preference": "partial-funding",
+    "research_interests": "AI for healthcare, Ethical AI",
+    "work_experience": "1 year RA at NLP lab",
+    "language_preference": "english-only",
+    "target_start_year": "2025",
+    "study_mode": "on-campus",
+    "career_goal": "industry"
+}
+
+SEARCH_QUERIES = ["university", "technology", "london", "computer", "medicine", "institute", "state", "college"]
+
+def build_minimal_pdf() -> bytes:
+    """Smallest well-formed one-page PDF (with xref table), used when no sample CV is available"""
+    objects = [
+        b"<</Type/Catalog/Pages 2 0 R>>",
+        b"<</Type/Pages/Kids[3 0 R]/Count 1>>",
+        b"<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]>>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj" % number + body + b"endobj\n"
+    xref_offset = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer<</Size %d/Root 1 0 R>>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return pdf
+
+
+MINIMAL_PDF = build_minimal_pdf()
+
+
+def load_sample_cv() -> tuple:
+    sample_path = os.path.join(BACKEND_DIR, "..", "Academic CV Sample.docx")
+    if os.path.exists(sample_path):
+        with open(sample_path, "rb") as f:
+            return ("Academic CV Sample.docx", f.read(),
+                    "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+    return ("cv.pdf", MINIMAL_PDF, "application/pdf")
+
+
+def build_scenarios() -> Dict[str, Callable[[httpx.AsyncClient, int], Any]]:
+    cv_name, cv_bytes, cv_type = load_sample_cv()
+
+    return {
+        "recommend": lambda client, i: client.post("/recommend", json=SAMPLE_PROFILE),
+        "universities_search": lambda client, i: client.get(
+            "/universities/search", params={"query": SEARCH_QUERIES[i % len(SEARCH_QUERIES)], "limit": 10}
+        ),
+        "countries": lambda client, i: client.get("/countries"),
+        "fields": lambda client, i: client.get("/fields"),
+        "upload_cv": lambda client, i: client.post("/upload-cv", files={"file": (cv_name, cv_bytes, cv_type)}),
+    }
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_scenario(base_url: str, name: str, request_fn, concurrency: int, total_requests: int,
+                       timeout: float) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    status_counts: Dict[str, int] = {}
+    counter = iter(range(total_requests))
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                start = time.perf_counter()
+                try:
+                    response = await request_fn(client, i)
+                    status = str(response.status_code)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+                status_counts[status] = status_counts.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "status_counts": status_counts,
+        "elapsed_seconds": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "latency_p50_ms": _ms(percentile(latencies, 50)),
+        "latency_p95_ms": _ms(percentile(latencies, 95)),
+        "latency_p99_ms": _ms(percentile(latencies, 99)),
+        "latency_max_ms": _ms(latencies[-1] if latencies else None)
+    }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def is_synthetic_catalog(path: str) -> bool:
+    """synthetic_catalog.py output (JSONL, or CSV with a header row) rather than the 3-column world-universities CSV"""
+    if path.endswith('.jsonl'):
+        return True
+    with open(path, newline='', encoding='utf-8') as f:
+        header = next(csv.reader(f), [])
+    return 'name' in header and 'country_name' in header
+
+
+def seed_database(csv_path: str, db_name: str):
+    """
+    Create and load the benchmark database from a world-universities CSV or a
+    synthetic_catalog.py file. db_name must be a dedicated benchmark schema:
+    loading replaces its universities table.
+    """
+    os.environ["DB_NAME"] = db_name
+    from csv_to_mysql import CSVToMySQLConverter
+
+    converter = CSVToMySQLConverter()
+    converter.create_database_and_table()
+    if is_synthetic_catalog(csv_path):
+        from synthetic_catalog import bulk_load
+        bulk_load(csv_path, dict(converter.db_config, database=db_name), truncate=True)
+    else:
+        converter.load_csv_to_mysql(csv_path)
+    converter.create_indexes_and_views()
+
+
+def wait_for_health(base_url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Service at {base_url} did not become healthy within {timeout:g}s")
+
+
+def start_services(args) -> List[subprocess.Popen]:
+    env = dict(os.environ)
+    if not args.real_llm:
+        env["OPENROUTER_API_BASE"] = f"http://127.0.0.1:{args.stub_port}/v1"
+        env["OPENROUTER_API_KEY"] = "stub"
+    if args.db_name:
+        env["DB_NAME"] = args.db_name
+
+    processes = []
+    if not args.real_llm:
+        processes.append(subprocess.Popen(
+            [sys.executable, "llm_stub_server.py", "--port", str(args.stub_port),
+             "--latency-dist", args.stub_latency_dist, "--latency-mean", str(args.stub_latency_mean)],
+            cwd=BACKEND_DIR, env=env
+        ))
+    processes.append(subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(args.port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    ))
+    return processes
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> int:
+    if args.seed_csv:
+        print(f"Seeding {args.db_name} from {args.seed_csv}...")
+        seed_database(args.seed_csv, args.db_name)
+
+    processes = []
+    base_url = args.base_url
+    if not base_url:
+        base_url = f"http://127.0.0.1:{args.port}"
+        processes = start_services(args)
+
+    try:
+        wait_for_health(base_url)
+        scenarios = build_scenarios()
+        selected = args.scenarios.split(",") if args.scenarios else list(scenarios)
+
+        results = {}
+        for name in selected:
+            if name not in scenarios:
+                print(f"Unknown scenario: {name}")
+                return 2
+            # Warm up connections and caches before measuring
+            asyncio.run(run_scenario(base_url, name, scenarios[name], min(args.concurrency, 4), args.warmup, args.timeout))
+            print(f"Running {name}: {args.requests} requests at concurrency {args.concurrency}...")
+            results[name] = asyncio.run(
+                run_scenario(base_url, name, scenarios[name], args.concurrency, args.requests, args.timeout)
+            )
+            r = results[name]
+            print(f"  {r['throughput_rps']:.1f} req/s  p50 {r['latency_p50_ms']} ms  "
+                  f"p95 {r['latency_p95_ms']} ms  p99 {r['latency_p99_ms']} ms  errors {r['errors']}")
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "config": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "workers": args.workers,
+            "stub_latency_dist": None if args.real_llm else args.stub_latency_dist,
+            "stub_latency_mean": None if args.real_llm else args.stub_latency_mean,
+            "base_url": base_url
+        },
+        "results": results
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+def compare(args) -> int:
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)["results"]
+
+    threshold = args.threshold / 100.0
+    regressions = []
+
+    print(f"{'scenario':<22}{'metric':<16}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name in sorted(set(baseline) & set(current)):
+        for metric, higher_is_worse in [("throughput_rps", False), ("latency_p50_ms", True),
+                                        ("latency_p95_ms", True), ("latency_p99_ms", True)]:
+            before = baseline[name].get(metric)
+            after = current[name].get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = change > threshold if higher_is_worse else change < -threshold
+            flag = "  REGRESSION" if worse else ""
+            print(f"{name:<22}{metric:<16}{before:>12.2f}{after:>12.2f}{change * 100:>9.1f}%{flag}")
+            if worse:
+                regressions.append((name, metric, change))
+        if current[name].get("errors", 0) > baseline[name].get("errors", 0):
+            print(f"{name:<22}{'errors':<16}{baseline[name]['errors']:>12}{current[name]['errors']:>12}  REGRESSION")
+            regressions.append((name, "errors", None))
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:g}%")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test and benchmark the University Recommendation API")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmark and write results")
+    run_parser.add_argument("--base-url", help="Target an already running service instead of booting main:app")
+    run_parser.add_argument("--port", type=int, default=8055)
+    run_parser.add_argument("--workers", type=int, default=1)
+    run_parser.add_argument("--stub-port", type=int, default=8100)
+    run_parser.add_argument("--stub-latency-dist", default="lognormal")
+    run_parser.add_argument("--stub-latency-mean", type=float, default=0.3)
+    run_parser.add_argument("--real-llm", action="store_true", help="Use OPENROUTER_API_KEY instead of the stub")
+    run_parser.add_argument("--seed-csv", help="Load this world-universities CSV or synthetic catalog before the run")
+    run_parser.add_argument("--db-name", help="Database name to use (a dedicated benchmark schema; required with --seed-csv)")
+    run_parser.add_argument("--scenarios", help="Comma-separated subset of scenarios to run")
+    run_parser.add_argument("--concurrency", type=int, default=8)
+    run_parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    run_parser.add_argument("--warmup", type=int, default=10, help="Warm-up requests per scenario")
+    run_parser.add_argument("--timeout", type=float, default=60.0)
+    run_parser.add_argument("--output", default="benchmark_results/latest.json")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two result files and flag regressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="Allowed change in percent")
+
+    args = parser.parse_args()
+    if args.command == "run" and args.seed_csv:
+        # Seeding replaces the universities table, so never fall back to the real catalog
+        from dotenv import load_dotenv
+        load_dotenv()
+        if not args.db_name:
+            parser.error("--seed-csv requires an explicit --db-name")
+        if args.db_name == os.getenv("DB_NAME", "universitydb"):
+            parser.error(f"--db-name {args.db_name} is the configured DB_NAME; seed a dedicated benchmark schema")
+    sys.exit(run(args) if args.command == "run" else compare(args))
+
+
+if __name__ == "__main__":
+    main()
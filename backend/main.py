@@ -1,10 +1,13 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile
+from fastapi import FastAPI, HTTPException, File, UploadFile, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+from contextlib import asynccontextmanager
 import uvicorn
 from datetime import datetime
 import json
+import os
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -13,11 +16,37 @@ load_dotenv()
 # Import our recommendation engine and database
 from recommendation_engine import UniversityRecommendationEngine
 from university_database_mysql import university_db
+from fast_json_response import FastJSONResponse, dumps
+from http_caching import CompressionMiddleware, catalog_etag, is_not_modified, not_modified_response
+from workflow_metrics import registry as metrics_registry
+from cv_extraction import CVExtractionError
+from upload_limits import UploadLimitMiddleware, UploadRejected, read_upload
+from llm_http import create_http_client
+from job_queue import (
+    create_job_queue, QueueFullError, UnknownJobKindError, InvalidJobOptionsError, FINISHED_STATUSES, JOB_SUCCEEDED
+)
+
+# Background jobs for the long-running LLM endpoints
+job_queue = create_job_queue()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One keep-alive connection pool for every LLM client in the process
+    http_client = create_http_client()
+    recommendation_engine.use_http_client(http_client)
+    await university_db.use_http_client(http_client)
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    recommendation_engine.cv_extractor.shutdown()
+    await http_client.aclose()
 
 app = FastAPI(
     title="University Recommendation API",
     description="AI-powered university recommendation system using Langgraph",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -29,6 +58,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reject oversized CV uploads before the multipart parser buffers them
+CV_MAX_UPLOAD_BYTES = int(os.getenv("CV_MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+app.add_middleware(UploadLimitMiddleware, limits={"/upload-cv": CV_MAX_UPLOAD_BYTES})
+
+# Compress buffered responses above the size threshold (brotli when available, else gzip)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+)
+
 # Initialize recommendation engine
 recommendation_engine = UniversityRecommendationEngine()
 
@@ -47,6 +86,16 @@ class StudentProfile(BaseModel):
     target_start_year: str
     study_mode: str
     career_goal: str
+    cv_upload_id: Optional[str] = None  # upload_id returned by /upload-cv
+
+class BatchRecommendationRequest(BaseModel):
+    profiles: List[StudentProfile]
+
+class JobSubmission(BaseModel):
+    kind: str
+    payload: Dict[str, Any] = {}
+    priority: int = 0
+    timeout: Optional[float] = None
 
 class University(BaseModel):
     id: int
@@ -73,6 +122,34 @@ class RecommendationResponse(BaseModel):
     ai_summary: str
     processing_time: float
 
+# Job handlers mirror the synchronous endpoints below
+async def _recommend_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await recommendation_engine.generate_recommendations(payload)
+
+async def _top_universities_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    top_universities = await university_db.generate_universities_for_field(payload["field"], payload.get("country"), 3)
+    return {"top_universities": top_universities}
+
+async def _generate_university_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    university_data = await university_db.generate_university_with_gpt(
+        payload["university_name"], payload["country"], payload.get("field", "Computer Science")
+    )
+    if not university_data:
+        raise ValueError("Could not generate university data")
+    return {"university": university_data}
+
+def _require_keys(*keys):
+    def validate(payload: Dict[str, Any]) -> Dict[str, Any]:
+        missing = [key for key in keys if not payload.get(key)]
+        if missing:
+            raise ValueError(f"Missing required payload fields: {', '.join(missing)}")
+        return payload
+    return validate
+
+job_queue.register("recommend", _recommend_job, validator=lambda payload: StudentProfile(**payload).dict())
+job_queue.register("top_universities", _top_universities_job, validator=_require_keys("field"))
+job_queue.register("generate_university", _generate_university_job, validator=_require_keys("university_name", "country"))
+
 @app.get("/")
 async def root():
     return {
@@ -85,14 +162,42 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@app.get("/metrics")
+async def metrics():
+    """
+    Workflow node latency, LLM and token metrics in the Prometheus text format
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.post("/recommend")
-async def recommend_universities(profile: StudentProfile):
+async def recommend_universities(profile: StudentProfile, debug: bool = False):
     try:
-        recommendations = await recommendation_engine.generate_recommendations(profile.dict())
-        return recommendations
+        recommendations = await recommendation_engine.generate_recommendations(profile.dict(), include_trace=debug)
+        return FastJSONResponse(recommendations)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/recommend/batch")
+async def recommend_universities_batch(batch: BatchRecommendationRequest):
+    """
+    Generate recommendations for a cohort of student profiles.
+    Results are streamed back as newline-delimited JSON, one line per profile
+    in completion order; each line carries the profile's index in the request.
+    """
+    max_profiles = int(os.getenv("BATCH_MAX_PROFILES", 200))
+    if not batch.profiles:
+        raise HTTPException(status_code=400, detail="At least one profile is required.")
+    if len(batch.profiles) > max_profiles:
+        raise HTTPException(status_code=400, detail=f"Batch size exceeds the limit of {max_profiles} profiles.")
+    
+    profiles = [profile.dict() for profile in batch.profiles]
+    
+    async def stream_results():
+        async for result in recommendation_engine.generate_batch_recommendations(profiles):
+            yield dumps(result) + b"\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
 @app.get("/top-universities/{field}")
 async def get_top_universities(field: str, country: str = None):
     """Get top 3 universities for a specific field using AI"""
@@ -114,21 +219,56 @@ async def generate_university(university_name: str, country: str, field: str = "
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/jobs", status_code=202)
+async def submit_job(submission: JobSubmission):
+    """
+    Submit a long-running job (recommend, top_universities, generate_university)
+    and poll /jobs/{job_id} for its status
+    """
+    try:
+        job = await job_queue.submit(submission.kind, submission.payload, submission.priority, submission.timeout)
+    except UnknownJobKindError:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {submission.kind}")
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except InvalidJobOptionsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid job payload: {str(e)}")
+    return job.to_dict(include_result=False)
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """
+    Get the status of a submitted job
+    """
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.to_dict(include_result=False)
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Get the result of a finished job
+    """
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if job.status not in FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job is still {job.status}")
+    if job.status != JOB_SUCCEEDED:
+        raise HTTPException(status_code=500, detail=job.error)
+    return FastJSONResponse(job.result)
+
 @app.post("/upload-cv")
 async def upload_cv(file: UploadFile = File(...)):
     """
     Upload and process CV/Resume
     """
     try:
-        # Validate file type
-        allowed_types = ["application/pdf", "application/msword", 
-                        "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
-        
-        if file.content_type not in allowed_types:
-            raise HTTPException(status_code=400, detail="Invalid file type. Please upload PDF, DOC, or DOCX files.")
-        
-        # Read file content
-        content = await file.read()
+        # The middleware bounded the body; check the magic bytes, then read at most the limit
+        content = await read_upload(file, max_size=CV_MAX_UPLOAD_BYTES)
         
         # Process CV using Langgraph (extract relevant information)
         cv_analysis = await recommendation_engine.analyze_cv(content, file.filename)
@@ -139,50 +279,72 @@ async def upload_cv(file: UploadFile = File(...)):
             "analysis": cv_analysis
         }
     
+    except HTTPException:
+        raise
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except CVExtractionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing CV: {str(e)}")
 
 @app.get("/universities")
-async def get_all_universities():
+async def get_all_universities(request: Request):
     """
     Get all available universities in the database
     """
     try:
+        etag = catalog_etag(request, await university_db.catalog_version())
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        
         universities = await recommendation_engine.get_all_universities()
-        return {"universities": universities}
+        return FastJSONResponse({"universities": universities}, headers={"ETag": etag, "Cache-Control": "no-cache"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching universities: {str(e)}")
 
 @app.get("/universities/search")
-async def search_universities(query: str, limit: int = 10):
+async def search_universities(request: Request, query: str, limit: int = 10):
     """
     Search universities by name or other criteria
     """
     try:
+        etag = catalog_etag(request, await university_db.catalog_version())
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        
         results = await recommendation_engine.search_universities(query, limit)
-        return {"results": results}
+        return FastJSONResponse({"results": results}, headers={"ETag": etag, "Cache-Control": "no-cache"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching universities: {str(e)}")
 
 @app.get("/countries")
-async def get_countries():
+async def get_countries(request: Request):
     """
     Get all available countries from the database
     """
     try:
+        etag = catalog_etag(request, await university_db.catalog_version())
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        
         countries = await university_db.get_all_countries()
-        return {"countries": countries}
+        return FastJSONResponse({"countries": countries}, headers={"ETag": etag, "Cache-Control": "no-cache"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching countries: {str(e)}")
 
 @app.get("/fields")
-async def get_fields():
+async def get_fields(request: Request):
     """
     Get all available fields of study from the database
     """
     try:
+        etag = catalog_etag(request, await university_db.catalog_version())
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        
         fields = await university_db.get_all_fields()
-        return {"fields": fields}
+        return FastJSONResponse({"fields": fields}, headers={"ETag": etag, "Cache-Control": "no-cache"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching fields: {str(e)}")
 
@@ -0,0 +1,96 @@
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+# Tiers available to the router, overridable with LLM_TIER_<NAME>_MODEL / _TEMPERATURE / _PROMPT_PRICE / _COMPLETION_PRICE
+DEFAULT_TIERS = {
+    "small": {"model": "openai/gpt-4o-mini", "temperature": 0.2, "prompt_price": 0.15, "completion_price": 0.60},
+    "large": {"model": "openai/gpt-4", "temperature": 0.3, "prompt_price": 30.0, "completion_price": 60.0},
+}
+
+# node=tier:max_tokens. Profile insights are only echoed back and scores are ~15 tokens each,
+# so only the user-facing summary needs the large model
+DEFAULT_ROUTES = "analyze_profile=small:400,score_matches=small:1000,generate_analysis=large:2000"
+
+# Calls made outside a routed node (repairs, unattributed calls)
+DEFAULT_TIER = "large"
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    name: str
+    model: str
+    temperature: float
+    prompt_price: float       # USD per million prompt tokens
+    completion_price: float   # USD per million completion tokens
+
+    def cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        return (prompt_tokens * self.prompt_price + completion_tokens * self.completion_price) / 1_000_000
+
+
+@dataclass(frozen=True)
+class Route:
+    tier: ModelTier
+    max_tokens: int
+
+
+class ModelRouter:
+    """
+    Maps workflow nodes to a model tier and completion token cap.
+
+    Tiers and routes come from the environment:
+
+        LLM_TIER_SMALL_MODEL=openai/gpt-4o-mini
+        LLM_TIER_LARGE_MODEL=openai/gpt-4
+        LLM_NODE_ROUTES=analyze_profile=small:400,score_matches=small:1000,generate_analysis=large:2000
+    """
+
+    def __init__(self, tiers: Dict[str, ModelTier], routes: Dict[str, Tuple[str, int]],
+                 default_tier: str = DEFAULT_TIER, default_max_tokens: int = 2000):
+        unknown = ({tier for tier, _ in routes.values()} | {default_tier}) - tiers.keys()
+        if unknown:
+            raise ValueError(f"LLM routes reference unknown model tiers: {sorted(unknown)}")
+        self.tiers = tiers
+        self.routes = {node: Route(tiers[tier], max_tokens) for node, (tier, max_tokens) in routes.items()}
+        self.default_route = Route(tiers[default_tier], default_max_tokens)
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        names = set(DEFAULT_TIERS)
+        names.update(name.strip().lower() for name in os.getenv("LLM_TIERS", "").split(",") if name.strip())
+        tiers = {}
+        for name in names:
+            defaults = DEFAULT_TIERS.get(name, DEFAULT_TIERS[DEFAULT_TIER])
+            prefix = f"LLM_TIER_{name.upper()}_"
+            tiers[name] = ModelTier(
+                name=name,
+                model=os.getenv(prefix + "MODEL", defaults["model"]),
+                temperature=float(os.getenv(prefix + "TEMPERATURE", defaults["temperature"])),
+                prompt_price=float(os.getenv(prefix + "PROMPT_PRICE", defaults["prompt_price"])),
+                completion_price=float(os.getenv(prefix + "COMPLETION_PRICE", defaults["completion_price"]))
+            )
+        return cls(
+            tiers,
+            parse_routes(os.getenv("LLM_NODE_ROUTES", DEFAULT_ROUTES)),
+            default_tier=os.getenv("LLM_DEFAULT_TIER", DEFAULT_TIER),
+            default_max_tokens=int(os.getenv("AI_MAX_TOKENS", 2000))
+        )
+
+    def route(self, node: Optional[str]) -> Route:
+        return self.routes.get(node, self.default_route)
+
+
+def parse_routes(spec: str) -> Dict[str, Tuple[str, int]]:
+    """
+    Parse "node=tier:max_tokens,..." (max_tokens optional, defaulting to 2000)
+    """
+    routes = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        node, _, target = entry.partition("=")
+        tier, _, max_tokens = target.partition(":")
+        if not node.strip() or not tier.strip():
+            raise ValueError(f"Invalid LLM route '{entry}', expected node=tier:max_tokens")
+        routes[node.strip()] = (tier.strip().lower(), int(max_tokens) if max_tokens.strip() else 2000)
+    return routes
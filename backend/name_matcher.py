@@ -0,0 +1,186 @@
+import heapq
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Words that carry no identity on their own ("University of X" vs "X University")
+STOP_WORDS = {'the', 'of', 'and', 'at', 'in', 'de', 'la', 'du', 'des', 'di', 'der', 'für', 'y'}
+
+# Institution-type words: shared only these, two names are not the same school
+GENERIC_WORDS = {
+    'university', 'universities', 'universidad', 'universidade', 'universita', 'universitat', 'universite',
+    'college', 'institute', 'institut', 'instituto', 'school', 'academy', 'polytechnic', 'politecnico',
+    'technology', 'technological', 'technical', 'science', 'sciences', 'national', 'state', 'federal',
+    'higher', 'education', 'studies', 'centre', 'center'
+}
+
+# Common spelling variants in ranking tables
+REPLACEMENTS = {
+    '&': ' and ',
+    'univ.': 'university',
+    'inst.': 'institute',
+    'tech.': 'technology',
+    'st.': 'saint',
+}
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    text = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode('ascii').lower()
+    for old, new in REPLACEMENTS.items():
+        text = text.replace(old, new)
+    text = re.sub(r'\([^)]*\)', ' ', text)        # "(UCL)", "(MIT)"
+    text = text.replace("'", '')                  # "King's" and "Kings"
+    text = re.sub(r'[^a-z0-9]+', ' ', text)
+    return ' '.join(text.split())
+
+
+def name_tokens(normalized: str) -> Set[str]:
+    return {token for token in normalized.split() if token not in STOP_WORDS}
+
+
+def trigrams(normalized: str) -> Set[str]:
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameMatcher:
+    """
+    In-memory trigram and token index over university names.
+
+    Built once from (id, name, country) rows. match() gathers candidates
+    through the posting lists of the query's rarest trigrams and scores them
+    by trigram Dice similarity blended with IDF-weighted token overlap, so a
+    whole ranking table can be matched without a query per row.
+
+    Shared generic words and place names can carry that score on their own
+    ("University of London" vs "University College London"), so a candidate
+    must share a non-generic token with the query, and when the shared
+    non-generic tokens also occur in other entries (a city) it must clear
+    ambiguous_threshold instead.
+    """
+
+    def __init__(self, threshold: float = 0.7, max_candidates: int = 20, candidate_trigrams: int = 8,
+                 ambiguous_threshold: float = 0.95):
+        self.threshold = threshold
+        self.ambiguous_threshold = ambiguous_threshold
+        self.max_candidates = max_candidates
+        self.candidate_trigrams = candidate_trigrams
+        self.entries: List[Dict[str, Any]] = []
+        self.trigram_index: Dict[str, List[int]] = defaultdict(list)
+        self.exact_index: Dict[str, List[int]] = defaultdict(list)
+        self.token_counts: Dict[str, int] = defaultdict(int)
+        self.token_index: Dict[str, List[int]] = defaultdict(list)
+        self._weights: Dict[str, float] = {}
+
+    @classmethod
+    def build(cls, rows: Iterable[Tuple[Any, str, Optional[str]]], **kwargs) -> 'NameMatcher':
+        matcher = cls(**kwargs)
+        for university_id, name, country in rows:
+            matcher.add(university_id, name, country)
+        return matcher
+
+    def add(self, university_id: Any, name: str, country: Optional[str] = None):
+        normalized = normalize_name(name)
+        if not normalized:
+            return
+        position = len(self.entries)
+        grams = trigrams(normalized)
+        tokens = name_tokens(normalized)
+        self.entries.append({
+            'id': university_id,
+            'name': name,
+            'country': (country or '').lower(),
+            'trigrams': grams,
+            'tokens': tokens
+        })
+        self.exact_index[normalized].append(position)
+        for gram in grams:
+            self.trigram_index[gram].append(position)
+        for token in tokens:
+            self.token_counts[token] += 1
+            self.token_index[token].append(position)
+        self._weights.clear()
+
+    def _weight(self, token: str) -> float:
+        # "university" or "institute" say little; rare tokens identify the school
+        weight = self._weights.get(token)
+        if weight is None:
+            weight = math.log((len(self.entries) + 1) / (self.token_counts.get(token, 0) + 1)) + 1.0
+            self._weights[token] = weight
+        return weight
+
+    def _score(self, entry: Dict[str, Any], grams: Set[str], tokens: Set[str], country: str) -> float:
+        dice = 2 * len(grams & entry['trigrams']) / (len(grams) + len(entry['trigrams']))
+
+        query_weight = sum(self._weight(t) for t in tokens)
+        entry_weight = sum(self._weight(t) for t in entry['tokens'])
+        shared_weight = sum(self._weight(t) for t in tokens & entry['tokens'])
+        token_dice = 2 * shared_weight / (query_weight + entry_weight) if query_weight + entry_weight else 0.0
+
+        # Short forms such as "ETH Zurich" for "ETH Zurich - Swiss Federal Institute of Technology"
+        # as long as the shared tokens carry a fair part of the entry's identity
+        containment = 0.0
+        if tokens and tokens <= entry['tokens'] and shared_weight >= 0.4 * entry_weight:
+            containment = 0.6 + 0.4 * shared_weight / entry_weight
+
+        score = max(0.5 * dice + 0.5 * token_dice, 0.95 * containment)
+        if country and entry['country']:
+            score += 0.05 if country == entry['country'] else -0.15
+        return min(score, 1.0)
+
+    def _required_score(self, position: int, tokens: Set[str]) -> Optional[float]:
+        """Score a candidate must reach, or None when it shares no identifying token with the query"""
+        shared = {token for token in tokens & self.entries[position]['tokens'] if token not in GENERIC_WORDS}
+        if not shared:
+            return None
+        # Entries containing every shared token; more than this one means the overlap is a place or a common word
+        rarest = min(shared, key=lambda token: len(self.token_index[token]))
+        holders = [p for p in self.token_index[rarest]
+                   if p != position and shared <= self.entries[p]['tokens']]
+        return max(self.threshold, self.ambiguous_threshold) if holders else self.threshold
+
+    def match(self, name: str, country: Optional[str] = None) -> Optional[Tuple[Any, str, float]]:
+        """
+        Return (id, indexed name, score) of the best match at or above the
+        threshold, or None
+        """
+        normalized = normalize_name(name)
+        if not normalized:
+            return None
+        country = (country or '').lower()
+        if country == 'unknown':
+            country = ''
+
+        exact = self.exact_index.get(normalized)
+        if exact:
+            entry = max((self.entries[p] for p in exact), key=lambda e: e['country'] == country)
+            return entry['id'], entry['name'], 1.0
+
+        # Gather candidates from the query's rarest trigrams only; grams like
+        # " un" or "ity" would otherwise pull in most of the index
+        grams = trigrams(normalized)
+        selective = sorted(grams, key=lambda gram: len(self.trigram_index.get(gram, ())))
+        selective = selective[:self.candidate_trigrams]
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in selective:
+            for position in self.trigram_index.get(gram, ()):
+                shared[position] += 1
+        if not shared:
+            return None
+
+        candidates = heapq.nlargest(self.max_candidates, shared, key=shared.get)
+        tokens = name_tokens(normalized)
+        best: Optional[Tuple[float, Dict[str, Any]]] = None
+        for position in candidates:
+            score = self._score(self.entries[position], grams, tokens, country)
+            if best is not None and score <= best[0]:
+                continue
+            required = self._required_score(position, tokens)
+            if required is not None and score >= required:
+                best = (score, self.entries[position])
+        if best is None:
+            return None
+        return best[1]['id'], best[1]['name'], best[0]
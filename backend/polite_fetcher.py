@@ -0,0 +1,199 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+import weakref
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Response headers kept with a cached page; a 304 refreshes the first three
+VALIDATOR_HEADERS = ('etag', 'last-modified', 'cache-control')
+CACHED_HEADERS = VALIDATOR_HEADERS + ('content-type',)
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    from_cache: bool = False
+
+
+class HTTPCache:
+    """
+    On-disk HTTP cache: one JSON metadata file and one body file per URL.
+
+    The same directory doubles as a fixture set: a run with a cache dir
+    records every page, and an offline run replays them without network.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url: str):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json"), os.path.join(self.cache_dir, f"{key}.body")
+
+    def get(self, url: str) -> Optional[FetchResult]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                content = f.read()
+        except (OSError, ValueError):
+            return None
+        return FetchResult(url=url, status=meta['status'], content=content, headers=meta['headers'], from_cache=True)
+
+    def put(self, result: FetchResult):
+        meta_path, body_path = self._paths(result.url)
+        headers = {k: v for k, v in result.headers.items() if k in CACHED_HEADERS}
+        # Write the body first so a metadata file always has its body
+        with open(body_path, 'wb') as f:
+            f.write(result.content)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({'url': result.url, 'status': result.status, 'headers': headers, 'fetched_at': time.time()}, f)
+
+
+class PoliteFetcher:
+    """
+    Concurrent async page fetcher that stays polite per host.
+
+    Limits in-flight requests and spaces request starts per host, revalidates
+    cached pages with If-None-Match / If-Modified-Since, and retries
+    transport errors, 429 and 5xx responses with exponential backoff
+    (honouring Retry-After up to max_retry_after). With offline=True pages are served from the
+    cache only, which is how saved HTML fixtures are replayed.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, per_host_concurrency: int = 2, min_interval: float = 0.5,
+                 max_retries: int = 3, backoff_base: float = 1.0, timeout: float = 20.0,
+                 headers: Optional[Dict[str, str]] = None, offline: bool = False, max_retry_after: float = 60.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.cache = HTTPCache(cache_dir) if cache_dir else None
+        self.per_host_concurrency = per_host_concurrency
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.offline = offline
+        # A server-sent Retry-After longer than this is clamped so one header cannot stall the crawl
+        self.max_retry_after = max_retry_after
+        self.transport = transport
+        # asyncio primitives are bound to the loop they are first used on, and callers
+        # may run each fetch_many under its own asyncio.run; keep them per loop
+        self._loop_primitives = weakref.WeakKeyDictionary()
+        self._host_last_start: Dict[str, float] = {}
+
+    def _host_primitives(self, host: str) -> Tuple[asyncio.Semaphore, asyncio.Lock]:
+        """Per-host concurrency semaphore and start-spacing lock for the running loop"""
+        semaphores, locks = self._loop_primitives.setdefault(asyncio.get_running_loop(), ({}, {}))
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(self.per_host_concurrency)
+            locks[host] = asyncio.Lock()
+        return semaphores[host], locks[host]
+
+    async def _wait_turn(self, host: str):
+        """Space request starts to the same host by at least min_interval"""
+        async with self._host_primitives(host)[1]:
+            wait = self._host_last_start.get(host, 0.0) + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._host_last_start[host] = time.monotonic()
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        if retry_after:
+            try:
+                return min(max(0.0, float(retry_after)), self.max_retry_after)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                    return min(max(0.0, delay), self.max_retry_after)
+                except (TypeError, ValueError):
+                    pass
+        return self.backoff_base * (2 ** attempt) + random.uniform(0, self.backoff_base)
+
+    async def fetch(self, client: httpx.AsyncClient, url: str) -> FetchResult:
+        """
+        Fetch one URL, revalidating any cached copy
+        """
+        cached = self.cache.get(url) if self.cache else None
+        if self.offline:
+            if cached is None:
+                raise httpx.RequestError(f"No cached copy of {url} (offline)")
+            return cached
+
+        conditional = {}
+        if cached is not None:
+            if cached.headers.get('etag'):
+                conditional['If-None-Match'] = cached.headers['etag']
+            if cached.headers.get('last-modified'):
+                conditional['If-Modified-Since'] = cached.headers['last-modified']
+
+        host = urlparse(url).netloc
+        semaphore, _ = self._host_primitives(host)
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+            async with semaphore:
+                await self._wait_turn(host)
+                try:
+                    response = await client.get(url, headers=conditional)
+                except httpx.TransportError as e:
+                    if attempt == self.max_retries:
+                        raise
+                    print(f"Fetch error for {url}: {e}; retrying")
+
+            if response is not None:
+                if response.status_code == 304 and cached is not None:
+                    # The 304 carries the current validators; keep them for the next revalidation
+                    for name in VALIDATOR_HEADERS:
+                        if name in response.headers:
+                            cached.headers[name] = response.headers[name]
+                    if self.cache:
+                        self.cache.put(cached)
+                    return cached
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    result = FetchResult(
+                        url=url,
+                        status=response.status_code,
+                        content=response.content,
+                        headers={k.lower(): v for k, v in response.headers.items()}
+                    )
+                    if self.cache and response.status_code == 200:
+                        self.cache.put(result)
+                    return result
+                print(f"HTTP {response.status_code} for {url}; retrying")
+
+            await asyncio.sleep(self._retry_delay(attempt, response))
+
+        raise httpx.RequestError(f"Retries exhausted for {url}")
+
+    async def fetch_many(self, urls: Iterable[str]) -> Dict[str, Optional[FetchResult]]:
+        """
+        Fetch URLs concurrently; failed URLs map to None
+        """
+        urls = list(dict.fromkeys(urls))
+        async with httpx.AsyncClient(headers=self.headers, timeout=self.timeout, follow_redirects=True,
+                                     transport=self.transport) as client:
+            results = await asyncio.gather(*(self.fetch(client, url) for url in urls), return_exceptions=True)
+
+        pages: Dict[str, Optional[FetchResult]] = {}
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                print(f"Failed to fetch {url}: {result}")
+                pages[url] = None
+            else:
+                pages[url] = result
+        return pages
@@ -0,0 +1,158 @@
+"""
+Prompt token accounting for the recommendation workflow: local token counts
+(tiktoken, or an estimate on hosts without it), compact serialization of
+profiles and candidates, and PromptBudget, which splits candidate lists that
+would not fit one prompt into shards scored by parallel calls.
+"""
+import json
+import logging
+import math
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Fallback estimate: word pieces and punctuation, which tracks BPE counts closely for English and JSON
+TOKEN_ESTIMATE_PATTERN = re.compile(r"\w+|[^\w\s]")
+# Overhead the chat format adds per message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Free-text profile fields are clipped to this many characters in prompts
+PROFILE_TEXT_LIMIT = 600
+
+# Candidates go into prompts as compact rows; the legend tells the model the column order
+CANDIDATE_COLUMNS = ('id', 'name', 'country')
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model.split('/')[-1])
+    except KeyError:
+        return tiktoken.get_encoding('cl100k_base')
+    except Exception as e:
+        # Encodings are downloaded on first use; offline hosts fall back to the estimate
+        logger.warning("tiktoken encoding unavailable for %s, estimating token counts: %s", model, e)
+        return None
+
+
+def count_tokens(text: str, model: str = 'gpt-4') -> int:
+    """
+    Count prompt tokens locally (tiktoken when installed, otherwise an estimate)
+    """
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text or ''))
+    return len(TOKEN_ESTIMATE_PATTERN.findall(text or ''))
+
+
+def count_message_tokens(messages: Sequence[Any], model: str = 'gpt-4') -> int:
+    """Token count of a list of chat messages (LangChain messages or role/content dicts)"""
+    total = 0
+    for message in messages:
+        content = message.get('content', '') if isinstance(message, dict) else getattr(message, 'content', '')
+        total += count_tokens(content if isinstance(content, str) else json.dumps(content), model) + MESSAGE_OVERHEAD_TOKENS
+    return total
+
+
+def compact_json(value: Any) -> str:
+    """JSON without indentation or spaces after separators"""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def compact_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Profile for prompts: empty and "no-preference" fields dropped, long free text clipped
+    """
+    compacted = {}
+    for key, value in profile.items():
+        if value in (None, '', [], {}, 'no-preference') or key == 'cv_upload_id':
+            continue
+        if isinstance(value, str) and len(value) > PROFILE_TEXT_LIMIT:
+            value = value[:PROFILE_TEXT_LIMIT].rsplit(' ', 1)[0] + '...'
+        compacted[key] = value
+    return compacted
+
+
+def candidate_rows(universities: List[Dict[str, Any]], columns: Sequence[str] = CANDIDATE_COLUMNS) -> List[str]:
+    """One compact JSON array per university, in column order"""
+    return [compact_json([university.get(column) for column in columns]) for university in universities]
+
+
+def candidate_legend(columns: Sequence[str] = CANDIDATE_COLUMNS) -> str:
+    return f"Each university is a JSON array [{', '.join(columns)}]."
+
+
+def _positive_int(value: Optional[int], env_name: str, default: int) -> int:
+    """An explicit value, else the environment variable, else the default; must be positive"""
+    if value is None:
+        raw = os.getenv(env_name, default)
+        try:
+            value = int(raw)
+        except ValueError:
+            raise ValueError(f"{env_name} must be a positive integer, got {raw!r}")
+    if value <= 0:
+        raise ValueError(f"{env_name} must be a positive integer, got {value}")
+    return value
+
+
+class PromptBudget:
+    """
+    Keeps LLM prompts inside a token budget.
+
+    Candidate lists that do not fit one prompt (or would need more completion
+    tokens than one reply allows) are split into shards that are scored by
+    parallel calls and merged.
+    """
+
+    def __init__(self, max_prompt_tokens: Optional[int] = None, max_items_per_call: Optional[int] = None,
+                 model: str = 'gpt-4'):
+        # GPT-4's 8k context minus the 2000-token completion cap
+        self.max_prompt_tokens = _positive_int(max_prompt_tokens, 'LLM_PROMPT_TOKEN_BUDGET', 6000)
+        # Each score costs ~15 completion tokens
+        self.max_items_per_call = _positive_int(max_items_per_call, 'LLM_MAX_CANDIDATES_PER_CALL', 40)
+        self.model = model
+
+    def count(self, text: str) -> int:
+        return count_tokens(text, self.model)
+
+    def shard(self, items: List[str], fixed_tokens: int) -> List[List[int]]:
+        """
+        Split serialized items into shards (lists of item indexes) so that
+        fixed_tokens plus each shard's items stays within the budget. Shards
+        are balanced so parallel calls finish at about the same time.
+        """
+        available = max(1, self.max_prompt_tokens - fixed_tokens)
+        # +1 per item for the separating comma
+        tokens = [self.count(item) + 1 for item in items]
+
+        greedy: List[List[int]] = []
+        current: List[int] = []
+        used = 0
+        for index, item_tokens in enumerate(tokens):
+            if current and (used + item_tokens > available or len(current) >= self.max_items_per_call):
+                greedy.append(current)
+                current, used = [], 0
+            current.append(index)
+            used += item_tokens
+        if current:
+            greedy.append(current)
+        if len(greedy) <= 1:
+            return greedy
+
+        # Same number of calls, items spread evenly, as long as every shard still fits
+        size = math.ceil(len(items) / len(greedy))
+        balanced = [list(range(start, min(start + size, len(items)))) for start in range(0, len(items), size)]
+        if len(balanced) == len(greedy) and all(sum(tokens[i] for i in shard) <= available for shard in balanced):
+            return balanced
+        return greedy
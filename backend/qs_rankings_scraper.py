@@ -1,12 +1,17 @@
-import requests
+import asyncio
+import httpx
 import json
+import sys
 import time
 import mysql.connector
 import os
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
 from typing import Dict, List, Any, Optional
-import re
+from name_matcher import NameMatcher
+from polite_fetcher import PoliteFetcher
+from rankings_parser import RankingsPageParser
+from catalog_sync import RANK_DEPENDENT_HASH_COLUMNS, bump_catalog_version, existing_hash_columns
+from rankings_store import RankingsStore
 
 # Load environment variables
 load_dotenv()
@@ -20,17 +25,32 @@ class QSRankingsScraper:
             'port': int(os.getenv('DB_PORT', 3306)),
             'database': os.getenv('DB_NAME', 'universitydb')
         }
+        self.rankings_store = RankingsStore(self.db_config)
+        self.rankings_source = 'QS World University Rankings'
+        # Hard-coded rows used when scraping fails; they are not a real edition and stay out of history
+        self.fallback_source = 'QS World University Rankings (Fallback)'
+        # Minimum fuzzy-match score for a scraped name to count as an existing university
+        self.match_threshold = float(os.getenv('RANKING_MATCH_THRESHOLD', 0.7))
         self.base_url = "https://www.topuniversities.com"
         self.rankings_url = "https://www.topuniversities.com/university-rankings/world-university-rankings"
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.parser = RankingsPageParser(use_lxml=os.getenv('SCRAPER_PARSER', 'lxml') == 'lxml')
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
             'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
-        })
+        }
+        # Pages are cached on disk and revalidated; SCRAPER_OFFLINE replays the cache as fixtures
+        self.fetcher = PoliteFetcher(
+            cache_dir=os.getenv('SCRAPER_CACHE_DIR', '.scraper_cache'),
+            per_host_concurrency=int(os.getenv('SCRAPER_HOST_CONCURRENCY', 2)),
+            min_interval=float(os.getenv('SCRAPER_MIN_INTERVAL', 0.5)),
+            max_retries=int(os.getenv('SCRAPER_MAX_RETRIES', 3)),
+            max_retry_after=float(os.getenv('SCRAPER_MAX_RETRY_AFTER', 60)),
+            headers=self.headers,
+            offline=os.getenv('SCRAPER_OFFLINE', 'false').lower() == 'true'
+        )
         
     def get_connection(self):
         """Get MySQL database connection"""
@@ -40,6 +60,12 @@ class QSRankingsScraper:
             print(f"Database connection error: {err}")
             return None
     
+    def fetch_pages(self, urls: List[str]) -> Dict[str, Any]:
+        """
+        Fetch ranking, subject or detail pages concurrently through the polite fetcher
+        """
+        return asyncio.run(self.fetcher.fetch_many(urls))
+    
     def scrape_rankings_data(self, year: str = "2025", limit: int = 500) -> List[Dict[str, Any]]:
         """
         Scrape university rankings data from QS World University Rankings
@@ -47,147 +73,68 @@ class QSRankingsScraper:
         print(f"Attempting to scrape QS World University Rankings for {year}...")
         
         try:
-            # Try to get the rankings page
-            response = self.session.get(f"{self.rankings_url}/{year}")
-            if response.status_code != 200:
-                # Fallback to main rankings page
-                response = self.session.get(self.rankings_url)
+            # Fetch the year page and the main rankings page concurrently
+            year_url = f"{self.rankings_url}/{year}"
+            pages = self.fetch_pages([year_url, self.rankings_url])
+            page = pages[year_url] if pages[year_url] and pages[year_url].status == 200 else pages[self.rankings_url]
+            if not page or page.status != 200:
+                raise httpx.HTTPError(f"Rankings page unavailable (status {page.status if page else 'n/a'})")
+            document = self.parser.parse_document(page.content)
             
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Ranking pages usually ship their data as JSON; use it when present
+            universities = self.parser.extract_json_records(document, year)[:limit]
+            if len(universities) >= 3:
+                print(f"Extracted {len(universities)} universities from embedded JSON")
+                return universities
             
             universities = []
             
-            # Look for university data in various possible structures
-            # Method 1: Look for table rows
-            table_rows = soup.find_all('tr', class_=re.compile(r'.*university.*|.*ranking.*', re.I))
-            if not table_rows:
-                # Method 2: Look for div containers with university data
-                table_rows = soup.find_all('div', class_=re.compile(r'.*university.*|.*ranking.*|.*institution.*', re.I))
-            
-            if not table_rows:
-                # Method 3: Look for any elements containing university names
-                table_rows = soup.find_all(['div', 'tr', 'li'], string=re.compile(r'University|Institute|College', re.I))
+            # Look for university data in table rows, containers, or any element naming one
+            table_rows = self.parser.find_rows(document)
             
             print(f"Found {len(table_rows)} potential university entries")
             
             # If no data found or very little data, use fallback immediately
             if not table_rows or len(table_rows) < 5:
                 print("No reliable university data found on website, using reliable fallback data")
-                return self._get_fallback_rankings_data()
+                return self._get_fallback_rankings_data(year)
             
             # Try to extract data, but limit initial attempts to validate quality
             for i, row in enumerate(table_rows[:min(10, limit)]):
                 if i % 5 == 0:
                     print(f"Processing entry {i+1}/{min(len(table_rows), limit)}...")
                 
-                university_data = self._extract_university_data(row, i + 1)
+                university_data = self.parser.extract_university_data(row, i + 1, year)
                 if university_data and len(university_data['name']) > 10:  # Basic validation
                     universities.append(university_data)
-                
-                # Add delay to be respectful to the server
-                time.sleep(0.1)
             
             # If we didn't get good results, use fallback
             if len(universities) < 3 or any('0/4' in uni['name'] for uni in universities):
                 print("Scraped data appears corrupted, using reliable fallback data")
-                return self._get_fallback_rankings_data()
+                return self._get_fallback_rankings_data(year)
             
             # If initial validation passed, continue with more entries
             for i, row in enumerate(table_rows[10:limit]):
                 if (i + 10) % 50 == 0:
                     print(f"Processing entry {i+11}/{min(len(table_rows), limit)}...")
                 
-                university_data = self._extract_university_data(row, i + 11)
+                university_data = self.parser.extract_university_data(row, i + 11, year)
                 if university_data:
                     universities.append(university_data)
-                
-                # Add delay to be respectful to the server
-                time.sleep(0.1)
             
             print(f"Successfully scraped {len(universities)} universities")
             return universities
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Error scraping rankings: {e}")
             print("Using reliable fallback data instead")
-            return self._get_fallback_rankings_data()
+            return self._get_fallback_rankings_data(year)
         except Exception as e:
             print(f"Unexpected error: {e}")
             print("Using reliable fallback data instead")
-            return self._get_fallback_rankings_data()
-    
-    def _extract_university_data(self, element, rank: int) -> Optional[Dict[str, Any]]:
-        """
-        Extract university data from a DOM element
-        """
-        try:
-            # Try to find university name
-            name = None
-            country = None
-            
-            # Look for university name in various ways
-            name_selectors = [
-                'a[href*="universities"]',
-                '.university-name',
-                '.institution-name',
-                'h3', 'h4', 'h5',
-                'a[title]',
-                'strong',
-                '.name'
-            ]
-            
-            for selector in name_selectors:
-                name_elem = element.select_one(selector)
-                if name_elem:
-                    name = name_elem.get_text(strip=True)
-                    if name and len(name) > 5:  # Basic validation
-                        break
-            
-            # If no name found in selectors, try text content
-            if not name:
-                text_content = element.get_text(strip=True)
-                # Look for patterns that might be university names
-                university_pattern = r'([A-Z][^\n]*(?:University|Institute|College|School)[^\n]*?)'
-                match = re.search(university_pattern, text_content)
-                if match:
-                    name = match.group(1).strip()
-            
-            # Look for country information
-            country_selectors = [
-                '.country',
-                '.location',
-                'img[alt]',
-                '.flag'
-            ]
-            
-            for selector in country_selectors:
-                country_elem = element.select_one(selector)
-                if country_elem:
-                    if country_elem.name == 'img':
-                        country = country_elem.get('alt', '')
-                    else:
-                        country = country_elem.get_text(strip=True)
-                    if country:
-                        break
-            
-            # If we have a valid name, create university data
-            if name and len(name) > 3:
-                return {
-                    'name': name,
-                    'country': country or 'Unknown',
-                    'ranking': rank,
-                    'source': 'QS World University Rankings',
-                    'year': '2025'
-                }
-            
-            return None
-            
-        except Exception as e:
-            print(f"Error extracting data from element: {e}")
-            return None
+            return self._get_fallback_rankings_data(year)
     
-    def _get_fallback_rankings_data(self) -> List[Dict[str, Any]]:
+    def _get_fallback_rankings_data(self, year: str = "2025") -> List[Dict[str, Any]]:
         """
         Provide fallback rankings data when scraping fails
         """
@@ -248,86 +195,78 @@ class QSRankingsScraper:
         ]
         
         for uni in fallback_data:
-            uni['source'] = 'QS World University Rankings (Fallback)'
-            uni['year'] = '2025'
+            uni['source'] = self.fallback_source
+            uni['year'] = year
         
         return fallback_data
     
-    def update_university_rankings(self, rankings_data: List[Dict[str, Any]]) -> bool:
+    def update_university_rankings(self, rankings_data: List[Dict[str, Any]], year: Optional[str] = None) -> bool:
         """
-        Update university rankings in the database
+        Record a year of rankings in the history store and update current rankings
         """
         conn = self.get_connection()
         if not conn:
             print("Failed to connect to database")
             return False
         
+        ranking_year = int(year or rankings_data[0]['year'])
+        
         try:
             cursor = conn.cursor()
-            updated_count = 0
-            new_count = 0
+            self.rankings_store.prepare(cursor, ranking_year)
             
+            # Build the fuzzy-match index once for the whole run
+            start = time.perf_counter()
+            cursor.execute("SELECT id, name, country_name, global_ranking FROM universities")
+            current_rankings = {}
+            identities = {}
+            matcher = NameMatcher(threshold=self.match_threshold)
+            for university_id, name, country_name, global_ranking in cursor.fetchall():
+                matcher.add(university_id, name, country_name)
+                current_rankings[university_id] = global_ranking
+                identities[university_id] = (name, country_name)
+            
+            # Match every scraped row; a university keeps only its best-scoring row
+            best_matches = {}
+            unmatched = []
             for uni_data in rankings_data:
-                name = uni_data['name']
-                country = uni_data['country']
-                ranking = uni_data['ranking']
-                
-                # Try to find existing university by name (fuzzy matching)
-                search_query = """
-                SELECT id, name, global_ranking FROM universities 
-                WHERE LOWER(name) LIKE %s OR LOWER(name) LIKE %s
-                ORDER BY 
-                    CASE 
-                        WHEN LOWER(name) = %s THEN 1
-                        WHEN LOWER(name) LIKE %s THEN 2
-                        ELSE 3
-                    END
-                LIMIT 1
+                match = matcher.match(uni_data['name'], uni_data.get('country'))
+                if not match:
+                    unmatched.append(uni_data)
+                    continue
+                university_id, existing_name, score = match
+                if university_id not in best_matches or score > best_matches[university_id][2]:
+                    best_matches[university_id] = (uni_data['ranking'], existing_name, score)
+            
+            changed = {
+                university_id: ranking
+                for university_id, (ranking, _, _) in best_matches.items()
+                if current_rankings.get(university_id) != ranking
+            }
+            for university_id, ranking in changed.items():
+                _, existing_name, score = best_matches[university_id]
+                print(f"Updated {existing_name}: ranking {current_rankings.get(university_id)} -> {ranking} "
+                      f"(match {score:.2f})")
+            
+            if unmatched:
+                # Insert new universities with ranking
+                insert_query = """
+                INSERT INTO universities (
+                    country_code, country_name, name, global_ranking,
+                    tuition_fee_usd, scholarship_available, admission_rate,
+                    student_population, founded_year, type, research_areas,
+                    campus_size, admission_requirements, notable_faculty,
+                    program_strengths, application_deadline
+                ) VALUES (
+                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                )
                 """
                 
-                name_lower = name.lower()
-                search_patterns = [
-                    f"%{name_lower}%",
-                    f"%{name_lower.replace('university', '').replace('college', '').strip()}%",
-                    name_lower,
-                    f"{name_lower}%"
-                ]
-                
-                cursor.execute(search_query, search_patterns)
-                existing = cursor.fetchone()
-                
-                if existing:
-                    # Update existing university ranking
-                    university_id, existing_name, current_ranking = existing
-                    
-                    if current_ranking != ranking:
-                        update_query = """
-                        UPDATE universities 
-                        SET global_ranking = %s, 
-                            updated_at = CURRENT_TIMESTAMP
-                        WHERE id = %s
-                        """
-                        cursor.execute(update_query, (ranking, university_id))
-                        updated_count += 1
-                        print(f"Updated {existing_name}: ranking {current_ranking} -> {ranking}")
-                else:
-                    # Insert new university with ranking
-                    insert_query = """
-                    INSERT INTO universities (
-                        country_code, country_name, name, global_ranking,
-                        tuition_fee_usd, scholarship_available, admission_rate,
-                        student_population, founded_year, type, research_areas,
-                        campus_size, admission_requirements, notable_faculty,
-                        program_strengths, application_deadline
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                    )
-                    """
-                    
-                    # Generate basic data for new university
-                    country_code = self._get_country_code(country)
-                    values = (
-                        country_code, country, name, ranking,
+                # Generate basic data for new universities
+                values = [
+                    (
+                        self._get_country_code(uni_data['country']), uni_data['country'],
+                        uni_data['name'], uni_data['ranking'],
                         50000.0,  # Default tuition
                         True,     # Scholarship available
                         15.5,     # Default admission rate
@@ -341,16 +280,52 @@ class QSRankingsScraper:
                         'Academic Excellence; Research Opportunities; Global Recognition',
                         'March 1'  # Default deadline
                     )
-                    
-                    cursor.execute(insert_query, values)
-                    new_count += 1
-                    print(f"Added new university: {name} (Ranking: {ranking})")
+                    for uni_data in unmatched
+                ]
+                cursor.executemany(insert_query, values)
+                for uni_data in unmatched:
+                    print(f"Added new university: {uni_data['name']} (Ranking: {uni_data['ranking']})")
+                
+                # Resolve the new ids so their ranks enter the history too. Match on name and
+                # country, skipping rows that existed before this run (same name, other country)
+                new_keys = {(uni_data['name'], uni_data['country']): uni_data['ranking'] for uni_data in unmatched}
+                cursor.execute(
+                    f"SELECT id, name, country_name FROM universities "
+                    f"WHERE (name, country_name) IN ({', '.join(['(%s, %s)'] * len(new_keys))})",
+                    [value for key in new_keys for value in key]
+                )
+                for university_id, name, country_name in cursor.fetchall():
+                    if university_id not in current_rankings and university_id not in best_matches:
+                        best_matches[university_id] = (new_keys[(name, country_name)], name, 1.0)
+                        identities[university_id] = (name, country_name)
+            new_count = len(unmatched)
+            
+            if any(uni_data.get('source') == self.fallback_source for uni_data in rankings_data):
+                # Fallback rows are not a scraped edition: refresh current ranks but record no history
+                resets = ''.join(f", {column} = NULL" for column in existing_hash_columns(cursor, RANK_DEPENDENT_HASH_COLUMNS))
+                cursor.executemany(
+                    f"UPDATE universities SET global_ranking = %s, updated_at = CURRENT_TIMESTAMP{resets} WHERE id = %s",
+                    [(ranking, university_id) for university_id, ranking in changed.items()]
+                )
+                updated_count = len(changed)
+                recorded_count = 0
+            else:
+                # Append this year's ranks to the history (keyed on name and country, which survive
+                # catalog reloads), then materialize them in one statement
+                recorded_count = self.rankings_store.append_rankings(
+                    cursor, self.rankings_source, ranking_year,
+                    [(*identities[university_id], ranking) for university_id, (ranking, _, _) in best_matches.items()]
+                )
+                updated_count = self.rankings_store.materialize_current_ranks(cursor, self.rankings_source, ranking_year)
             
+            conn.commit()
+            bump_catalog_version(cursor)
             conn.commit()
             print(f"\nRankings update completed:")
+            print(f"- Ranks recorded for {ranking_year}: {recorded_count}")
             print(f"- Updated existing universities: {updated_count}")
             print(f"- Added new universities: {new_count}")
-            print(f"- Total processed: {len(rankings_data)}")
+            print(f"- Total processed: {len(rankings_data)} in {time.perf_counter() - start:.2f}s")
             
             return True
             
@@ -397,7 +372,7 @@ class QSRankingsScraper:
             return False
         
         # Update database
-        success = self.update_university_rankings(rankings_data)
+        success = self.update_university_rankings(rankings_data, year)
         
         if success:
             print("\n" + "=" * 50)
@@ -412,10 +387,15 @@ def main():
     """
     Main function to run the scraper
     """
+    if '--offline' in sys.argv:
+        os.environ['SCRAPER_OFFLINE'] = 'true'
     scraper = QSRankingsScraper()
     
-    # Run the update with current year and reasonable limit
-    success = scraper.run_update(year="2025", limit=200)
+    # Ranking edition to record, e.g. --year=2026
+    year = next((arg.split('=', 1)[1] for arg in sys.argv if arg.startswith('--year=')), "2025")
+    
+    # Run the update with a reasonable limit
+    success = scraper.run_update(year=year, limit=200)
     
     if success:
         print("\nRankings update completed successfully!")
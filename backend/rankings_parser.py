@@ -0,0 +1,237 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+    from lxml.cssselect import LxmlTranslator
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Tried in order; the first one yielding a plausible name wins
+NAME_SELECTORS = [
+    'a[href*="universities"]',
+    '.university-name',
+    '.institution-name',
+    'h3', 'h4', 'h5',
+    'a[title]',
+    'strong',
+    '.name'
+]
+COUNTRY_SELECTORS = ['.country', '.location', 'img[alt]', '.flag']
+
+UNIVERSITY_PATTERN = re.compile(r'([A-Z][^\n]*(?:University|Institute|College|School)[^\n]*?)')
+ROW_CLASS_PATTERN = re.compile(r'.*university.*|.*ranking.*', re.I)
+CONTAINER_CLASS_PATTERN = re.compile(r'.*university.*|.*ranking.*|.*institution.*', re.I)
+NAME_TEXT_PATTERN = re.compile(r'University|Institute|College', re.I)
+
+# Keys ranking payloads use for the fields we need
+JSON_NAME_KEYS = ('title', 'name', 'institution', 'university', 'university_name')
+JSON_RANK_KEYS = ('rank', 'rank_display', 'ranking', 'position', 'overall_rank')
+JSON_COUNTRY_KEYS = ('country', 'country_name', 'location', 'region')
+ASSIGNED_JSON_PATTERN = re.compile(r'=\s*(\{.*\}|\[.*\])\s*;?\s*$', re.S)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+if LXML_AVAILABLE:
+    # Compiled once at import; lxml evaluates them in C. Descendants only, like
+    # bs4's select_one (CSSSelector would also match the row element itself)
+    _css_translator = LxmlTranslator()
+    _NAME_SELECTORS = [etree.XPath(_css_translator.css_to_xpath(selector, prefix='descendant::'))
+                       for selector in NAME_SELECTORS]
+    _COUNTRY_SELECTORS = [etree.XPath(_css_translator.css_to_xpath(selector, prefix='descendant::'))
+                          for selector in COUNTRY_SELECTORS]
+    _REGEX_NS = {'re': 'http://exslt.org/regular-expressions'}
+    _ROW_XPATHS = [
+        etree.XPath("//tr[re:test(@class, 'university|ranking', 'i')]", namespaces=_REGEX_NS),
+        etree.XPath("//div[re:test(@class, 'university|ranking|institution', 'i')]", namespaces=_REGEX_NS),
+        etree.XPath("//*[self::div or self::tr or self::li][not(*)][re:test(text(), 'University|Institute|College', 'i')]",
+                    namespaces=_REGEX_NS),
+    ]
+    _SCRIPTS = etree.XPath("//script")
+
+
+def _parse_rank(value: Any) -> Optional[int]:
+    """Parse ranks like 12, "=12" or "501-510" to an int"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.search(r'\d+', str(value or ''))
+    return int(match.group()) if match else None
+
+
+def _first(record: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    for key in keys:
+        value = record.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _find_ranking_lists(payload: Any, found: List[List[Dict[str, Any]]]):
+    """Collect every list of dicts in a JSON document that looks like ranking rows"""
+    if isinstance(payload, dict):
+        for value in payload.values():
+            _find_ranking_lists(value, found)
+    elif isinstance(payload, list):
+        rows = [item for item in payload if isinstance(item, dict) and _first(item, JSON_NAME_KEYS)]
+        if len(rows) >= 3 and any(_first(item, JSON_RANK_KEYS) is not None for item in rows):
+            found.append(rows)
+        for item in payload:
+            if isinstance(item, (dict, list)):
+                _find_ranking_lists(item, found)
+
+
+class RankingsPageParser:
+    """
+    Parses a rankings page into university records.
+
+    Embedded JSON payloads (script tags carrying the ranking data) are tried
+    first; otherwise rows are found and read through the DOM. The DOM path
+    uses lxml with selectors compiled once when it is installed and falls
+    back to BeautifulSoup with html.parser.
+    """
+
+    def __init__(self, use_lxml: bool = True):
+        self.use_lxml = use_lxml and LXML_AVAILABLE
+
+    @property
+    def backend(self) -> str:
+        return 'lxml' if self.use_lxml else 'html.parser'
+
+    def parse_document(self, content: bytes):
+        if self.use_lxml:
+            return lxml_html.fromstring(content)
+        return BeautifulSoup(content, 'html.parser')
+
+    def _script_texts(self, document) -> List[Tuple[Optional[str], Optional[str], str]]:
+        if self.use_lxml:
+            return [(script.get('type'), script.get('id'), script.text or '') for script in _SCRIPTS(document)]
+        return [(script.get('type'), script.get('id'), script.string or '') for script in document.find_all('script')]
+
+    def extract_json_records(self, document, year: str) -> List[Dict[str, Any]]:
+        """
+        Return ranking records from embedded JSON payloads, or [] if there are none
+        """
+        found: List[List[Dict[str, Any]]] = []
+        for script_type, script_id, text in self._script_texts(document):
+            text = text.strip()
+            if not text or ('rank' not in text and 'Rank' not in text):
+                continue
+            payload = None
+            if (script_type or '').endswith('json') or script_id == '__NEXT_DATA__':
+                try:
+                    payload = json.loads(text)
+                except ValueError:
+                    payload = None
+            else:
+                # window.__DATA__ = {...}; style assignments
+                match = ASSIGNED_JSON_PATTERN.search(text)
+                if match:
+                    try:
+                        payload = json.loads(match.group(1))
+                    except ValueError:
+                        payload = None
+            if payload is not None:
+                _find_ranking_lists(payload, found)
+
+        if not found:
+            return []
+
+        records = []
+        for position, row in enumerate(max(found, key=len), start=1):
+            name = TAG_PATTERN.sub('', str(_first(row, JSON_NAME_KEYS))).strip()
+            country = _first(row, JSON_COUNTRY_KEYS)
+            if isinstance(country, dict):
+                country = _first(country, ('name', 'title'))
+            records.append({
+                'name': name,
+                'country': TAG_PATTERN.sub('', str(country)).strip() if country else 'Unknown',
+                'ranking': _parse_rank(_first(row, JSON_RANK_KEYS)) or position,
+                'source': 'QS World University Rankings',
+                'year': year
+            })
+        return records
+
+    def find_rows(self, document) -> List[Any]:
+        """
+        Candidate ranking rows, trying the same three strategies in order
+        """
+        if self.use_lxml:
+            for xpath in _ROW_XPATHS:
+                rows = xpath(document)
+                if rows:
+                    return rows
+            return []
+
+        rows = document.find_all('tr', class_=ROW_CLASS_PATTERN)
+        if not rows:
+            rows = document.find_all('div', class_=CONTAINER_CLASS_PATTERN)
+        if not rows:
+            rows = document.find_all(['div', 'tr', 'li'], string=NAME_TEXT_PATTERN)
+        return rows
+
+    def _raw_text(self, element) -> str:
+        if self.use_lxml:
+            return ''.join(element.itertext())
+        return element.get_text()
+
+    def _text(self, element) -> str:
+        """Element text with runs of whitespace (including newlines) collapsed, identical on both backends"""
+        return ' '.join(self._raw_text(element).split())
+
+    def _select_first(self, element, index: int, selectors, compiled) -> Optional[Any]:
+        if self.use_lxml:
+            matches = compiled[index](element)
+            return matches[0] if matches else None
+        return element.select_one(selectors[index])
+
+    def extract_university_data(self, element, rank: int, year: str) -> Optional[Dict[str, Any]]:
+        """
+        Extract university data from a DOM row
+        """
+        try:
+            name = None
+            country = None
+            compiled_names = _NAME_SELECTORS if self.use_lxml else None
+            compiled_countries = _COUNTRY_SELECTORS if self.use_lxml else None
+
+            for index in range(len(NAME_SELECTORS)):
+                name_elem = self._select_first(element, index, NAME_SELECTORS, compiled_names)
+                if name_elem is not None:
+                    name = self._text(name_elem)
+                    if name and len(name) > 5:  # Basic validation
+                        break
+
+            # If no name found in selectors, try text content
+            if not name:
+                # The pattern stops at line breaks, so search the uncollapsed text
+                match = UNIVERSITY_PATTERN.search(self._raw_text(element))
+                if match:
+                    name = ' '.join(match.group(1).split())
+
+            for index in range(len(COUNTRY_SELECTORS)):
+                country_elem = self._select_first(element, index, COUNTRY_SELECTORS, compiled_countries)
+                if country_elem is not None:
+                    tag = country_elem.tag if self.use_lxml else country_elem.name
+                    country = country_elem.get('alt', '') if tag == 'img' else self._text(country_elem)
+                    if country:
+                        break
+
+            if name and len(name) > 3:
+                return {
+                    'name': name,
+                    'country': country or 'Unknown',
+                    'ranking': rank,
+                    'source': 'QS World University Rankings',
+                    'year': year
+                }
+            return None
+
+        except Exception as e:
+            print(f"Error extracting data from element: {e}")
+            return None
@@ -0,0 +1,203 @@
+import mysql.connector
+
+from catalog_sync import RANK_DEPENDENT_HASH_COLUMNS, existing_hash_columns
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# First year partitioned explicitly; later years are split off pmax on demand
+FIRST_PARTITION_YEAR = 2020
+
+
+class RankingsStore:
+    """
+    Append-only history of university ranks per source and year.
+
+    university_rankings is partitioned by year, so a refresh appends one
+    partition's worth of rows instead of rewriting universities, and trend
+    queries prune to the years they ask for without touching the main table.
+    The current rank is materialized back onto universities.global_ranking
+    with a single set-based UPDATE.
+
+    History rows are keyed on the university's name and country rather than
+    its id, because catalog reloads (bulk and pipelined CSV loads) assign
+    new ids and would otherwise orphan or misattribute past ranks.
+    """
+
+    def __init__(self, db_config: Dict[str, Any], batch_size: int = 1000):
+        self.db_config = db_config
+        self.batch_size = batch_size
+
+    def get_connection(self):
+        return mysql.connector.connect(**self.db_config)
+
+    def ensure_table(self, cursor):
+        """Create the partitioned history table on first use"""
+        partitions = ',\n'.join(
+            f"PARTITION p{year} VALUES LESS THAN ({year + 1})"
+            for year in range(FIRST_PARTITION_YEAR, FIRST_PARTITION_YEAR + 6)
+        )
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS university_rankings (
+            university_name VARCHAR(255) NOT NULL,
+            country_name VARCHAR(100) NOT NULL DEFAULT '',
+            source VARCHAR(100) NOT NULL,
+            year SMALLINT NOT NULL,
+            `rank` INT NOT NULL,
+            recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            PRIMARY KEY (university_name, country_name, source, year),
+            INDEX idx_source_year_rank (source, year, `rank`)
+        )
+        PARTITION BY RANGE (year) (
+            {partitions},
+            PARTITION pmax VALUES LESS THAN MAXVALUE
+        )
+        """)
+        self._migrate_id_keyed_history(cursor)
+
+    def _migrate_id_keyed_history(self, cursor):
+        """
+        Re-key history written by earlier versions (keyed on university_id) on
+        name and country, resolving ids against the current catalog
+        """
+        cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'university_rankings' AND COLUMN_NAME = 'university_id'
+        """)
+        if not cursor.fetchone()[0]:
+            return
+        print("Re-keying ranking history on university name and country...")
+        cursor.execute("""
+        ALTER TABLE university_rankings
+            ADD COLUMN university_name VARCHAR(255) NOT NULL DEFAULT '' FIRST,
+            ADD COLUMN country_name VARCHAR(100) NOT NULL DEFAULT '' AFTER university_name
+        """)
+        cursor.execute("""
+        UPDATE university_rankings r
+        JOIN universities u ON u.id = r.university_id
+        SET r.university_name = u.name, r.country_name = COALESCE(u.country_name, '')
+        """)
+        # Rows whose university no longer exists cannot be attributed
+        cursor.execute("DELETE FROM university_rankings WHERE university_name = ''")
+        cursor.execute("""
+        ALTER TABLE university_rankings
+            DROP PRIMARY KEY,
+            ADD PRIMARY KEY (university_name, country_name, source, year),
+            DROP COLUMN university_id
+        """)
+
+    def ensure_partition(self, cursor, year: int):
+        """Split a dedicated partition for year off pmax if it does not exist yet"""
+        cursor.execute("""
+        SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'university_rankings'
+        """)
+        existing = {row[0] for row in cursor.fetchall()}
+        if f"p{year}" in existing or year < FIRST_PARTITION_YEAR:
+            return
+        # Older gaps before the requested year are split off too so ranges stay contiguous
+        last = max(int(name[1:]) for name in existing if name and name != 'pmax')
+        new_partitions = ', '.join(
+            f"PARTITION p{y} VALUES LESS THAN ({y + 1})" for y in range(last + 1, year + 1)
+        )
+        print(f"Adding ranking partitions up to {year}...")
+        cursor.execute(f"""
+        ALTER TABLE university_rankings REORGANIZE PARTITION pmax INTO (
+            {new_partitions},
+            PARTITION pmax VALUES LESS THAN MAXVALUE
+        )
+        """)
+
+    def prepare(self, cursor, year: int):
+        """
+        Create the table and the year's partition. DDL commits implicitly in
+        MySQL, so call this before any writes of the same transaction.
+        """
+        self.ensure_table(cursor)
+        self.ensure_partition(cursor, year)
+
+    def append_rankings(self, cursor, source: str, year: int, ranks: Iterable[Tuple[str, str, int]]) -> int:
+        """
+        Bulk-append (university name, country name, rank) rows for one source and year.
+        Re-running a year replaces that year's ranks rather than duplicating them.
+        """
+        rows = [(name, country or '', source, year, rank) for name, country, rank in ranks]
+        if not rows:
+            return 0
+        insert_query = """
+        INSERT INTO university_rankings (university_name, country_name, source, year, `rank`)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE `rank` = VALUES(`rank`)
+        """
+        for start in range(0, len(rows), self.batch_size):
+            cursor.executemany(insert_query, rows[start:start + self.batch_size])
+        return len(rows)
+
+    def materialize_current_ranks(self, cursor, source: str, year: int) -> int:
+        """
+        Copy one source/year's ranks onto universities.global_ranking in one statement,
+        touching only rows whose rank actually changes. Sync hashes that cover
+        global_ranking are cleared on those rows so the next sync rehashes them.
+        """
+        resets = ''.join(f", u.{column} = NULL" for column in existing_hash_columns(cursor, RANK_DEPENDENT_HASH_COLUMNS))
+        cursor.execute(f"""
+        UPDATE universities u
+        JOIN university_rankings r
+          ON r.university_name = u.name AND r.country_name = COALESCE(u.country_name, '')
+         AND r.source = %s AND r.year = %s
+        SET u.global_ranking = r.`rank`,
+            u.updated_at = CURRENT_TIMESTAMP{resets}
+        WHERE NOT (u.global_ranking <=> r.`rank`)
+        """, (source, year))
+        return cursor.rowcount
+
+    def get_rank_history(self, university_id: int, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Rank per year for one university, oldest first
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            query = """
+            SELECT r.source, r.year, r.`rank` FROM university_rankings r
+            JOIN universities u ON r.university_name = u.name AND r.country_name = COALESCE(u.country_name, '')
+            WHERE u.id = %s
+            """
+            params: List[Any] = [university_id]
+            if source:
+                query += " AND r.source = %s"
+                params.append(source)
+            cursor.execute(query + " ORDER BY r.source, r.year", params)
+            return cursor.fetchall()
+        except mysql.connector.Error as err:
+            print(f"Error fetching rank history: {err}")
+            return []
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_rank_movers(self, source: str, from_year: int, to_year: int, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Universities with the largest rank change between two years; reads only
+        the two year partitions
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+            SELECT u.id AS university_id, cur.university_name, cur.country_name,
+                   prev.`rank` AS from_rank, cur.`rank` AS to_rank, prev.`rank` - cur.`rank` AS change_in_rank
+            FROM university_rankings cur
+            JOIN university_rankings prev
+              ON prev.university_name = cur.university_name AND prev.country_name = cur.country_name
+             AND prev.source = cur.source AND prev.year = %s
+            LEFT JOIN universities u ON u.name = cur.university_name AND COALESCE(u.country_name, '') = cur.country_name
+            WHERE cur.source = %s AND cur.year = %s
+            ORDER BY ABS(prev.`rank` - cur.`rank`) DESC
+            LIMIT %s
+            """, (from_year, source, to_year, limit))
+            return cursor.fetchall()
+        except mysql.connector.Error as err:
+            print(f"Error fetching rank movers: {err}")
+            return []
+        finally:
+            cursor.close()
+            conn.close()
@@ -1,8 +1,11 @@
 import asyncio
-from typing import Dict, List, Any
+import os
+from typing import Dict, List, Any, AsyncIterator, Optional
 from datetime import datetime
 import json
 import re
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 
 # Langgraph imports
@@ -10,58 +13,130 @@ from langgraph.graph import StateGraph, END
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
+from openai import APITimeoutError
 from typing_extensions import TypedDict
+import httpx
 
 # University database (in production, this would be a real database)
 from university_database_mysql import university_db
+from cv_extraction import CVExtractor
+from cv_features import ProfileScorer, extract_cv_features
+from deadlines import Deadline, DeadlineExceeded, LatencyTracker, hedged
+from research_index import load_research_index
+from structured_output import JSON_MODE, SCORES_SHAPE, index_scores, parse_with_repair
+from model_routing import ModelRouter
+from prompt_budget import PromptBudget, candidate_legend, candidate_rows, compact_json, compact_profile, count_message_tokens
+from workflow_metrics import (
+    instrument_node, record_llm_call, record_hedge, record_degradation, annotate_span, current_node, start_trace, summarize_trace
+)
+
+# Timeouts raised by LLM calls that nodes answer with a local fallback
+LLM_TIMEOUT_ERRORS = (asyncio.TimeoutError, APITimeoutError)
 
 class RecommendationState(TypedDict):
     student_profile: Dict[str, Any]
+    candidate_universities: Optional[List[Dict[str, Any]]]
     cv_analysis: Dict[str, Any]
     university_matches: List[Dict[str, Any]]
     ai_analysis: str
     final_recommendations: List[Dict[str, Any]]
     processing_step: str
+    deadline: Optional[Deadline]
 
 class UniversityRecommendationEngine:
     def __init__(self):
-        # Initialize LLM (you'll need to set OPENROUTER_API_KEY environment variable)
-        import os
-        api_key = os.getenv("OPENROUTER_API_KEY")
-        if not api_key:
+        # Initialize LLM clients (you'll need to set OPENROUTER_API_KEY environment variable)
+        # Each node is routed to a model tier and completion token cap
+        self.model_router = ModelRouter.from_env()
+        self.api_key = os.getenv("OPENROUTER_API_KEY")
+        if not self.api_key:
             print("Warning: OpenRouter API key not set. Using mock responses.")
-            self.llm = None
-        else:
-            self.llm = ChatOpenAI(
-                model="openai/gpt-4",
-                temperature=0.3,
-                max_tokens=2000,
-                openai_api_key=api_key,
-                openai_api_base="https://openrouter.ai/api/v1",
-                default_headers={
-                    "HTTP-Referer": "http://localhost:3000",
-                    "X-Title": "University Recommender"
-                }
-            )
+        self._build_llms()
+        
+        # JSON mode for structured replies (disable for models that do not support response_format)
+        self.json_mode = os.getenv("LLM_JSON_MODE", "true").lower() == "true"
+        
+        # Shared cap on in-flight LLM calls across concurrent requests and batches
+        self.llm_semaphore = asyncio.Semaphore(int(os.getenv("LLM_MAX_CONCURRENCY", 8)))
+        
+        # End-to-end budget per recommendation; nodes fall back to local results when it runs short
+        self.deadline_seconds = float(os.getenv("RECOMMEND_DEADLINE_SECONDS", 45))
+        self.min_call_seconds = float(os.getenv("LLM_MIN_CALL_SECONDS", 1.0))
+        # Kept back by earlier nodes so the user-facing summary still gets a chance
+        self.summary_reserve_seconds = float(os.getenv("RECOMMEND_SUMMARY_RESERVE_SECONDS", 5))
+        
+        # A second request is fired when a call runs past this percentile of recent latencies
+        self.hedging_enabled = os.getenv("LLM_HEDGING", "true").lower() == "true"
+        self.hedge_percentile = float(os.getenv("LLM_HEDGE_PERCENTILE", 95))
+        self.latency_tracker = LatencyTracker(min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", 20)))
+        
+        # Local token counting; oversized candidate lists are sharded across parallel calls
+        self.prompt_budget = PromptBudget()
+        
+        # CV parsing runs in a process pool, off the event loop
+        self.cv_extractor = CVExtractor()
+        
+        # CV feature vectors per upload id, consumed by the local scorer
+        self.profile_scorer = ProfileScorer()
+        self.cv_features: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.cv_features_cache_size = int(os.getenv("CV_CACHE_SIZE", 256))
         
         # Initialize university database
         self.university_db = university_db
         
+        # Offline-built TF-IDF index over research areas; None until research_index.py has been run
+        self.research_index = load_research_index()
+        self.research_top_k = int(os.getenv("RESEARCH_INDEX_TOP_K", 50))
+        self.research_min_candidates = int(os.getenv("RESEARCH_MIN_CANDIDATES", 10))
+        # Keep the research index and the scorer's cached research text current between offline rebuilds
+        self.university_db.add_catalog_listener(self._on_catalog_change)
+        
         # Build the Langgraph workflow
         self.workflow = self._build_workflow()
     
+    def _build_llms(self, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        One ChatOpenAI per model tier, optionally on a shared HTTP client
+        """
+        self.tier_llms: Dict[str, ChatOpenAI] = {}
+        if self.api_key:
+            self.tier_llms = {
+                name: ChatOpenAI(
+                    model=tier.model,
+                    temperature=tier.temperature,
+                    max_tokens=self.model_router.default_route.max_tokens,
+                    timeout=float(os.getenv("LLM_REQUEST_TIMEOUT", 30)),
+                    max_retries=int(os.getenv("LLM_MAX_RETRIES", 1)),
+                    openai_api_key=self.api_key,
+                    openai_api_base=os.getenv("OPENROUTER_API_BASE", "https://openrouter.ai/api/v1"),
+                    default_headers={
+                        "HTTP-Referer": "http://localhost:3000",
+                        "X-Title": "University Recommender"
+                    },
+                    http_async_client=http_client
+                )
+                for name, tier in self.model_router.tiers.items()
+            }
+        self.llm = self.tier_llms.get(self.model_router.default_route.tier.name)
+    
+    def use_http_client(self, http_client: httpx.AsyncClient):
+        """
+        Move the LLM clients onto the application's shared HTTP client
+        """
+        self._build_llms(http_client)
+    
     def _build_workflow(self) -> StateGraph:
         """
         Build the Langgraph workflow for university recommendations
         """
         workflow = StateGraph(RecommendationState)
         
-        # Add nodes
-        workflow.add_node("analyze_profile", self._analyze_student_profile)
-        workflow.add_node("match_universities", self._match_universities)
-        workflow.add_node("score_matches", self._score_matches)
-        workflow.add_node("generate_analysis", self._generate_ai_analysis)
-        workflow.add_node("finalize_recommendations", self._finalize_recommendations)
+        # Add nodes, each wrapped with timing/LLM/candidate instrumentation
+        workflow.add_node("analyze_profile", instrument_node("analyze_profile", self._analyze_student_profile))
+        workflow.add_node("match_universities", instrument_node("match_universities", self._match_universities))
+        workflow.add_node("score_matches", instrument_node("score_matches", self._score_matches))
+        workflow.add_node("generate_analysis", instrument_node("generate_analysis", self._generate_ai_analysis))
+        workflow.add_node("finalize_recommendations", instrument_node("finalize_recommendations", self._finalize_recommendations))
         
         # Define the flow
         workflow.set_entry_point("analyze_profile")
@@ -94,17 +169,26 @@ class UniversityRecommendationEngine:
             ("human", "Student Profile: {profile}")
         ])
         
+        llm_insights = "Mock analysis: Strong academic profile with clear research interests and well-defined career goals."
         if self.llm:
-            response = await self.llm.ainvoke(
-                analysis_prompt.format_messages(profile=json.dumps(profile, indent=2))
-            )
-            llm_insights = response.content
-        else:
-            llm_insights = "Mock analysis: Strong academic profile with clear research interests and well-defined career goals."
+            try:
+                response = await self._invoke_llm(
+                    analysis_prompt.format_messages(profile=compact_json(compact_profile(profile))),
+                    deadline=state.get("deadline"),
+                    reserve=self.summary_reserve_seconds
+                )
+                llm_insights = response.content
+            except LLM_TIMEOUT_ERRORS:
+                # Matching does not read the insights; skip them rather than spend the deadline
+                record_degradation("deadline")
+        
+        cv_features = self.get_cv_features(profile.get("cv_upload_id"))
         
         # Parse the analysis
         analysis = {
             "academic_strength": self._extract_academic_strength(profile),
+            "applicant_strength": round(self.profile_scorer.applicant_strength(profile, cv_features), 2),
+            "cv_features": cv_features,
             "research_fit": profile.get("research_interests", ""),
             "geographic_preference": {
                 "continent": profile.get("preferred_continent", ""),
@@ -126,20 +210,51 @@ class UniversityRecommendationEngine:
         profile = state["student_profile"]
         analysis = state["cv_analysis"]
         
-        # Get all universities from database
-        all_universities = self.university_db.get_all_universities()
+        research_query = self._research_query(profile, analysis)
+        similarity: Dict[int, float] = {}
         
-        # Filter based on basic criteria
-        filtered_universities = []
+        # Batch requests hand in candidates already filtered for this profile's group
+        candidates = state.get("candidate_universities")
+        if candidates is None:
+            candidates = []
+            if self.research_index is not None and research_query:
+                # Research-aligned universities from the local index, most similar first;
+                # over-fetch so preference filtering still leaves top_k
+                hits = self.research_index.search(research_query, self.research_top_k * 4)
+                similarity = dict(hits)
+                retrieved = self.university_db.get_universities_by_ids([university_id for university_id, _ in hits])
+                candidates = self._filter_by_preferences(
+                    retrieved,
+                    analysis["geographic_preference"],
+                    analysis["budget_category"]
+                )[:self.research_top_k]
+                annotate_span(research_candidates=len(candidates))
+            
+            if len(candidates) < self.research_min_candidates:
+                # Get all universities from database
+                all_universities = self.university_db.get_all_universities()
+                annotate_span(catalog_size=len(all_universities))
+                seen = {uni["id"] for uni in candidates}
+                candidates = candidates + [
+                    uni for uni in self._filter_by_preferences(
+                        all_universities,
+                        analysis["geographic_preference"],
+                        analysis["budget_category"]
+                    )
+                    if uni["id"] not in seen
+                ]
+        elif self.research_index is not None and research_query:
+            similarity = self.research_index.similarity(research_query, [uni["id"] for uni in candidates])
+        annotate_span(candidates_in=len(candidates))
         
-        for uni in all_universities:
-            # Geographic filtering
-            if self._matches_geographic_preference(uni, analysis["geographic_preference"]):
-                # Budget filtering
-                if self._matches_budget_preference(uni, analysis["budget_category"]):
-                    # Degree level filtering
-                    if self._matches_degree_level(uni, profile.get("degree_level", "")):
-                        filtered_universities.append(uni)
+        # Degree level filtering; copy so scoring never mutates shared candidates
+        filtered_universities = [
+            dict(uni) for uni in candidates
+            if self._matches_degree_level(uni, profile.get("degree_level", ""))
+        ]
+        if self.research_index is not None:
+            for uni in filtered_universities:
+                uni["research_similarity"] = round(similarity.get(uni["id"], 0.0), 3)
         
         state["university_matches"] = filtered_universities
         state["processing_step"] = "universities_matched"
@@ -151,6 +266,12 @@ class UniversityRecommendationEngine:
         """
         profile = state["student_profile"]
         universities = state["university_matches"]
+        cv_features = state["cv_analysis"].get("cv_features")
+        
+        # Local personal-fit score for every candidate in one vectorized pass
+        fit_scores = self.profile_scorer.score(universities, profile, cv_features)
+        for uni, fit in zip(universities, fit_scores):
+            uni["profile_fit_score"] = float(fit)
         
         scoring_prompt = ChatPromptTemplate.from_messages([
             ("system", """
@@ -163,33 +284,73 @@ class UniversityRecommendationEngine:
             4. Financial feasibility - 20%
             5. Career goal alignment - 10%
             
-            Return a JSON object with university_id and match_score for each university.
+            Return a JSON object {{"scores": [{{"university_id": <id>, "match_score": <0-100>}}, ...]}}
+            with one entry for each university.
+            {legend}
             """),
             ("human", "Student Profile: {profile}\n\nUniversities to score: {universities}")
         ])
         
         if self.llm:
-            response = await self.llm.ainvoke(
-                scoring_prompt.format_messages(
-                    profile=json.dumps(profile, indent=2),
-                    universities=json.dumps([{"id": u["id"], "name": u["name"], "country": u["country"]} for u in universities], indent=2)
+            profile_text = compact_json(compact_profile(profile))
+            rows = candidate_rows(universities)
+            
+            def scoring_messages(indexes: List[int]):
+                return scoring_prompt.format_messages(
+                    profile=profile_text,
+                    universities="[" + ",".join(rows[i] for i in indexes) + "]",
+                    legend=candidate_legend()
                 )
-            )
             
-            # Parse scores and apply to universities
-            try:
-                scores = json.loads(response.content)
-                for uni in universities:
-                    score_data = next((s for s in scores if s["university_id"] == uni["id"]), None)
-                    uni["match_score"] = score_data["match_score"] if score_data else 50
-            except:
-                # Fallback scoring if LLM response parsing fails
-                for i, uni in enumerate(universities):
-                    uni["match_score"] = max(60, 95 - i * 5)  # Decreasing scores
+            deadline = state.get("deadline")
+            
+            async def invoke(messages):
+                return await self._invoke_llm(messages, json_mode=True, deadline=deadline, reserve=self.summary_reserve_seconds)
+            
+            async def complete_json(messages) -> str:
+                return (await invoke(messages)).content
+            
+            async def score_shard(shard: List[int]) -> Dict[int, float]:
+                response = await invoke(scoring_messages(shard))
+                scores = await parse_with_repair(response.content, index_scores, complete_json, SCORES_SHAPE)
+                # One targeted retry for just the universities the reply skipped
+                missing = [i for i in shard if universities[i]["id"] not in scores]
+                if missing:
+                    try:
+                        response = await invoke(scoring_messages(missing))
+                        scores.update(await parse_with_repair(response.content, index_scores, complete_json, SCORES_SHAPE))
+                    except Exception as e:
+                        print(f"Retry for {len(missing)} unscored universities failed, using local scores: {e}")
+                return scores
+            
+            fixed_tokens = count_message_tokens(scoring_messages([]))
+            shards = self.prompt_budget.shard(rows, fixed_tokens)
+            annotate_span(prompt_shards=len(shards))
+            
+            # One call per shard, in parallel under the shared concurrency cap
+            results = await asyncio.gather(*[score_shard(shard) for shard in shards], return_exceptions=True)
+            scores: Dict[int, float] = {}
+            for result in results:
+                if isinstance(result, BaseException):
+                    print(f"Scoring shard failed, using local scores for it: {result!r}")
+                    continue
+                scores.update(result)
+            if any(isinstance(result, LLM_TIMEOUT_ERRORS) for result in results):
+                record_degradation("deadline")
+            
+            for uni in universities:
+                score = scores.get(uni["id"])
+                if score is None:
+                    uni["match_score"] = round(uni["profile_fit_score"])
+                    continue
+                uni["match_score"] = round(score)
+                if cv_features:
+                    # The LLM only sees the profile; fold in what the CV adds
+                    uni["match_score"] = round(0.75 * score + 0.25 * uni["profile_fit_score"])
         else:
-            # Mock scoring when LLM is not available
-            for i, uni in enumerate(universities):
-                uni["match_score"] = max(60, 95 - i * 5)  # Decreasing scores
+            # Local scoring when LLM is not available
+            for uni in universities:
+                uni["match_score"] = round(uni["profile_fit_score"])
         
         # Sort by match score
         universities.sort(key=lambda x: x["match_score"], reverse=True)
@@ -229,30 +390,22 @@ class UniversityRecommendationEngine:
             """)
         ])
         
+        ai_analysis = None
         if self.llm:
-            response = await self.llm.ainvoke(
-                analysis_prompt.format_messages(
-                    profile=json.dumps(profile, indent=2),
-                    universities=json.dumps([{"name": u["name"], "country": u["country"], "match_score": u["match_score"]} for u in universities[:5]], indent=2)
+            try:
+                response = await self._invoke_llm(
+                    analysis_prompt.format_messages(
+                        profile=compact_json(compact_profile(profile)),
+                        universities=compact_json([{"name": u["name"], "country": u["country"], "match_score": u["match_score"]} for u in universities[:5]])
+                    ),
+                    deadline=state.get("deadline")
                 )
-            )
-            ai_analysis = response.content
-        else:
-            # Mock analysis when LLM is not available
-            top_unis = [u["name"] for u in universities[:3]]
-            ai_analysis = f"""**Profile Summary**: Based on your academic background and research interests, you present a strong candidate profile for graduate programs.
-
-**Geographic Alignment**: Your preferences align well with top-tier institutions in your target regions.
-
-**Financial Considerations**: Consider exploring funding opportunities including research assistantships and fellowships.
-
-**Research Fit**: Your research interests show strong alignment with the programs at {', '.join(top_unis)}.
-
-**Career Trajectory**: These programs will provide excellent preparation for your career goals.
-
-**Application Strategy**: Focus on highlighting your research experience and academic achievements in your applications.
-
-**Recommendations**: We recommend applying to {', '.join(top_unis)} as they offer the best match for your profile and goals."""
+                ai_analysis = response.content
+            except LLM_TIMEOUT_ERRORS:
+                record_degradation("deadline")
+        if ai_analysis is None:
+            # Template summary when the LLM is not available or out of time
+            ai_analysis = self._template_summary(universities)
         
         state["ai_analysis"] = ai_analysis
         state["processing_step"] = "analysis_generated"
@@ -271,6 +424,109 @@ class UniversityRecommendationEngine:
         state["processing_step"] = "completed"
         return state
     
+    def _template_summary(self, universities: List[Dict[str, Any]]) -> str:
+        """
+        Summary used without an LLM reply
+        """
+        top_unis = [u["name"] for u in universities[:3]]
+        return f"""**Profile Summary**: Based on your academic background and research interests, you present a strong candidate profile for graduate programs.
+
+**Geographic Alignment**: Your preferences align well with top-tier institutions in your target regions.
+
+**Financial Considerations**: Consider exploring funding opportunities including research assistantships and fellowships.
+
+**Research Fit**: Your research interests show strong alignment with the programs at {', '.join(top_unis)}.
+
+**Career Trajectory**: These programs will provide excellent preparation for your career goals.
+
+**Application Strategy**: Focus on highlighting your research experience and academic achievements in your applications.
+
+**Recommendations**: We recommend applying to {', '.join(top_unis)} as they offer the best match for your profile and goals."""
+    
+    async def _invoke_llm(self, messages, json_mode: bool = False, deadline: Optional[Deadline] = None,
+                          reserve: float = 0.0):
+        """
+        Invoke the running node's model tier under the shared concurrency cap, within
+        the request deadline (less reserve seconds kept for later nodes). Calls slower
+        than the recent p95 are hedged with a second request; the first reply wins.
+        """
+        timeout = None
+        if deadline is not None:
+            timeout = deadline.remaining(reserve)
+            if timeout < self.min_call_seconds:
+                raise DeadlineExceeded(f"{timeout:.2f}s left of the request deadline")
+        
+        node = current_node()
+        route = self.model_router.route(node)
+        options = {"max_tokens": route.max_tokens}
+        if json_mode and self.json_mode:
+            options["response_format"] = JSON_MODE
+        llm = self.tier_llms[route.tier.name].bind(**options)
+        estimated_tokens = count_message_tokens(messages, self.prompt_budget.model)
+        latency_key = f"{node}:{route.tier.name}"
+        
+        attempts = []
+        
+        async def call():
+            primary = not attempts
+            attempts.append(True)
+            async with self.llm_semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await llm.ainvoke(messages)
+                finally:
+                    # Only the primary's latency (a lower bound when it is cancelled) feeds the
+                    # hedge threshold, so hedged wins do not drag the percentile down
+                    if primary:
+                        self.latency_tracker.observe(latency_key, time.perf_counter() - start)
+            record_llm_call(time.perf_counter() - start, response, estimated_tokens, route.tier)
+            return response
+        
+        hedge_after = self.latency_tracker.percentile(latency_key, self.hedge_percentile) if self.hedging_enabled else None
+        # Hedges only use free concurrency slots; they never queue behind real work
+        response, winner = await asyncio.wait_for(
+            hedged(call, hedge_after, can_hedge=lambda: not self.llm_semaphore.locked()),
+            timeout
+        )
+        if winner is not None:
+            record_hedge(winner)
+        return response
+    
+    def _on_catalog_change(self, action: str, university_id: int, university_data: Dict[str, Any]):
+        """
+        Apply a committed catalog write to the research index and profile scorer
+        """
+        self.profile_scorer.forget(university_id)
+        if self.research_index is None:
+            return
+        if action == "delete":
+            self.research_index.remove(university_id)
+            return
+        if action == "update":
+            if not {"research_areas", "program_strengths", "type", "country"} & set(university_data):
+                return
+            # Updates are partial; index the full row
+            university_data = self.university_db.get_university_by_id(university_id) or university_data
+        self.research_index.add(dict(university_data, id=university_id))
+    
+    def _research_query(self, profile: Dict[str, Any], analysis: Dict[str, Any]) -> str:
+        """
+        Text matched against the research index: stated interests, field and CV research keywords
+        """
+        cv_keywords = (analysis.get("cv_features") or {}).get("research_keywords", [])
+        parts = [profile.get("research_interests", ""), profile.get("field_of_interest", ""), ", ".join(cv_keywords)]
+        return ", ".join(part for part in parts if part)
+    
+    def _filter_by_preferences(self, universities: List[Dict[str, Any]], geo_pref: Dict[str, str], budget_pref: str) -> List[Dict[str, Any]]:
+        """
+        Filter universities by geographic and budget preferences
+        """
+        return [
+            uni for uni in universities
+            if self._matches_geographic_preference(uni, geo_pref)
+            and self._matches_budget_preference(uni, budget_pref)
+        ]
+    
     def _extract_academic_strength(self, profile: Dict[str, Any]) -> str:
         """
         Extract academic strength indicators from profile
@@ -401,48 +657,130 @@ class UniversityRecommendationEngine:
         # In a real system, this would check the university's program offerings
         return True
     
-    async def generate_recommendations(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+    async def generate_recommendations(self, profile: Dict[str, Any], candidates: Optional[List[Dict[str, Any]]] = None,
+                                       include_trace: bool = False, deadline_seconds: Optional[float] = None) -> Dict[str, Any]:
         """
-        Main method to generate university recommendations
+        Main method to generate university recommendations, within deadline_seconds
+        (RECOMMEND_DEADLINE_SECONDS by default)
         """
+        trace = start_trace()
+        deadline = Deadline(deadline_seconds or self.deadline_seconds)
+        
         initial_state = RecommendationState(
             student_profile=profile,
+            candidate_universities=candidates,
             cv_analysis={},
             university_matches=[],
             ai_analysis="",
             final_recommendations=[],
-            processing_step="started"
+            processing_step="started",
+            deadline=deadline
         )
         
         # Run the workflow
         final_state = await self.workflow.ainvoke(initial_state)
         
-        return {
+        result = {
             "universities": final_state["final_recommendations"],
             "ai_summary": final_state["ai_analysis"]
         }
+        if include_trace:
+            result["trace"] = summarize_trace(trace)
+        return result
+    
+    async def generate_batch_recommendations(self, profiles: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate recommendations for a cohort of profiles, yielding each result as it finishes.
+        Identical profiles are computed once, the catalog is read once, and candidate
+        filtering runs once per (country, continent, budget) group.
+        """
+        # Deduplicate identical profiles, remembering every original position
+        distinct_profiles: Dict[str, Any] = {}
+        for index, profile in enumerate(profiles):
+            key = json.dumps(profile, sort_keys=True)
+            if key not in distinct_profiles:
+                distinct_profiles[key] = (profile, [])
+            distinct_profiles[key][1].append(index)
+        
+        # One catalog snapshot and one filtering pass per preference group
+        snapshot = self.university_db.get_all_universities()
+        group_candidates: Dict[tuple, List[Dict[str, Any]]] = {}
+        
+        async def run(profile: Dict[str, Any], indices: List[int]):
+            group = (
+                profile.get("preferred_country", ""),
+                profile.get("preferred_continent", ""),
+                profile.get("budget_preference", "")
+            )
+            if group not in group_candidates:
+                group_candidates[group] = self._filter_by_preferences(
+                    snapshot,
+                    {"country": group[0], "continent": group[1]},
+                    group[2]
+                )
+            try:
+                result = await self.generate_recommendations(profile, candidates=group_candidates[group])
+                return indices, result, None
+            except Exception as e:
+                return indices, None, str(e)
+        
+        tasks = [asyncio.create_task(run(profile, indices)) for profile, indices in distinct_profiles.values()]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                indices, result, error = await next_result
+                for index in indices:
+                    if error is not None:
+                        yield {"index": index, "error": error}
+                    else:
+                        yield {"index": index, **result}
+        finally:
+            # Client went away or the consumer stopped early
+            for task in tasks:
+                task.cancel()
     
     async def analyze_cv(self, cv_content: bytes, filename: str) -> Dict[str, Any]:
         """
-        Analyze uploaded CV content
+        Analyze uploaded CV content: extract text and structured sections in the
+        CV worker pool (cached by content hash)
         """
-        # In a real implementation, you would:
-        # 1. Extract text from PDF/DOC files
-        # 2. Use NLP to extract relevant information
-        # 3. Structure the extracted data
+        parsed = await self.cv_extractor.extract(cv_content, filename)
+        sections = parsed["sections"]
+        
+        # The content hash doubles as the upload id profiles refer to via cv_upload_id
+        upload_id = parsed["content_hash"]
+        features = self.cv_features.get(upload_id) or extract_cv_features(parsed)
+        self.cv_features[upload_id] = features
+        self.cv_features.move_to_end(upload_id)
+        if len(self.cv_features) > self.cv_features_cache_size:
+            self.cv_features.popitem(last=False)
         
-        # For now, return a mock analysis
         return {
             "filename": filename,
+            "upload_id": upload_id,
+            "content_hash": parsed["content_hash"],
+            "document_type": parsed["document_type"],
+            "pages": parsed["pages"],
+            "truncated": parsed["truncated"],
             "extracted_info": {
-                "education": "Extracted education information",
-                "experience": "Extracted work experience",
-                "skills": "Extracted technical skills",
-                "research": "Extracted research experience"
+                "education": sections["education"],
+                "experience": sections["experience"],
+                "skills": sections["skills"],
+                "publications": sections["publications"],
+                "research": sections["research"],
+                "awards": sections["awards"]
             },
+            "features": features,
             "analysis_timestamp": datetime.now().isoformat()
         }
     
+    def get_cv_features(self, upload_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        CV features cached for an upload id, or None
+        """
+        if not upload_id:
+            return None
+        return self.cv_features.get(upload_id)
+    
     async def get_all_universities(self) -> List[Dict[str, Any]]:
         """
         Get all universities from database
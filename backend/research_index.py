@@ -0,0 +1,550 @@
+#!/usr/bin/env python3
+"""
+Local TF-IDF index over university research areas, program strengths and
+descriptions, used to retrieve research-aligned candidates without an LLM.
+
+The index is built offline and stored as NumPy arrays in a directory: an
+inverted index (term -> postings of document positions and L2-normalized
+TF-IDF weights) plus the university ids. Arrays are memory-mapped on load, so
+a 1M-row catalog costs no parse time and only the postings of the query's
+terms are paged in.
+
+With --lists, documents are also clustered (spherical k-means) and stored
+cluster by cluster, which enables the approximate IVF search mode: a query
+scores only the nprobe clusters whose centroids are closest to it.
+
+    python research_index.py --output research_index
+    python research_index.py --catalog catalog_1m.csv --output research_index_1m --lists 1000
+    python research_index.py --output research_index --query "machine learning, robotics"
+"""
+import argparse
+import json
+import os
+import re
+import time
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9+#]*")
+STOPWORDS = frozenset("""
+a an and are as at be by for from in into is it its of on or that the their this to with
+university universities college institute school department program programs studies study
+""".split())
+
+# Research areas say the most about a university's research; the generated description the least
+FIELD_WEIGHTS = {'research_areas': 2.0, 'program_strengths': 1.0, 'description': 0.5}
+
+META_FILE = 'meta.json'
+ARRAY_FILES = ('doc_ids', 'indptr', 'postings_docs', 'postings_weights')
+IVF_FILES = ('centroids', 'list_offsets')
+
+# Dense rows materialized at a time while clustering (~16MB per chunk)
+CLUSTER_CHUNK_VALUES = 1 << 22
+
+
+def tokenize(text: str) -> List[str]:
+    """Unigrams plus adjacent bigrams, so "machine learning" outweighs "machine" and "learning" apart"""
+    words = [word for word in TOKEN_PATTERN.findall((text or '').lower()) if word not in STOPWORDS and len(word) > 1]
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def university_fields(university: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Indexed text per field, from either an API-formatted university or a raw
+    universities/catalog row
+    """
+    research_areas = university.get('research_areas') or ''
+    if isinstance(research_areas, (list, tuple)):
+        research_areas = ', '.join(research_areas)
+    description = university.get('description')
+    if not description:
+        description = f"A {university.get('type') or ''} university in {university.get('country_name') or university.get('country') or ''}"
+    return {
+        'research_areas': research_areas,
+        'program_strengths': university.get('program_strengths') or '',
+        'description': description
+    }
+
+
+def term_counts(university: Dict[str, Any]) -> Counter:
+    counts: Counter = Counter()
+    for field, text in university_fields(university).items():
+        weight = FIELD_WEIGHTS[field]
+        for token in tokenize(text):
+            counts[token] += weight
+    return counts
+
+
+def _ranges(starts: np.ndarray, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenated indices of several [start, start + length) ranges, with the range each came from"""
+    which = np.repeat(np.arange(len(starts)), lengths)
+    indices = np.arange(int(lengths.sum())) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return which, indices
+
+
+def _gather_rows(doc_ptr: np.ndarray, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Row number (within positions) and entry index of every entry of the given documents"""
+    starts = doc_ptr[positions]
+    return _ranges(starts, doc_ptr[positions + 1] - starts)
+
+
+def _chunks(positions: np.ndarray, n_features: int):
+    size = max(256, CLUSTER_CHUNK_VALUES // max(1, n_features))
+    for start in range(0, len(positions), size):
+        yield positions[start:start + size]
+
+
+def _assign(doc_ptr, cols, weights, positions, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid (by cosine) for each document, computed over dense chunks"""
+    n_features = centroids.shape[0]
+    assignment = np.empty(len(positions), dtype=np.int32)
+    done = 0
+    for chunk in _chunks(positions, n_features):
+        rows, entries = _gather_rows(doc_ptr, chunk)
+        dense = np.zeros((len(chunk), n_features), dtype=np.float32)
+        dense[rows, cols[entries]] = weights[entries]
+        assignment[done:done + len(chunk)] = np.argmax(dense @ centroids, axis=1)
+        done += len(chunk)
+    return assignment
+
+
+def spherical_kmeans(doc_ptr: np.ndarray, cols: np.ndarray, weights: np.ndarray, n_features: int, n_lists: int,
+                     iterations: int = 8, sample_size: Optional[int] = None, seed: int = 42) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cluster L2-normalized sparse documents (entries grouped by document, doc_ptr
+    delimiting them). Trains on a sample, then assigns every document.
+    Returns term-major centroids (n_features x n_lists) and the assignment.
+    """
+    n_docs = len(doc_ptr) - 1
+    rng = np.random.default_rng(seed)
+    sample = np.sort(rng.choice(n_docs, size=min(n_docs, sample_size or max(64 * n_lists, 10000)), replace=False))
+
+    def centroids_from(positions: np.ndarray) -> np.ndarray:
+        rows, entries = _gather_rows(doc_ptr, positions)
+        seeds = np.zeros((n_features, len(positions)), dtype=np.float32)
+        seeds[cols[entries], rows] = weights[entries]
+        return seeds
+
+    centroids = centroids_from(rng.choice(sample, size=n_lists, replace=False))
+    for _ in range(iterations):
+        assignment = _assign(doc_ptr, cols, weights, sample, centroids)
+        rows, entries = _gather_rows(doc_ptr, sample)
+        sums = np.bincount(cols[entries] * n_lists + assignment[rows], weights=weights[entries],
+                           minlength=n_features * n_lists).reshape(n_features, n_lists).astype(np.float32)
+        empty = np.flatnonzero(np.bincount(assignment, minlength=n_lists) == 0)
+        if len(empty):
+            # Re-seed empty clusters from random documents
+            sums[:, empty] = centroids_from(rng.choice(sample, size=len(empty), replace=False))
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=0), 1e-12)
+
+    return centroids, _assign(doc_ptr, cols, weights, np.arange(n_docs), centroids)
+
+
+class ResearchIndex:
+    """
+    Exact cosine top-K over TF-IDF vectors of university research profiles.
+
+    Scores are accumulated term by term from the inverted index, so a query
+    touches only the postings of its own terms rather than every document.
+    Universities added or changed after the build go into a small in-memory
+    delta that every query scans; rebuild the index to fold them in.
+    """
+
+    def __init__(self, vocabulary: List[str], idf: np.ndarray, doc_ids: np.ndarray, indptr: np.ndarray,
+                 postings_docs: np.ndarray, postings_weights: np.ndarray):
+        self.vocabulary = vocabulary
+        self.term_index = {term: i for i, term in enumerate(vocabulary)}
+        self.idf = idf
+        self.doc_ids = doc_ids
+        self.indptr = indptr
+        self.postings_docs = postings_docs
+        self.postings_weights = postings_weights
+        self._positions: Optional[Dict[int, int]] = None
+        # Incremental inserts: id -> {column: weight}, and base positions they supersede
+        self._delta: Dict[int, Dict[int, float]] = {}
+        self._deleted: set = set()
+        self._delta_matrix: Optional[Tuple[List[int], np.ndarray, np.ndarray, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return len(self.doc_ids) - len(self._deleted) + len(self._delta)
+
+    @classmethod
+    def build(cls, universities: Iterable[Dict[str, Any]], min_df: int = 1, max_df: float = 0.5,
+              max_features: Optional[int] = None, n_lists: int = 0) -> 'ResearchIndex':
+        """
+        Build the index in one pass over the universities (each needs an 'id').
+        Terms in more than max_df of documents carry no signal and are dropped.
+        With n_lists, documents are clustered for IVF search.
+        """
+        terms: Dict[str, int] = {}
+        doc_ids = array('q')
+        entry_docs = array('i')
+        entry_terms = array('i')
+        entry_counts = array('f')
+        for university in universities:
+            position = len(doc_ids)
+            doc_ids.append(int(university['id']))
+            for term, count in term_counts(university).items():
+                entry_docs.append(position)
+                entry_terms.append(terms.setdefault(term, len(terms)))
+                entry_counts.append(count)
+
+        n_docs = len(doc_ids)
+        doc_ids = np.frombuffer(doc_ids, dtype=np.int64).copy()
+        docs = np.frombuffer(entry_docs, dtype=np.int32)
+        term_ids = np.frombuffer(entry_terms, dtype=np.int32)
+        counts = np.frombuffer(entry_counts, dtype=np.float32)
+        df = np.bincount(term_ids, minlength=len(terms))
+
+        keep = (df >= min_df) & (df <= max(1, max_df * n_docs))
+        if max_features and keep.sum() > max_features:
+            ranked = np.argsort(-np.where(keep, df, -1), kind='stable')[:max_features]
+            keep = np.zeros_like(keep)
+            keep[ranked] = True
+        # Old term id -> column, or -1 when dropped
+        columns = np.full(len(terms), -1, dtype=np.int64)
+        columns[keep] = np.arange(int(keep.sum()))
+        all_terms = np.array(list(terms), dtype=object)
+        vocabulary = all_terms[keep].tolist()
+
+        mask = columns[term_ids] >= 0
+        docs, cols, counts = docs[mask], columns[term_ids[mask]], counts[mask]
+        idf = (np.log((1 + n_docs) / (1 + df[keep])) + 1).astype(np.float32)
+
+        # Sublinear tf, then L2-normalize each document
+        weights = ((1 + np.log(np.maximum(counts, 1e-6))) * idf[cols]).astype(np.float32)
+        norms = np.sqrt(np.bincount(docs, weights=weights.astype(np.float64) ** 2, minlength=n_docs))
+        weights /= np.maximum(norms[docs], 1e-12).astype(np.float32)
+
+        ivf = None
+        if n_lists:
+            # Entries are still grouped by document here
+            doc_ptr = np.zeros(n_docs + 1, dtype=np.int64)
+            np.cumsum(np.bincount(docs, minlength=n_docs), out=doc_ptr[1:])
+            n_lists = min(n_lists, n_docs)
+            centroids, assignment = spherical_kmeans(doc_ptr, cols, weights, len(vocabulary), n_lists)
+            # Renumber documents so each cluster is a contiguous range of positions
+            order = np.argsort(assignment, kind='stable')
+            renumber = np.empty(n_docs, dtype=np.int32)
+            renumber[order] = np.arange(n_docs, dtype=np.int32)
+            docs, doc_ids = renumber[docs], doc_ids[order]
+            list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+            np.cumsum(np.bincount(assignment, minlength=n_lists), out=list_offsets[1:])
+            ivf = (centroids, list_offsets)
+
+        # Group entries by term to form the postings lists, documents ascending within each
+        order = np.lexsort((docs, cols))
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=len(vocabulary)), out=indptr[1:])
+        arrays = (vocabulary, idf, doc_ids, indptr, docs[order].astype(np.int32), weights[order])
+        if ivf:
+            return IVFResearchIndex(*arrays, *ivf)
+        return cls(*arrays)
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAY_FILES:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump({
+                'documents': len(self.doc_ids),
+                'lists': 0,
+                'vocabulary': self.vocabulary,
+                'idf': self.idf.tolist(),
+                'built_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+            }, f)
+
+    @classmethod
+    def load(cls, path: str, mode: str = 'auto', mmap: bool = True) -> 'ResearchIndex':
+        """
+        Load an index directory. mode 'auto' uses IVF search when the index was
+        built with lists, 'exact' always scans full postings.
+        """
+        with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        def load_array(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r' if mmap else None)
+
+        arrays = {name: load_array(name) for name in ARRAY_FILES}
+        idf = np.array(meta['idf'], dtype=np.float32)
+        if meta.get('lists') and mode != 'exact':
+            return IVFResearchIndex(meta['vocabulary'], idf, **arrays, **{name: load_array(name) for name in IVF_FILES})
+        if mode == 'ivf':
+            print(f"Research index at {path} was built without --lists; using exact search")
+        return ResearchIndex(meta['vocabulary'], idf, **arrays)
+
+    def _position(self, university_id: int) -> Optional[int]:
+        if self._positions is None:
+            self._positions = {int(doc_id): i for i, doc_id in enumerate(self.doc_ids)}
+        return self._positions.get(university_id)
+
+    def vectorize(self, university: Dict[str, Any]) -> Dict[int, float]:
+        """
+        L2-normalized TF-IDF vector of a university, over the built vocabulary
+        """
+        counts = {self.term_index[term]: count for term, count in term_counts(university).items() if term in self.term_index}
+        vector = {col: (1 + np.log(count)) * float(self.idf[col]) for col, count in counts.items()}
+        norm = np.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        return {col: float(weight / norm) for col, weight in vector.items()}
+
+    def add(self, university: Dict[str, Any]):
+        """
+        Index a new or changed university without a rebuild. Terms outside
+        the built vocabulary are ignored until the next rebuild.
+        """
+        university_id = int(university['id'])
+        position = self._position(university_id)
+        if position is not None:
+            self._deleted.add(position)
+        self._delta[university_id] = self.vectorize(university)
+        self._delta_matrix = None
+
+    def remove(self, university_id: int):
+        position = self._position(university_id)
+        if position is not None:
+            self._deleted.add(position)
+        self._delta.pop(university_id, None)
+        self._delta_matrix = None
+
+    def query_vector(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Columns and L2-normalized TF-IDF weights of the query's known terms"""
+        counts = Counter(term for term in tokenize(text) if term in self.term_index)
+        if not counts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        cols = np.array([self.term_index[term] for term in counts], dtype=np.int64)
+        weights = (1 + np.log(np.array(list(counts.values()), dtype=np.float32))) * self.idf[cols]
+        return cols, weights / np.linalg.norm(weights)
+
+    def _full_scores(self, cols: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+        for col, weight in zip(cols, weights):
+            start, end = self.indptr[col], self.indptr[col + 1]
+            # A document appears at most once per postings list, so fancy += is safe
+            scores[self.postings_docs[start:end]] += weight * self.postings_weights[start:end]
+        return scores
+
+    def _candidates(self, cols: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions and scores of built documents sharing a term with the query"""
+        scores = self._full_scores(cols, weights)
+        positions = np.flatnonzero(scores)
+        return positions, scores[positions]
+
+    def _delta_scores(self, cols: np.ndarray, weights: np.ndarray) -> List[Tuple[int, float]]:
+        if not self._delta:
+            return []
+        if self._delta_matrix is None:
+            # Flattened (row, column, weight) entries, rebuilt only after the delta changes
+            university_ids = list(self._delta)
+            vectors = list(self._delta.values())
+            self._delta_matrix = (
+                university_ids,
+                np.repeat(np.arange(len(vectors)), [len(vector) for vector in vectors]),
+                np.fromiter((col for vector in vectors for col in vector), dtype=np.int64),
+                np.fromiter((weight for vector in vectors for weight in vector.values()), dtype=np.float32)
+            )
+        university_ids, rows, delta_cols, delta_weights = self._delta_matrix
+        query = np.zeros(len(self.vocabulary), dtype=np.float32)
+        query[cols] = weights
+        scores = np.bincount(rows, weights=delta_weights * query[delta_cols], minlength=len(university_ids))
+        return [(university_ids[i], float(scores[i])) for i in np.flatnonzero(scores > 0)]
+
+    def search(self, text: str, k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Top-k (university_id, similarity) pairs, most similar first
+        """
+        cols, weights = self.query_vector(text)
+        if not len(cols):
+            return []
+        positions, scores = self._candidates(cols, weights)
+        if self._deleted:
+            live = ~np.isin(positions, np.fromiter(self._deleted, dtype=np.int64))
+            positions, scores = positions[live], scores[live]
+        if len(positions) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            positions, scores = positions[top], scores[top]
+        results = [(int(self.doc_ids[position]), float(score)) for position, score in zip(positions, scores)]
+        results.extend(self._delta_scores(cols, weights))
+        results.sort(key=lambda result: -result[1])
+        return results[:k]
+
+    def scores(self, text: str) -> np.ndarray:
+        """
+        Exact cosine similarity of every built document to the query, in index order
+        """
+        return self._full_scores(*self.query_vector(text))
+
+    def similarity(self, text: str, university_ids: Iterable[int]) -> Dict[int, float]:
+        """
+        Exact similarity for specific universities (ids missing from the index score 0)
+        """
+        university_ids = list(university_ids)
+        cols, weights = self.query_vector(text)
+        scores = self._full_scores(cols, weights)
+        delta = dict(self._delta_scores(cols, weights))
+        results = {}
+        for university_id in university_ids:
+            position = self._position(university_id)
+            if university_id in delta or university_id in self._delta:
+                results[university_id] = float(delta.get(university_id, 0.0))
+            elif position is not None and position not in self._deleted:
+                results[university_id] = float(scores[position])
+            else:
+                results[university_id] = 0.0
+        return results
+
+
+class IVFResearchIndex(ResearchIndex):
+    """
+    Approximate top-K for very large catalogs (inverted file over clusters).
+
+    Documents are stored cluster by cluster, so each cluster is a contiguous
+    range inside every postings list. A query ranks the centroids and scores
+    only the nprobe closest clusters; raising nprobe trades latency for recall.
+    """
+
+    def __init__(self, vocabulary: List[str], idf: np.ndarray, doc_ids: np.ndarray, indptr: np.ndarray,
+                 postings_docs: np.ndarray, postings_weights: np.ndarray, centroids: np.ndarray,
+                 list_offsets: np.ndarray, nprobe: Optional[int] = None):
+        super().__init__(vocabulary, idf, doc_ids, indptr, postings_docs, postings_weights)
+        # Term-major (n_terms x n_lists) so a query reads only its own terms' rows
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.nprobe = nprobe or int(os.getenv('RESEARCH_INDEX_NPROBE', 16))
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.list_offsets) - 1
+
+    def save(self, path: str):
+        super().save(path)
+        for name in IVF_FILES:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        meta_path = os.path.join(path, META_FILE)
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        meta['lists'] = self.n_lists
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+    def _candidates(self, cols: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        nprobe = min(self.nprobe, self.n_lists)
+        centroid_scores = weights @ self.centroids[cols]
+        probed = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+        # Probed clusters laid end to end in one score buffer
+        probed = np.sort(probed)
+        firsts = self.list_offsets[probed]
+        sizes = self.list_offsets[probed + 1] - firsts
+        bases = np.cumsum(sizes) - sizes
+        local = np.zeros(int(sizes.sum()), dtype=np.float32)
+        for start, end, weight in zip(self.indptr[cols], self.indptr[cols + 1], weights):
+            docs = self.postings_docs[start:end]
+            # Each cluster is one contiguous slice of the (position-sorted) postings list
+            lows = np.searchsorted(docs, firsts)
+            which, indices = _ranges(lows, np.searchsorted(docs, firsts + sizes) - lows)
+            if len(indices):
+                local[docs[indices] - firsts[which] + bases[which]] += weight * self.postings_weights[start + indices]
+        hits = np.flatnonzero(local)
+        which = np.searchsorted(bases, hits, side='right') - 1
+        return hits - bases[which] + firsts[which], local[hits]
+
+
+def load_research_index(path: Optional[str] = None, mode: Optional[str] = None) -> Optional[ResearchIndex]:
+    """
+    Load the index from RESEARCH_INDEX_PATH in RESEARCH_INDEX_MODE (auto, exact
+    or ivf); None when it has not been built
+    """
+    path = path or os.getenv('RESEARCH_INDEX_PATH', 'research_index')
+    mode = mode or os.getenv('RESEARCH_INDEX_MODE', 'auto')
+    if not os.path.exists(os.path.join(path, META_FILE)):
+        print(f"Research index not found at {path}; research retrieval disabled")
+        return None
+    try:
+        index = ResearchIndex.load(path, mode)
+        search_mode = f"IVF, {index.n_lists} lists, nprobe {index.nprobe}" if isinstance(index, IVFResearchIndex) else "exact"
+        print(f"Loaded research index with {len(index)} universities from {path} ({search_mode})")
+        return index
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error loading research index from {path}: {e}")
+        return None
+
+
+def iter_database_universities(db_config: Dict[str, Any], batch_size: int = 5000) -> Iterable[Dict[str, Any]]:
+    """Stream the indexed columns of every university from MySQL"""
+    import mysql.connector
+
+    conn = mysql.connector.connect(**db_config)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+        SELECT id, type, country_name, research_areas, program_strengths
+        FROM universities ORDER BY id
+        """)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def iter_catalog_universities(path: str) -> Iterable[Dict[str, Any]]:
+    """Rows of a synthetic catalog file, numbered the way a fresh bulk load assigns ids"""
+    from synthetic_catalog import read_catalog
+
+    for position, row in enumerate(read_catalog(path), start=1):
+        row.setdefault('id', position)
+        yield row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the local research-interest similarity index")
+    parser.add_argument("--output", default=os.getenv('RESEARCH_INDEX_PATH', 'research_index'),
+                        help="Index directory (defaults to RESEARCH_INDEX_PATH)")
+    parser.add_argument("--catalog", default=None, help="Build from a CSV/JSONL catalog instead of MySQL")
+    parser.add_argument("--min-df", type=int, default=1)
+    parser.add_argument("--max-df", type=float, default=0.5, help="Drop terms in more than this share of universities")
+    parser.add_argument("--max-features", type=int, default=None)
+    parser.add_argument("--lists", type=int, default=0,
+                        help="Cluster into this many IVF lists for approximate search (about sqrt(rows); 0 = exact only)")
+    parser.add_argument("--query", default=None, help="Run a sample query against the built index")
+    args = parser.parse_args()
+
+    if args.catalog:
+        universities = iter_catalog_universities(args.catalog)
+    else:
+        universities = iter_database_universities({
+            'host': os.getenv('DB_HOST', 'localhost'),
+            'user': os.getenv('DB_USER', 'root'),
+            'password': os.getenv('DB_PASSWORD', ''),
+            'port': int(os.getenv('DB_PORT', 3306)),
+            'database': os.getenv('DB_NAME', 'universitydb')
+        })
+
+    started = time.perf_counter()
+    index = ResearchIndex.build(universities, args.min_df, args.max_df, args.max_features, args.lists)
+    index.save(args.output)
+    print(f"Indexed {len(index)} universities ({len(index.vocabulary)} terms, "
+          f"{len(index.postings_docs)} postings) into {args.output} in {time.perf_counter() - started:.1f}s")
+
+    if args.query:
+        index = load_research_index(args.output)
+        start = time.perf_counter()
+        results = index.search(args.query, 10)
+        print(f"Top {len(results)} for {args.query!r} in {(time.perf_counter() - start) * 1000:.2f} ms:")
+        for university_id, score in results:
+            print(f"  {university_id:>8}  {score:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import json
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, ValidationError
+
+logger = logging.getLogger(__name__)
+
+CODE_FENCE_PATTERN = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.S)
+TRAILING_COMMA_PATTERN = re.compile(r",\s*([}\]])")
+
+# Sent to the model when a reply cannot be parsed; the bad reply is the only context it needs
+REPAIR_SYSTEM_PROMPT = "You repair malformed JSON. Reply with only the corrected JSON, no prose or code fences."
+
+JSON_MODE = {"type": "json_object"}
+
+# Shapes quoted back to the model in repair requests
+SCORES_SHAPE = '{"scores": [{"university_id": <int>, "match_score": <0-100>}, ...]}'
+UNIVERSITY_SHAPE = '{"name": <str>, "country": <str>, "research_areas": [<str>], ...}'
+UNIVERSITY_LIST_SHAPE = '{"universities": [{"name": <str>, "country": <str>, "ranking": <int>}, ...]}'
+PROGRAM_SHAPE = '{"university_name": <str>, "program_name": <str>, ...}'
+
+
+class StructuredOutputError(ValueError):
+    """Raised when an LLM reply has no usable JSON of the expected shape"""
+
+    def __init__(self, message: str, content: Optional[str] = None):
+        super().__init__(message)
+        self.content = content
+
+
+class UniversityScore(BaseModel):
+    university_id: int = Field(validation_alias=AliasChoices("university_id", "id"))
+    match_score: float = Field(ge=0, le=100, validation_alias=AliasChoices("match_score", "score"))
+
+
+class UniversityData(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    name: str
+    country: str
+    research_areas: List[str] = []
+    strengths: List[str] = []
+
+
+class UniversityListItem(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    name: str
+    country: str
+    ranking: Optional[Any] = None
+
+
+class ProgramDetails(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    university_name: str
+    program_name: str
+
+
+def _decode_candidates(text: str):
+    """Every JSON value that decodes starting at a '{' or '[' in text, in order"""
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r"[\[{]", text):
+        try:
+            value, _ = decoder.raw_decode(text, match.start())
+            yield value
+        except json.JSONDecodeError:
+            continue
+
+
+def extract_json(content: str, expect: Tuple[type, ...] = (dict, list)) -> Any:
+    """
+    Tolerantly pull a JSON value out of an LLM reply: plain JSON, a fenced
+    block, or the first decodable object/array inside surrounding prose.
+    Trailing commas are forgiven.
+    """
+    text = (content or "").strip()
+    attempts = [text]
+    attempts.extend(match.strip() for match in CODE_FENCE_PATTERN.findall(text))
+    for attempt in attempts:
+        for candidate in (attempt, TRAILING_COMMA_PATTERN.sub(r"\1", attempt)):
+            try:
+                value = json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(value, expect):
+                return value
+
+    for candidate_text in (text, TRAILING_COMMA_PATTERN.sub(r"\1", text)):
+        for value in _decode_candidates(candidate_text):
+            if isinstance(value, expect):
+                return value
+    raise StructuredOutputError("No JSON value found in reply", content)
+
+
+def unwrap(data: Any, key: str) -> Any:
+    """
+    JSON mode replies are objects; accept {key: [...]}, any single list-valued
+    wrapper, or the bare value
+    """
+    if isinstance(data, dict):
+        if key in data:
+            return data[key]
+        lists = [value for value in data.values() if isinstance(value, list)]
+        if len(lists) == 1 and len(data) == 1:
+            return lists[0]
+    return data
+
+
+def validate(data: Any, schema: Type[BaseModel]) -> Dict[str, Any]:
+    """Validate one object against schema and return it as a plain dict"""
+    try:
+        return schema.model_validate(data).model_dump(mode="json")
+    except ValidationError as e:
+        raise StructuredOutputError(f"Reply does not match {schema.__name__}: {e.errors()[0]['msg']}")
+
+
+def validate_items(data: Any, schema: Type[BaseModel]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Validate a list item by item, keeping the valid ones; returns (valid items, invalid count).
+    A list with no valid item (including an empty one) raises StructuredOutputError so the
+    caller's repair path runs instead of silently getting nothing.
+    """
+    if not isinstance(data, list):
+        raise StructuredOutputError(f"Expected a list of {schema.__name__}, got {type(data).__name__}")
+    valid, invalid = [], 0
+    error = None
+    for item in data:
+        try:
+            valid.append(schema.model_validate(item).model_dump(mode="json"))
+        except ValidationError as e:
+            invalid += 1
+            error = error or e.errors()[0]['msg']
+    if not valid:
+        if not data:
+            raise StructuredOutputError(f"Expected a list of {schema.__name__}, got an empty list")
+        raise StructuredOutputError(f"None of the {invalid} items match {schema.__name__}: {error}")
+    if invalid:
+        logger.debug("Dropped %d of %d items not matching %s", invalid, len(data), schema.__name__)
+    return valid, invalid
+
+
+def index_scores(data: Any) -> Dict[int, float]:
+    """
+    University id -> match score from a scoring reply: a list of
+    {university_id, match_score} objects (bare or wrapped) or an {id: score} map
+    """
+    data = unwrap(data, "scores")
+    if isinstance(data, dict) and all(str(key).isdigit() for key in data):
+        data = [{"university_id": key, "match_score": value} for key, value in data.items()]
+    scores, _ = validate_items(data, UniversityScore)
+    return {score["university_id"]: score["match_score"] for score in scores}
+
+
+def repair_messages(content: str, error: str, shape: str) -> List[Dict[str, str]]:
+    """A short follow-up asking the model to fix its own reply, without resending the original prompt"""
+    return [
+        {"role": "system", "content": REPAIR_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Expected shape: {shape}\nProblem: {error}\n\nReply to fix:\n{content[:4000]}"}
+    ]
+
+
+async def parse_with_repair(content: str, parse: Callable[[Any], Any],
+                            complete: Callable[[List[Dict[str, str]]], Awaitable[str]],
+                            shape: str, retries: int = 1) -> Any:
+    """
+    Parse a reply with parse(extract_json(content)); on failure ask the model
+    to repair it (retries times) before giving up with StructuredOutputError
+    """
+    for attempt in range(retries + 1):
+        try:
+            return parse(extract_json(content))
+        except StructuredOutputError as e:
+            if attempt == retries:
+                raise
+            logger.warning("Malformed LLM reply (%s); requesting a repair", e)
+            content = await complete(repair_messages(content, str(e), shape))
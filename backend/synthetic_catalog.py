@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic university catalog generator for scale testing.
+
+Produces 10k / 100k / 1M-row catalogs with the same columns as the
+universities table, with Zipf-skewed country and field distributions so
+filters and searches see realistic selectivity. Output is streamed to
+CSV or JSONL and can be bulk-loaded into MySQL. Loading needs an explicit
+--db-name and only empties the table first when --truncate is given.
+
+    python synthetic_catalog.py --size 100k --seed 7 --format jsonl --output catalog_100k.jsonl
+    python synthetic_catalog.py --size 1M --output catalog_1m.csv --load --db-name universitydb_scale --truncate
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import time
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Tuple
+
+import mysql.connector
+from dotenv import load_dotenv
+
+from catalog_sync import bump_catalog_version
+
+# Load environment variables
+load_dotenv()
+
+COLUMNS = [
+    'country_code', 'country_name', 'name', 'website', 'global_ranking',
+    'tuition_fee_usd', 'scholarship_available', 'admission_rate',
+    'student_population', 'founded_year', 'type', 'research_areas', 'campus_size',
+    'admission_requirements', 'notable_faculty', 'program_strengths', 'application_deadline'
+]
+
+# Ordered roughly by number of institutions so the Zipf weights land sensibly
+COUNTRIES = [
+    ('US', 'United States'), ('IN', 'India'), ('CN', 'China'), ('JP', 'Japan'), ('BR', 'Brazil'),
+    ('MX', 'Mexico'), ('RU', 'Russia'), ('ID', 'Indonesia'), ('GB', 'United Kingdom'), ('DE', 'Germany'),
+    ('FR', 'France'), ('KR', 'South Korea'), ('PH', 'Philippines'), ('CA', 'Canada'), ('TR', 'Turkey'),
+    ('PK', 'Pakistan'), ('IT', 'Italy'), ('ES', 'Spain'), ('AR', 'Argentina'), ('CO', 'Colombia'),
+    ('PL', 'Poland'), ('UA', 'Ukraine'), ('IR', 'Iran'), ('NG', 'Nigeria'), ('AU', 'Australia'),
+    ('TH', 'Thailand'), ('MY', 'Malaysia'), ('EG', 'Egypt'), ('BD', 'Bangladesh'), ('VN', 'Vietnam'),
+    ('NL', 'Netherlands'), ('SE', 'Sweden'), ('CH', 'Switzerland'), ('BE', 'Belgium'), ('AT', 'Austria'),
+    ('NO', 'Norway'), ('DK', 'Denmark'), ('FI', 'Finland'), ('IE', 'Ireland'), ('NZ', 'New Zealand'),
+    ('SG', 'Singapore'), ('HK', 'Hong Kong'), ('ZA', 'South Africa'), ('KE', 'Kenya'), ('CL', 'Chile')
+]
+
+FIELDS = [
+    'Business', 'Engineering', 'Computer Science', 'Medicine', 'Education', 'Law', 'Economics',
+    'Psychology', 'Biology', 'Arts', 'Nursing', 'Mathematics', 'Physics', 'Chemistry',
+    'Political Science', 'Sociology', 'Architecture', 'Environmental Science', 'Data Science',
+    'Literature', 'History', 'Philosophy', 'Agriculture', 'Pharmacy', 'Linguistics',
+    'Materials Science', 'Neuroscience', 'Aerospace Engineering', 'Astronomy', 'Marine Biology'
+]
+
+HIGH_TUITION = {'United States', 'United Kingdom', 'Australia', 'Canada'}
+LOW_TUITION = {'Germany', 'Norway', 'Finland', 'Denmark', 'Sweden'}
+
+NAME_PATTERNS = [
+    "University of {city}",
+    "{city} University",
+    "{city} Institute of Technology",
+    "{city} State University",
+    "{city} College",
+    "{adjective} University of {city}",
+    "{city} University of {field}",
+    "{city} Polytechnic Institute"
+]
+ADJECTIVES = ["National", "Technical", "Metropolitan", "Royal", "Catholic", "International", "Federal", "Central"]
+SYLLABLES = ["ka", "lo", "ra", "mi", "to", "sen", "dar", "vel", "an", "bur", "gor", "tis",
+             "mon", "el", "qui", "sta", "ber", "lin", "ova", "port", "ham", "field", "ton", "dale"]
+STRENGTHS = [
+    "Research Excellence", "Industry Partnerships", "International Exchange Programs",
+    "State-of-the-art Facilities", "Small Class Sizes", "Experienced Faculty",
+    "Career Services", "Alumni Network", "Innovation Labs", "Internship Opportunities"
+]
+REQUIREMENTS = [
+    "High school diploma or equivalent", "Minimum GPA requirement",
+    "English proficiency test (TOEFL/IELTS)", "Letters of recommendation", "Personal statement or essay"
+]
+DEADLINES = ["January 15", "February 1", "March 1", "May 15", "July 1", "September 15", "Rolling Admissions"]
+
+
+def zipf_cumulative_weights(n: int, s: float) -> List[float]:
+    """Cumulative Zipf weights for use with random.choices(cum_weights=...)"""
+    return list(accumulate(1.0 / (rank ** s) for rank in range(1, n + 1)))
+
+
+def parse_size(size: str) -> int:
+    """Parse sizes such as 10k, 100k or 1M"""
+    size = size.strip().lower()
+    multiplier = 1
+    if size.endswith('k'):
+        multiplier, size = 1_000, size[:-1]
+    elif size.endswith('m'):
+        multiplier, size = 1_000_000, size[:-1]
+    return int(float(size) * multiplier)
+
+
+class SyntheticCatalogGenerator:
+    def __init__(self, seed: int = 42, country_skew: float = 1.1, field_skew: float = 0.9):
+        self.rng = random.Random(seed)
+        self.country_weights = zipf_cumulative_weights(len(COUNTRIES), country_skew)
+        self.field_weights = zipf_cumulative_weights(len(FIELDS), field_skew)
+        self.used_names = set()
+
+    def _city(self) -> str:
+        parts = self.rng.choices(SYLLABLES, k=self.rng.randint(2, 3))
+        return ''.join(parts).capitalize()
+
+    def _unique_name(self, primary_field: str) -> str:
+        pattern = self.rng.choice(NAME_PATTERNS)
+        name = pattern.format(city=self._city(), adjective=self.rng.choice(ADJECTIVES), field=primary_field)
+        if name in self.used_names:
+            suffix = 2
+            while f"{name} {suffix}" in self.used_names:
+                suffix += 1
+            name = f"{name} {suffix}"
+        self.used_names.add(name)
+        return name
+
+    def _fields(self) -> List[str]:
+        wanted = self.rng.randint(2, 6)
+        fields: List[str] = []
+        while len(fields) < wanted:
+            field = self.rng.choices(FIELDS, cum_weights=self.field_weights)[0]
+            if field not in fields:
+                fields.append(field)
+        return fields
+
+    def generate_row(self, index: int) -> Dict[str, Any]:
+        rng = self.rng
+        country_code, country_name = rng.choices(COUNTRIES, cum_weights=self.country_weights)[0]
+        fields = self._fields()
+        name = self._unique_name(fields[0])
+
+        if country_name in LOW_TUITION:
+            tuition = round(rng.uniform(0, 2000), 2)
+        elif country_name in HIGH_TUITION:
+            tuition = round(rng.uniform(15000, 60000), 2)
+        else:
+            tuition = round(rng.uniform(1000, 30000), 2) if rng.random() > 0.2 else None
+
+        return {
+            'country_code': country_code,
+            'country_name': country_name,
+            'name': name,
+            'website': f"https://www.{name.lower().replace(' ', '')[:40]}{index}.edu",
+            'global_ranking': rng.randint(1, 2000) if rng.random() < 0.2 else None,
+            'tuition_fee_usd': tuition,
+            'scholarship_available': rng.random() < 0.55,
+            'admission_rate': round(rng.uniform(5, 95), 2) if rng.random() > 0.3 else None,
+            'student_population': int(rng.lognormvariate(9, 1)) if rng.random() > 0.4 else None,
+            'founded_year': rng.randint(1088, 2022) if rng.random() > 0.3 else None,
+            'type': rng.choices(['Public', 'Private', 'Non-profit'], weights=[6, 3, 1])[0],
+            'research_areas': ', '.join(fields),
+            'campus_size': rng.choice(['Small', 'Medium', 'Large', 'Very Large']),
+            'admission_requirements': '; '.join(rng.sample(REQUIREMENTS, k=rng.randint(3, len(REQUIREMENTS)))),
+            'notable_faculty': f"Professor {self._city()} {self._city()} ({rng.choice(fields)})",
+            'program_strengths': '; '.join(rng.sample(STRENGTHS, k=rng.randint(3, 6))),
+            'application_deadline': rng.choice(DEADLINES)
+        }
+
+    def generate(self, count: int) -> Iterator[Dict[str, Any]]:
+        for index in range(count):
+            yield self.generate_row(index)
+
+
+def write_csv(rows: Iterator[Dict[str, Any]], path: str) -> int:
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_jsonl(rows: Iterator[Dict[str, Any]], path: str) -> int:
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def read_catalog(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream rows back from a CSV or JSONL catalog file"""
+    if path.endswith('.jsonl'):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            yield {key: (value if value != '' else None) for key, value in row.items()}
+
+
+def bulk_load(path: str, db_config: Dict[str, Any], batch_size: int = 5000, truncate: bool = False) -> int:
+    """
+    Bulk-load a generated catalog file into the universities table, emptying
+    it first only when truncate is set
+    """
+    conn = mysql.connector.connect(**db_config)
+    cursor = conn.cursor()
+    insert_sql = f"""
+    INSERT INTO universities ({', '.join(COLUMNS)})
+    VALUES ({', '.join(['%s'] * len(COLUMNS))})
+    """
+    loaded = 0
+    started = time.perf_counter()
+    try:
+        if truncate:
+            print(f"Truncating universities in {db_config['database']}...")
+            cursor.execute("TRUNCATE TABLE universities")
+
+        batch: List[Tuple[Any, ...]] = []
+        for row in read_catalog(path):
+            if isinstance(row['scholarship_available'], str):
+                row['scholarship_available'] = row['scholarship_available'] == 'True'
+            batch.append(tuple(row[column] for column in COLUMNS))
+            if len(batch) >= batch_size:
+                cursor.executemany(insert_sql, batch)
+                conn.commit()
+                loaded += len(batch)
+                batch = []
+                print(f"Loaded {loaded} universities ({loaded / (time.perf_counter() - started):.0f} rows/s)...")
+        if batch:
+            cursor.executemany(insert_sql, batch)
+            conn.commit()
+            loaded += len(batch)
+        bump_catalog_version(cursor)
+        conn.commit()
+        print(f"Loaded {loaded} universities in {time.perf_counter() - started:.1f}s")
+        return loaded
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic university catalogs for scale testing")
+    parser.add_argument("--size", default="10k", help="Number of universities, e.g. 10k, 100k, 1M")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--country-skew", type=float, default=1.1, help="Zipf exponent for countries")
+    parser.add_argument("--field-skew", type=float, default=0.9, help="Zipf exponent for fields")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None, help="Defaults to the output extension")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--load", action="store_true", help="Bulk-load the generated file into MySQL")
+    parser.add_argument("--db-name", default=None, help="Target database (required with --load)")
+    parser.add_argument("--truncate", action="store_true", help="Empty the target universities table before loading")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    # Never fall back to DB_NAME: that is usually the real catalog
+    if args.load and not args.db_name:
+        parser.error("--load requires an explicit --db-name")
+    if args.truncate and not args.load:
+        parser.error("--truncate only applies with --load")
+
+    count = parse_size(args.size)
+    output_format = args.format or ("jsonl" if (args.output or "").endswith(".jsonl") else "csv")
+    output = args.output or f"synthetic_catalog_{args.size.lower()}.{output_format}"
+
+    generator = SyntheticCatalogGenerator(args.seed, args.country_skew, args.field_skew)
+    started = time.perf_counter()
+    writer = write_jsonl if output_format == "jsonl" else write_csv
+    written = writer(generator.generate(count), output)
+    print(f"Wrote {written} universities to {output} in {time.perf_counter() - started:.1f}s")
+
+    if args.load:
+        os.environ['DB_NAME'] = args.db_name
+        from csv_to_mysql import CSVToMySQLConverter
+        CSVToMySQLConverter().create_database_and_table()
+
+        db_config = {
+            'host': os.getenv('DB_HOST', 'localhost'),
+            'user': os.getenv('DB_USER', 'root'),
+            'password': os.getenv('DB_PASSWORD', ''),
+            'port': int(os.getenv('DB_PORT', 3306)),
+            'database': args.db_name
+        }
+        bulk_load(output, db_config, args.batch_size, truncate=args.truncate)
+
+
+if __name__ == "__main__":
+    main()
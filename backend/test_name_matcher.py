@@ -0,0 +1,51 @@
+from name_matcher import NameMatcher
+
+# Regression tests for the ranking-table name matcher.
+#
+#     python -m pytest test_name_matcher.py
+
+CATALOG = [
+    (1, 'University College London', 'United Kingdom'),
+    (2, 'London School of Economics and Political Science', 'United Kingdom'),
+    (3, "King's College London", 'United Kingdom'),
+    (4, 'Imperial College London', 'United Kingdom'),
+    (5, 'Queen Mary University of London', 'United Kingdom'),
+    (6, 'London Business School', 'United Kingdom'),
+    (7, 'University of Oxford', 'United Kingdom'),
+    (8, 'Technical University of Munich', 'Germany'),
+    (9, 'University of California, Berkeley', 'United States'),
+    (10, 'University of California, Los Angeles', 'United States'),
+    (11, 'Massachusetts Institute of Technology', 'United States'),
+    (12, 'Stanford University', 'United States'),
+]
+
+
+def matcher() -> NameMatcher:
+    return NameMatcher.build(CATALOG)
+
+
+def test_shared_city_and_generic_words_do_not_match():
+    # Only "university" and "london" in common: a different institution
+    assert matcher().match('University of London', 'United Kingdom') is None
+    assert matcher().match('Technical University of Berlin', 'Germany') is None
+
+
+def test_distinctive_tokens_match_short_forms():
+    match = matcher().match('London School of Economics', 'United Kingdom')
+    assert match is not None and match[0] == 2
+    match = matcher().match('Imperial College', 'United Kingdom')
+    assert match is not None and match[0] == 4
+
+
+def test_spelling_variants_match():
+    m = matcher()
+    assert m.match('Kings College London', 'United Kingdom')[0] == 3
+    assert m.match('Univ. of Oxford', 'United Kingdom')[0] == 7
+    assert m.match('Oxford University', 'United Kingdom')[0] == 7
+    assert m.match('University of California Berkeley', 'United States')[0] == 9
+    assert m.match('Massachusetts Institute of Technology (MIT)', 'United States')[0] == 11
+
+
+def test_ambiguous_overlap_needs_a_near_exact_score():
+    # "California" alone is shared by two campuses
+    assert matcher().match('University of California', 'United States') is None
@@ -0,0 +1,141 @@
+import asyncio
+import os
+import time
+
+import httpx
+
+from polite_fetcher import HTTPCache, PoliteFetcher
+
+# Fixture-replay tests for polite_fetcher: the ranking pages recorded under
+# fixtures/rankings are served by an in-process transport, recorded to a
+# temporary cache directory and replayed offline.
+#
+#     python -m pytest test_polite_fetcher.py
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "rankings")
+RANKINGS_URL = "https://www.topuniversities.com/university-rankings/world-university-rankings"
+JSON_PAGE_URL = f"{RANKINGS_URL}/2025"  # Rankings shipped as an embedded JSON payload
+DOM_PAGE_URL = f"{RANKINGS_URL}/2024"  # Rankings in a server-rendered table only
+
+
+def recorded(url):
+    """The committed fixture recording of url"""
+    page = HTTPCache(FIXTURES).get(url)
+    assert page is not None, f"No fixture recorded for {url}"
+    return page
+
+
+PAGE = recorded(DOM_PAGE_URL).content
+
+
+def serve(pages, calls=None):
+    """Transport answering from {path: (status, headers, body)}, recording each request"""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if calls is not None:
+            calls.append(request)
+        status, headers, body = pages[request.url.path]
+        if callable(body):
+            return await body(request)
+        return httpx.Response(status, headers=headers, content=body)
+    return httpx.MockTransport(handler)
+
+
+def test_records_pages_and_replays_them_offline(tmp_path):
+    urls = [JSON_PAGE_URL, DOM_PAGE_URL]
+    pages = {httpx.URL(url).path: (200, recorded(url).headers, recorded(url).content) for url in urls}
+    online = PoliteFetcher(cache_dir=str(tmp_path), min_interval=0, transport=serve(pages))
+    fetched = asyncio.run(online.fetch_many(urls))
+    assert all(fetched[url].content == recorded(url).content for url in urls)
+
+    offline = PoliteFetcher(cache_dir=str(tmp_path), offline=True)
+    replayed = asyncio.run(offline.fetch_many(urls + [f"{RANKINGS_URL}/1999"]))
+    for url in urls:
+        assert replayed[url].from_cache
+        assert replayed[url].content == recorded(url).content
+        assert replayed[url].headers["etag"] == recorded(url).headers["etag"]
+    # Pages never recorded are reported as failed, not fetched
+    assert replayed[f"{RANKINGS_URL}/1999"] is None
+
+
+def test_replays_committed_fixtures_offline():
+    fetcher = PoliteFetcher(cache_dir=FIXTURES, offline=True)
+    pages = asyncio.run(fetcher.fetch_many([JSON_PAGE_URL, DOM_PAGE_URL]))
+    assert b'id="__NEXT_DATA__"' in pages[JSON_PAGE_URL].content
+    assert b'class="ranking-row"' in pages[DOM_PAGE_URL].content
+
+
+def test_revalidates_cached_pages_and_refreshes_validators(tmp_path):
+    url = JSON_PAGE_URL
+    original = recorded(url)
+    HTTPCache(str(tmp_path)).put(original)
+
+    calls = []
+    not_modified = {"ETag": '"qs-wur-2025-8b01c4"', "Cache-Control": "public, max-age=600"}
+    fetcher = PoliteFetcher(cache_dir=str(tmp_path), min_interval=0,
+                            transport=serve({httpx.URL(url).path: (304, not_modified, b"")}, calls))
+    result = asyncio.run(fetcher.fetch_many([url]))[url]
+    assert calls[0].headers["If-None-Match"] == original.headers["etag"]
+    assert calls[0].headers["If-Modified-Since"] == original.headers["last-modified"]
+    assert result.from_cache and result.content == original.content
+
+    # The validators sent with the 304 replace the stored ones; the rest are kept
+    stored = HTTPCache(str(tmp_path)).get(url)
+    assert stored.headers["etag"] == '"qs-wur-2025-8b01c4"'
+    assert stored.headers["cache-control"] == "public, max-age=600"
+    assert stored.headers["last-modified"] == original.headers["last-modified"]
+    assert stored.content == original.content
+
+    asyncio.run(fetcher.fetch_many([url]))
+    assert calls[1].headers["If-None-Match"] == '"qs-wur-2025-8b01c4"'
+
+
+def test_retries_with_capped_retry_after():
+    responses = iter([
+        httpx.Response(429, headers={"Retry-After": "86400"}),
+        httpx.Response(200, content=PAGE)
+    ])
+
+    async def flaky(request):
+        return next(responses)
+
+    fetcher = PoliteFetcher(min_interval=0, max_retry_after=0.05, transport=serve({"/rankings": (0, {}, flaky)}))
+    start = time.monotonic()
+    result = asyncio.run(fetcher.fetch_many(["https://example.org/rankings"]))["https://example.org/rankings"]
+    assert result.status == 200
+    assert time.monotonic() - start < 5
+
+
+def test_limits_concurrency_and_spaces_requests_per_host():
+    in_flight, peak, starts = 0, 0, []
+
+    async def slow(request):
+        nonlocal in_flight, peak
+        starts.append(time.monotonic())
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return httpx.Response(200, content=PAGE)
+
+    pages = {f"/page/{i}": (0, {}, slow) for i in range(6)}
+    fetcher = PoliteFetcher(per_host_concurrency=2, min_interval=0.02, transport=serve(pages))
+    results = asyncio.run(fetcher.fetch_many(f"https://example.org/page/{i}" for i in range(6)))
+
+    assert all(result is not None for result in results.values())
+    assert peak <= 2
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    assert min(gaps) >= 0.015
+
+
+def test_fetcher_is_reusable_across_event_loops():
+    # The scraper runs each fetch_many under its own asyncio.run; with one slot per host
+    # the second URL waits on the semaphore, which binds it to the running loop
+    async def slow(request):
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, content=PAGE)
+
+    pages = {"/a": (0, {}, slow), "/b": (0, {}, slow)}
+    fetcher = PoliteFetcher(per_host_concurrency=1, min_interval=0, transport=serve(pages))
+    for _ in range(2):
+        results = asyncio.run(fetcher.fetch_many(["https://example.org/a", "https://example.org/b"]))
+        assert all(result is not None for result in results.values())
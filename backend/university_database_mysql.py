@@ -3,14 +3,16 @@ import asyncio
 import os
 from dotenv import load_dotenv
 import json
-from typing import Dict, List, Any, Optional
+import time
+from typing import Callable, Dict, List, Any, Optional
 from gpt_university_enhancer import GPTUniversityEnhancer
+from catalog_sync import CATALOG_VERSION_KEY, bump_catalog_version, ensure_catalog_meta
 
 # Load environment variables
 load_dotenv()
 
 class UniversityDatabaseMySQL:
-    def __init__(self):
+    def __init__(self, http_client=None):
         """
         Initialize MySQL University Database
         """
@@ -21,7 +23,20 @@ class UniversityDatabaseMySQL:
             'port': int(os.getenv('DB_PORT', 3306)),
             'database': os.getenv('DB_NAME', 'universitydb')
         }
-        self.gpt_enhancer = GPTUniversityEnhancer()
+        self.gpt_enhancer = GPTUniversityEnhancer(http_client)
+        
+        # Cached catalog version used for HTTP validators on read endpoints. The
+        # loaders' catalog_meta counter is polled more often than the table is scanned
+        self.catalog_version_ttl = float(os.getenv('CATALOG_VERSION_TTL', 30))
+        self.catalog_version_poll = float(os.getenv('CATALOG_VERSION_POLL', 1))
+        self._catalog_version = None
+        self._catalog_version_checked_at = 0.0
+        self._catalog_counter = None
+        self._catalog_counter_checked_at = 0.0
+        self._catalog_meta_ready = False
+        
+        # Called with (action, university_id, university_data) after each committed write
+        self._catalog_listeners: List[Callable[[str, int, Dict[str, Any]], None]] = []
         
     def get_connection(self):
         """Get MySQL database connection"""
@@ -31,6 +46,156 @@ class UniversityDatabaseMySQL:
             print(f"Database connection error: {err}")
             return None
     
+    def get_catalog_version(self) -> str:
+        """
+        Get a token that changes whenever the universities table changes.
+        The table fingerprint is cached for catalog_version_ttl seconds so
+        conditional requests can be answered without scanning the table. Writes
+        made by the offline loaders bump the catalog_meta counter, which is
+        re-read every catalog_version_poll seconds and forces a new fingerprint.
+        """
+        now = time.monotonic()
+        if (self._catalog_version is not None
+                and now - self._catalog_version_checked_at < self.catalog_version_ttl
+                and now - self._catalog_counter_checked_at < self.catalog_version_poll):
+            return self._catalog_version
+        
+        conn = self.get_connection()
+        if not conn:
+            return self._catalog_version or "fallback"
+        
+        try:
+            cursor = conn.cursor()
+            counter = self._read_catalog_counter(cursor)
+            self._catalog_counter_checked_at = now
+            if (self._catalog_version is not None and counter == self._catalog_counter
+                    and now - self._catalog_version_checked_at < self.catalog_version_ttl):
+                return self._catalog_version
+            
+            cursor.execute("SELECT COUNT(*), MAX(id), MAX(updated_at) FROM universities")
+            count, max_id, last_updated = cursor.fetchone()
+            self._catalog_counter = counter
+            self._catalog_version = f"{counter}-{count}-{max_id}-{last_updated.isoformat() if last_updated else ''}"
+            self._catalog_version_checked_at = now
+            return self._catalog_version
+        except mysql.connector.Error as err:
+            print(f"Error fetching catalog version: {err}")
+            return self._catalog_version or "fallback"
+        finally:
+            if conn.is_connected():
+                cursor.close()
+                conn.close()
+    
+    async def catalog_version(self) -> str:
+        """
+        get_catalog_version for request handlers: answers from the cache when it
+        is fresh, otherwise runs the database round trip in a worker thread
+        """
+        now = time.monotonic()
+        if (self._catalog_version is not None
+                and now - self._catalog_version_checked_at < self.catalog_version_ttl
+                and now - self._catalog_counter_checked_at < self.catalog_version_poll):
+            return self._catalog_version
+        return await asyncio.to_thread(self.get_catalog_version)
+    
+    def _prepare_catalog_write(self, cursor):
+        """
+        Create catalog_meta once per process before a write starts, so the
+        write can bump the shared version counter in its own transaction
+        """
+        if not self._catalog_meta_ready:
+            ensure_catalog_meta(cursor)
+            self._catalog_meta_ready = True
+    
+    def invalidate_catalog_version(self):
+        """
+        Force the next get_catalog_version call to re-read the database
+        """
+        self._catalog_version_checked_at = 0.0
+        self._catalog_counter_checked_at = 0.0
+    
+    @staticmethod
+    def _read_catalog_counter(cursor) -> int:
+        """Loader-maintained catalog version counter; 0 until a loader first bumps it"""
+        try:
+            cursor.execute("SELECT value FROM catalog_meta WHERE name = %s", (CATALOG_VERSION_KEY,))
+        except mysql.connector.Error as err:
+            if err.errno == 1146:  # ER_NO_SUCH_TABLE
+                return 0
+            raise
+        row = cursor.fetchone()
+        return row[0] if row else 0
+    
+    async def use_http_client(self, http_client):
+        """
+        Send GPT enrichment calls through the application's shared HTTP client
+        """
+        await self.gpt_enhancer.use_http_client(http_client)
+    
+    def add_catalog_listener(self, listener: Callable[[str, int, Dict[str, Any]], None]):
+        """
+        Register a callback for committed add/update/delete of a university
+        """
+        self._catalog_listeners.append(listener)
+    
+    def _notify_catalog_listeners(self, action: str, university_id: int, university_data: Dict[str, Any]):
+        for listener in self._catalog_listeners:
+            try:
+                listener(action, university_id, university_data)
+            except Exception as e:
+                print(f"Catalog listener failed on {action} of university {university_id}: {e}")
+    
+    def _format_university(self, uni: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a universities row to the format the API and engine expect
+        """
+        # Generate program name based on research areas or default
+        research_areas_list = uni['research_areas'].split(', ') if uni['research_areas'] else []
+        program_name = research_areas_list[0] if research_areas_list else "General Studies"
+        
+        # Parse admission requirements into list
+        requirements = uni['admission_requirements'].split('; ') if uni['admission_requirements'] else []
+        
+        # Parse notable faculty into list for faculty highlights
+        faculty_highlights = uni['notable_faculty'].split('; ') if uni['notable_faculty'] else []
+        
+        # Parse program strengths into list
+        strengths = uni['program_strengths'].split('; ') if uni['program_strengths'] else []
+        
+        formatted_uni = {
+            'id': uni['id'],
+            'name': uni['name'],
+            'country': uni['country_name'],
+            'country_code': uni['country_code'],
+            'website': uni['website'],
+            'ranking': uni['global_ranking'],
+            'tuition_fee': uni['tuition_fee_usd'],
+            'scholarship_available': bool(uni['scholarship_available']),
+            'admission_rate': uni['admission_rate'] if uni['admission_rate'] else "Not specified",
+            'student_population': uni['student_population'],
+            'founded_year': uni['founded_year'],
+            'type': uni['type'],
+            'research_areas': research_areas_list,
+            'campus_size': uni['campus_size'],
+            'admission_requirements': uni['admission_requirements'],
+            'notable_faculty': uni['notable_faculty'],
+            'program_strengths': uni['program_strengths'],
+            'application_deadline': uni['application_deadline'],
+            'description': f"A {uni['type'].lower()} university in {uni['country_name']}",
+            # Additional fields for frontend compatibility
+            'program_name': program_name,
+            'programName': program_name,  # Frontend expects this field
+            'duration': "2-4 years",  # Default duration
+            'requirements': requirements,
+            'faculty_highlights': faculty_highlights,
+            'facultyHighlights': faculty_highlights,  # Frontend expects this field
+            'campus_life': f"Campus life at {uni['name']} offers a vibrant community with diverse activities and modern facilities.",
+            'campusLife': f"Campus life at {uni['name']} offers a vibrant community with diverse activities and modern facilities.",  # Frontend expects this field
+            'strengths': strengths,
+            'match_score': 0  # Default match score, will be updated by recommendation engine
+        }
+        return formatted_uni
+    
     def get_all_universities(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
         """
         Get all universities with pagination
@@ -55,54 +220,7 @@ class UniversityDatabaseMySQL:
             universities = cursor.fetchall()
             
             # Convert to the expected format
-            formatted_universities = []
-            for uni in universities:
-                # Generate program name based on research areas or default
-                research_areas_list = uni['research_areas'].split(', ') if uni['research_areas'] else []
-                program_name = research_areas_list[0] if research_areas_list else "General Studies"
-                
-                # Parse admission requirements into list
-                requirements = uni['admission_requirements'].split('; ') if uni['admission_requirements'] else []
-                
-                # Parse notable faculty into list for faculty highlights
-                faculty_highlights = uni['notable_faculty'].split('; ') if uni['notable_faculty'] else []
-                
-                # Parse program strengths into list
-                strengths = uni['program_strengths'].split('; ') if uni['program_strengths'] else []
-                
-                formatted_uni = {
-                    'id': uni['id'],
-                    'name': uni['name'],
-                    'country': uni['country_name'],
-                    'country_code': uni['country_code'],
-                    'website': uni['website'],
-                    'ranking': uni['global_ranking'],
-                    'tuition_fee': uni['tuition_fee_usd'],
-                    'scholarship_available': bool(uni['scholarship_available']),
-                    'admission_rate': uni['admission_rate'] if uni['admission_rate'] else "Not specified",
-                    'student_population': uni['student_population'],
-                    'founded_year': uni['founded_year'],
-                    'type': uni['type'],
-                    'research_areas': research_areas_list,
-                    'campus_size': uni['campus_size'],
-                    'admission_requirements': uni['admission_requirements'],
-                    'notable_faculty': uni['notable_faculty'],
-                    'program_strengths': uni['program_strengths'],
-                    'application_deadline': uni['application_deadline'],
-                    'description': f"A {uni['type'].lower()} university in {uni['country_name']}",
-                    # Additional fields for frontend compatibility
-                    'program_name': program_name,
-                    'programName': program_name,  # Frontend expects this field
-                    'duration': "2-4 years",  # Default duration
-                    'requirements': requirements,
-                    'faculty_highlights': faculty_highlights,
-                    'facultyHighlights': faculty_highlights,  # Frontend expects this field
-                    'campus_life': f"Campus life at {uni['name']} offers a vibrant community with diverse activities and modern facilities.",
-                    'campusLife': f"Campus life at {uni['name']} offers a vibrant community with diverse activities and modern facilities.",  # Frontend expects this field
-                    'strengths': strengths,
-                    'match_score': 0  # Default match score, will be updated by recommendation engine
-                }
-                formatted_universities.append(formatted_uni)
+            formatted_universities = [self._format_university(uni) for uni in universities]
             
             return formatted_universities
             
@@ -114,6 +232,40 @@ class UniversityDatabaseMySQL:
                 cursor.close()
                 conn.close()
     
+    def get_universities_by_ids(self, university_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Get universities by ID in one query, in the order the IDs were given
+        """
+        if not university_ids:
+            return []
+        conn = self.get_connection()
+        if not conn:
+            fallback = {uni['id']: uni for uni in self._get_minimal_fallback_data()}
+            return [fallback[university_id] for university_id in university_ids if university_id in fallback]
+        
+        try:
+            cursor = conn.cursor(dictionary=True)
+            query = f"""
+            SELECT id, country_code, country_name, name, website, global_ranking,
+                   tuition_fee_usd, scholarship_available, admission_rate,
+                   student_population, founded_year, type, research_areas,
+                   campus_size, admission_requirements, notable_faculty,
+                   program_strengths, application_deadline, created_at
+            FROM universities
+            WHERE id IN ({', '.join(['%s'] * len(university_ids))})
+            """
+            cursor.execute(query, list(university_ids))
+            by_id = {uni['id']: self._format_university(uni) for uni in cursor.fetchall()}
+            return [by_id[university_id] for university_id in university_ids if university_id in by_id]
+        
+        except mysql.connector.Error as err:
+            print(f"Error fetching universities by id: {err}")
+            return []
+        finally:
+            if conn.is_connected():
+                cursor.close()
+                conn.close()
+    
     def get_university_by_id(self, university_id: int) -> Optional[Dict[str, Any]]:
         """
         Get a specific university by ID
@@ -345,6 +497,7 @@ class UniversityDatabaseMySQL:
             
             research_areas_str = ', '.join(university_data.get('research_areas', []))
             
+            self._prepare_catalog_write(cursor)
             cursor.execute(insert_query, (
                 university_data.get('country_code', ''),
                 university_data.get('country', ''),
@@ -360,8 +513,13 @@ class UniversityDatabaseMySQL:
                 research_areas_str,
                 university_data.get('campus_size', 'Medium')
             ))
+            university_id = cursor.lastrowid
+            # Bumped in the same transaction so other API workers see the change
+            bump_catalog_version(cursor, ensure_table=False)
             
             conn.commit()
+            self.invalidate_catalog_version()
+            self._notify_catalog_listeners('add', university_id, university_data)
             return True
             
         except mysql.connector.Error as err:
@@ -422,10 +580,17 @@ class UniversityDatabaseMySQL:
             WHERE id = %s
             """
             
+            self._prepare_catalog_write(cursor)
             cursor.execute(update_query, params)
+            updated = cursor.rowcount > 0
+            if updated:
+                bump_catalog_version(cursor, ensure_table=False)
             conn.commit()
+            self.invalidate_catalog_version()
+            if updated:
+                self._notify_catalog_listeners('update', university_id, university_data)
             
-            return cursor.rowcount > 0
+            return updated
             
         except mysql.connector.Error as err:
             print(f"Error updating university: {err}")
@@ -446,10 +611,17 @@ class UniversityDatabaseMySQL:
         try:
             cursor = conn.cursor()
             delete_query = "DELETE FROM universities WHERE id = %s"
+            self._prepare_catalog_write(cursor)
             cursor.execute(delete_query, (university_id,))
+            deleted = cursor.rowcount > 0
+            if deleted:
+                bump_catalog_version(cursor, ensure_table=False)
             conn.commit()
+            self.invalidate_catalog_version()
+            if deleted:
+                self._notify_catalog_listeners('delete', university_id, {})
             
-            return cursor.rowcount > 0
+            return deleted
             
         except mysql.connector.Error as err:
             print(f"Error deleting university: {err}")
@@ -510,13 +682,16 @@ class UniversityDatabaseMySQL:
                 cursor.close()
                 conn.close()
     
-    async def generate_universities_for_field(self, field: str, count: int = 5) -> List[Dict[str, Any]]:
+    async def generate_universities_for_field(self, field: str, country: Optional[str] = None, count: int = 5) -> List[Dict[str, Any]]:
         """
         Generate universities for a specific field using GPT
         """
         try:
             # Get some real universities as base
-            real_universities = self.search_universities(field, limit=3)
+            if country:
+                real_universities = self.filter_universities({'country': country, 'research_area': field}, limit=3)
+            else:
+                real_universities = self.search_universities(field, limit=3)
             
             if real_universities:
                 # Use GPT to enhance the first university
@@ -535,7 +710,7 @@ class UniversityDatabaseMySQL:
                 for i in range(count):
                     generated = await self.gpt_enhancer.generate_university_data(
                         f"University of {field} Excellence {i+1}",
-                        "United States",
+                        country or "United States",
                         field
                     )
                     if generated:
@@ -3,8 +3,10 @@
 import json
 import mysql.connector
 import os
+import sys
 from dotenv import load_dotenv
 from typing import Dict, List, Any, Optional
+from catalog_sync import JSON_HASH_COLUMN, CatalogSync, bump_catalog_version, default_change_log_path
 
 # Load environment variables
 load_dotenv()
@@ -165,18 +167,34 @@ class DatabaseUpdater:
         except (ValueError, AttributeError):
             return None
     
+    def map_record(self, university_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a JSON university record to database columns"""
+        country_name = university_data.get('country') or 'Unknown'
+        return {
+            'name': university_data.get('name', ''),
+            'global_ranking': int(university_data.get('rank', 0)) if university_data.get('rank') else None,
+            'website': university_data.get('web_address', ''),
+            'country_name': country_name,
+            'country_code': university_data.get('country_code') or self.map_country_code(country_name),
+            'student_population': self.parse_student_population(university_data.get('number_students')),
+            'admission_rate': self.parse_admission_rate(university_data.get('intl_students')),
+            'research_areas': self.clean_subjects(university_data.get('subjects', [])),
+            'description': university_data.get('description', '')
+        }
+    
     def update_university(self, conn, university_data: Dict[str, Any]) -> str:
         """Update or insert a single university record"""
         # Map JSON fields to database columns first
-        name = university_data.get('name', '')
-        global_ranking = int(university_data.get('rank', 0)) if university_data.get('rank') else None
-        website = university_data.get('web_address', '')
-        country_name = university_data.get('country') or 'Unknown'
-        country_code = university_data.get('country_code') or self.map_country_code(country_name)
-        student_population = self.parse_student_population(university_data.get('number_students'))
-        admission_rate = self.parse_admission_rate(university_data.get('intl_students'))
-        research_areas = self.clean_subjects(university_data.get('subjects', []))
-        description = university_data.get('description', '')
+        record = self.map_record(university_data)
+        name = record['name']
+        global_ranking = record['global_ranking']
+        website = record['website']
+        country_name = record['country_name']
+        country_code = record['country_code']
+        student_population = record['student_population']
+        admission_rate = record['admission_rate']
+        research_areas = record['research_areas']
+        description = record['description']
         
         # Skip if no name
         if not name:
@@ -271,6 +289,10 @@ class DatabaseUpdater:
             
             # Commit all changes
             conn.commit()
+            cursor = conn.cursor()
+            bump_catalog_version(cursor)
+            conn.commit()
+            cursor.close()
             print(f"\nDatabase update completed:")
             print(f"- Updated: {updated_count} universities")
             print(f"- Inserted: {inserted_count} universities")
@@ -282,11 +304,48 @@ class DatabaseUpdater:
         finally:
             conn.close()
 
+    def sync_database_from_json(self, json_file_path: str, delete_missing: bool = False,
+                                change_log_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Incrementally sync the database from a JSON file: only rows whose
+        content hash differs are written, and a change log is returned.
+        Rows are keyed on name and country like the CSV sync. The JSON export
+        is a ranked subset of the catalog, so it cannot delete missing rows.
+        """
+        if delete_missing:
+            raise ValueError("The JSON export covers only part of the catalog; "
+                             "--delete-missing is only supported by the CSV sync")
+        try:
+            with open(json_file_path, 'r', encoding='utf-8') as file:
+                universities_data = json.load(file)
+        except FileNotFoundError:
+            print(f"Error: File {json_file_path} not found")
+            return None
+        except json.JSONDecodeError as e:
+            print(f"Error parsing JSON: {e}")
+            return None
+        
+        print(f"Loaded {len(universities_data)} universities from JSON")
+        records = [record for record in map(self.map_record, universities_data) if record['name']]
+        
+        sync = CatalogSync(self.db_config, columns=list(records[0].keys()) if records else ['name'],
+                           key_columns=('name', 'country_code'), hash_column=JSON_HASH_COLUMN)
+        try:
+            return sync.sync(records, delete_missing=delete_missing,
+                             change_log_path=change_log_path or default_change_log_path())
+        except mysql.connector.Error:
+            return None
+
 def main():
     json_file_path = "/Users/wisemaker/Sites/university-recommender/backend/updated_universities_fixed.json"
     
     updater = DatabaseUpdater()
-    updater.update_database_from_json(json_file_path)
+    if '--sync' in sys.argv:
+        if '--delete-missing' in sys.argv:
+            sys.exit("--delete-missing is not supported for the JSON sync: the export covers only part of the catalog")
+        updater.sync_database_from_json(json_file_path)
+    else:
+        updater.update_database_from_json(json_file_path)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,126 @@
+import json
+from typing import Dict, Iterable, Optional
+
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Leading bytes read to identify the document type (DOCX needs its first zip entry name)
+SNIFF_SIZE = 4096
+# Room for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+PDF_TYPE = "application/pdf"
+DOC_TYPE = "application/msword"
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+CV_DOCUMENT_TYPES = (PDF_TYPE, DOC_TYPE, DOCX_TYPE)
+
+
+class UploadRejected(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def sniff_document_type(head: bytes) -> Optional[str]:
+    """
+    Identify a document from its leading magic bytes rather than the client's content type
+    """
+    if head.startswith(b"%PDF-"):
+        return PDF_TYPE
+    if head.startswith(b"PK\x03\x04"):
+        # DOCX is a zip; the first entry is normally [Content_Types].xml or a word/ part
+        if b"[Content_Types].xml" in head or b"word/" in head or b"_rels/" in head:
+            return DOCX_TYPE
+        return None
+    if head.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+        return DOC_TYPE
+    return None
+
+
+async def read_upload(file: UploadFile, max_size: int, allowed_types: Iterable[str] = CV_DOCUMENT_TYPES) -> bytes:
+    """
+    Read an already-parsed upload (Starlette has spooled it to disk) into memory,
+    checking its magic bytes first and reading at most max_size + 1 bytes. The
+    body itself is bounded earlier, while it streams in, by UploadLimitMiddleware.
+    """
+    head = await file.read(SNIFF_SIZE)
+    if not head:
+        raise UploadRejected(400, "Empty file.")
+    if sniff_document_type(head) not in allowed_types:
+        raise UploadRejected(415, "Invalid file type. Please upload PDF, DOC, or DOCX files.")
+
+    # One read of the remainder, capped one byte past the limit to detect oversize files
+    content = head + await file.read(max_size + 1 - len(head))
+    if len(content) > max_size:
+        raise UploadRejected(413, f"File too large. Maximum size is {max_size / (1024 * 1024):g}MB.")
+    return content
+
+
+class UploadLimitMiddleware:
+    """
+    Bounds request bodies on upload routes before the multipart parser buffers them.
+
+    A Content-Length above the limit is answered with 413 without reading the
+    body; bodies without one are counted as they stream in and cut off with a
+    413 once they pass the limit.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limits.get(scope.get("path", "")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        limit += MULTIPART_OVERHEAD
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            await self._reject(send)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    # Stop the parser here; whatever error it raises is replaced by a 413 below
+                    raise UploadRejected(413, "Request body too large")
+            return message
+
+        async def limited_send(message: Message) -> None:
+            nonlocal response_started
+            if exceeded:
+                if message["type"] == "http.response.start" and not response_started:
+                    response_started = True
+                    await self._reject(send)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, limited_send)
+        except UploadRejected:
+            if not response_started:
+                await self._reject(send)
+
+    @staticmethod
+    async def _reject(send: Send):
+        body = json.dumps({"detail": "File too large."}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,264 @@
+import contextvars
+import functools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Per-request trace (list of node spans) and the span of the node currently running
+_current_trace: contextvars.ContextVar[Optional[List[Dict[str, Any]]]] = contextvars.ContextVar("workflow_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("workflow_span", default=None)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.values: Dict[Tuple[Tuple[str, str], ...], Dict[str, Any]] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        series = self.values.setdefault(key, {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series["buckets"][i] += 1
+        series["sum"] += value
+        series["count"] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self.values.items()):
+            for bound, count in zip(self.buckets, series["buckets"]):
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', f'{bound:g}'),))} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {series['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series['sum']:g}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+
+def _format_labels(key: Tuple[Tuple[str, str], ...]) -> str:
+    if not key:
+        return ""
+    escaped = [(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in key]
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics registry rendered in the Prometheus text format
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, Any] = {}
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        if name not in self.metrics:
+            self.metrics[name] = Counter(name, help_text)
+        return self.metrics[name]
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        if name not in self.metrics:
+            self.metrics[name] = Histogram(name, help_text, buckets)
+        return self.metrics[name]
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+node_duration = registry.histogram("workflow_node_duration_seconds", "Wall time spent in each workflow node")
+node_errors = registry.counter("workflow_node_errors_total", "Workflow node invocations that raised")
+node_candidates = registry.histogram("workflow_node_candidates", "Candidate universities entering and leaving each node", COUNT_BUCKETS)
+llm_duration = registry.histogram("workflow_llm_duration_seconds", "Latency of LLM calls made by each node")
+llm_calls = registry.counter("workflow_llm_calls_total", "LLM calls made by each node")
+llm_prompt_tokens = registry.counter("workflow_llm_prompt_tokens_total", "Prompt tokens sent by each node")
+llm_completion_tokens = registry.counter("workflow_llm_completion_tokens_total", "Completion tokens received by each node")
+llm_estimated_prompt_tokens = registry.counter(
+    "workflow_llm_estimated_prompt_tokens_total", "Prompt tokens counted locally before sending, by node"
+)
+llm_tier_duration = registry.histogram("workflow_llm_tier_duration_seconds", "Latency of LLM calls by model tier")
+llm_tier_tokens = registry.counter("workflow_llm_tier_tokens_total", "Prompt and completion tokens by model tier")
+llm_tier_cost = registry.counter("workflow_llm_tier_cost_usd_total", "Estimated LLM spend in USD by model tier")
+llm_hedges = registry.counter("workflow_llm_hedged_requests_total", "Hedged LLM requests fired by each node, by which reply won")
+node_degraded = registry.counter("workflow_node_degraded_total", "Nodes that fell back to a local result, by reason")
+
+
+def start_trace() -> List[Dict[str, Any]]:
+    """
+    Start collecting node spans for the current request and return the span list
+    """
+    trace: List[Dict[str, Any]] = []
+    _current_trace.set(trace)
+    return trace
+
+
+def annotate_span(**values):
+    """
+    Attach extra values to the span of the node currently running
+    """
+    span = _current_span.get()
+    if span is not None:
+        span.update(values)
+
+
+def current_node() -> Optional[str]:
+    """
+    Name of the workflow node currently running, if any
+    """
+    span = _current_span.get()
+    return span["node"] if span is not None else None
+
+
+def _token_usage(response: Any) -> Tuple[int, int]:
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+    if token_usage:
+        return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        return getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0
+    return 0, 0
+
+
+def record_llm_call(latency: float, response: Any = None, estimated_prompt_tokens: Optional[int] = None,
+                    tier: Any = None):
+    """
+    Record one LLM call against the running node (or "unattributed" outside the workflow)
+    and its model tier; per-call token usage is logged at debug level only
+    """
+    span = _current_span.get()
+    node = span["node"] if span is not None else "unattributed"
+    prompt_tokens, completion_tokens = _token_usage(response) if response is not None else (0, 0)
+    # Price the local count when the provider does not report usage
+    cost = tier.cost(prompt_tokens or estimated_prompt_tokens or 0, completion_tokens) if tier is not None else 0.0
+
+    llm_duration.observe(latency, node=node)
+    llm_calls.inc(node=node)
+    llm_prompt_tokens.inc(prompt_tokens, node=node)
+    llm_completion_tokens.inc(completion_tokens, node=node)
+    if estimated_prompt_tokens is not None:
+        llm_estimated_prompt_tokens.inc(estimated_prompt_tokens, node=node)
+    if tier is not None:
+        llm_tier_duration.observe(latency, tier=tier.name, model=tier.model)
+        llm_tier_tokens.inc(prompt_tokens, tier=tier.name, model=tier.model, kind="prompt")
+        llm_tier_tokens.inc(completion_tokens, tier=tier.name, model=tier.model, kind="completion")
+        llm_tier_cost.inc(cost, tier=tier.name, model=tier.model)
+    logger.debug("LLM call [%s] %s: %d prompt tokens (~%s counted locally), %d completion tokens, %.2fs, $%.4f",
+                 node, tier.model if tier is not None else "-", prompt_tokens, estimated_prompt_tokens,
+                 completion_tokens, latency, cost)
+
+    if span is not None:
+        span["llm_calls"] += 1
+        span["llm_seconds"] += latency
+        span["prompt_tokens"] += prompt_tokens
+        span["completion_tokens"] += completion_tokens
+        span["llm_cost_usd"] += cost
+        if tier is not None:
+            span["model_tier"] = tier.name
+
+
+def record_hedge(winner: str):
+    """
+    Record a hedged LLM request fired by the running node
+    """
+    span = _current_span.get()
+    node = span["node"] if span is not None else "unattributed"
+    llm_hedges.inc(node=node, winner=winner)
+    if span is not None:
+        span["hedged_calls"] += 1
+
+
+def record_degradation(reason: str):
+    """
+    Record that the running node fell back to a local result (e.g. on deadline)
+    """
+    span = _current_span.get()
+    node = span["node"] if span is not None else "unattributed"
+    node_degraded.inc(node=node, reason=reason)
+    logger.warning("Node %s degraded: %s", node, reason)
+    if span is not None:
+        span["degraded"] = reason
+
+
+def instrument_node(name: str, node: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]):
+    """
+    Wrap a LangGraph node with timing, LLM and candidate-count instrumentation.
+    candidates_in defaults to the incoming university_matches; nodes that load
+    their own candidates report the real count with annotate_span(candidates_in=...)
+    """
+    @functools.wraps(node)
+    async def wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+        span = {
+            "node": name,
+            "wall_seconds": 0.0,
+            "llm_calls": 0,
+            "llm_seconds": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "llm_cost_usd": 0.0,
+            "hedged_calls": 0,
+            "candidates_in": len(state.get("university_matches") or [])
+        }
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            result = await node(state)
+        except Exception:
+            node_errors.inc(node=name)
+            raise
+        finally:
+            span["wall_seconds"] = time.perf_counter() - start
+            _current_span.reset(token)
+            node_duration.observe(span["wall_seconds"], node=name)
+            trace = _current_trace.get()
+            if trace is not None:
+                trace.append(span)
+
+        span["candidates_out"] = len(result.get("university_matches") or [])
+        node_candidates.observe(span["candidates_in"], node=name, direction="in")
+        node_candidates.observe(span["candidates_out"], node=name, direction="out")
+        return result
+
+    return wrapper
+
+
+def summarize_trace(trace: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Summarize a request trace for the debug response
+    """
+    return {
+        "nodes": trace,
+        "total_seconds": sum(span["wall_seconds"] for span in trace),
+        "llm_seconds": sum(span["llm_seconds"] for span in trace),
+        "prompt_tokens": sum(span["prompt_tokens"] for span in trace),
+        "completion_tokens": sum(span["completion_tokens"] for span in trace),
+        "llm_cost_usd": sum(span["llm_cost_usd"] for span in trace)
+    }